@@ -0,0 +1,77 @@
+"""
+audio_buffer.py
+
+Preallocated ring buffer for captured audio.
+
+The audio callback copies each block into a fixed float32 array in place, so
+the realtime thread never allocates. Positions are absolute sample indices
+(counted since the buffer was created), which lets readers keep stable
+bookmarks like "utterance starts at sample N" while the buffer wraps.
+"""
+
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-capacity mono float32 ring buffer addressed by absolute sample index.
+
+    Args:
+        capacity: Number of samples kept; older audio is overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._lock = threading.Lock()
+        # Absolute index one past the newest sample
+        self.total_written = 0
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest sample still held."""
+        return max(0, self.total_written - self.capacity)
+
+    def write(self, samples):
+        """Copy `samples` into the buffer (no allocation)."""
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest `capacity` samples can be kept
+            samples = samples[-self.capacity:]
+            skipped = n - self.capacity
+            n = self.capacity
+        else:
+            skipped = 0
+
+        with self._lock:
+            pos = (self.total_written + skipped) % self.capacity
+            first = min(n, self.capacity - pos)
+            self._data[pos:pos + first] = samples[:first]
+            if first < n:
+                self._data[:n - first] = samples[first:]
+            self.total_written += skipped + n
+
+    def read(self, start: int, end: int = None) -> np.ndarray:
+        """Return samples in the absolute range [start, end).
+
+        The result is a zero-copy view when the range does not wrap and a
+        single contiguous copy when it does. Views stay valid as long as the
+        writer has not advanced by more than `capacity` past `start`.
+
+        Raises:
+            ValueError: If the range was already overwritten or is in the future.
+        """
+        with self._lock:
+            total = self.total_written
+        end = total if end is None else end
+        if start < max(0, total - self.capacity) or end > total or start > end:
+            raise ValueError(f"Range [{start}, {end}) not available (have [{self.oldest}, {total}))")
+
+        first = start % self.capacity
+        length = end - start
+        if first + length <= self.capacity:
+            return self._data[first:first + length]
+        return np.concatenate([self._data[first:], self._data[:first + length - self.capacity]])
@@ -0,0 +1,134 @@
+"""
+audio_bus.py
+
+Single audio capture shared by every consumer.
+
+One source (microphone, pipe, socket or file, see `audio_source.py`) writes
+into one `AudioRingBuffer`. Consumers subscribe with the frame size they
+want (Porcupine: 512 samples, StreamingSTT: 100 ms, benchmarks: anything)
+and receive views into the ring, so fanning out does not copy audio. Only a
+frame that straddles the ring's wrap point is handed out as a copy.
+
+The capture callback (PortAudio's realtime thread for the microphone) only
+copies each block into the ring. A separate bus thread started by `run`
+drains the ring and calls the subscribers, so Porcupine, the VAD and the
+decoder bookkeeping never delay the capture. Subscriber callbacks run on
+that bus thread, one after another, and must not block.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from audio_buffer import AudioRingBuffer
+
+
+class Subscription:
+    """A consumer of the bus and its read position (absolute sample index)."""
+
+    def __init__(self, callback, frame_size: int, position: int, name: str = None):
+        self.callback = callback
+        self.frame_size = frame_size
+        self.position = position
+        self.name = name or getattr(callback, "__name__", "subscriber")
+
+
+class AudioBus:
+    """Reads one input and fans frames out to subscribers.
+
+    Args:
+        samplerate: Sample rate every source must deliver.
+        buffer_seconds: Audio history kept in the ring; consumers may read
+            back this far (e.g. StreamingSTT's decoding window).
+    """
+
+    def __init__(self, samplerate: int = 16000, buffer_seconds: float = 60.0):
+        self.samplerate = samplerate
+        self.ring = AudioRingBuffer(int(samplerate * buffer_seconds))
+        self._subscriptions = []
+        self._lock = threading.Lock()
+        # Set by the capture callback whenever new audio is in the ring
+        self._captured = threading.Event()
+        # Only one thread delivers frames at a time
+        self._deliver_lock = threading.Lock()
+        self.overruns = 0  # Times a subscriber fell more than the ring behind
+        # Timeline of the running source (wall clock for live input)
+        self.clock = time.time
+
+    def subscribe(self, callback, frame_size: int, name: str = None) -> Subscription:
+        """Call ``callback(frame, position)`` for every `frame_size` samples.
+
+        `position` is the absolute ring index of the frame's first sample.
+        Delivery starts with the next captured audio.
+        """
+        sub = Subscription(callback, frame_size, self.ring.total_written, name)
+        with self._lock:
+            self._subscriptions.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            if sub in self._subscriptions:
+                self._subscriptions.remove(sub)
+
+    def write(self, samples):
+        """Append mono float32 samples to the ring and wake the bus thread."""
+        self.ring.write(samples)
+        self._captured.set()
+
+    def deliver(self):
+        """Call the subscribers for every complete frame in the ring."""
+        with self._deliver_lock:
+            total = self.ring.total_written
+            with self._lock:
+                subscriptions = list(self._subscriptions)
+
+            for sub in subscriptions:
+                if sub.position < self.ring.oldest:
+                    # Fell behind by more than the ring holds: skip the lost audio
+                    self.overruns += 1
+                    print(f"[AUDIO BUS] subscriber {sub.name} lost {(self.ring.oldest - sub.position) / self.samplerate:.1f}s of audio")
+                    sub.position = self.ring.oldest
+                while sub.position + sub.frame_size <= total:
+                    start = sub.position
+                    frame = self.ring.read(start, start + sub.frame_size)
+                    sub.position += sub.frame_size
+                    try:
+                        sub.callback(frame, start)
+                    except Exception as e:
+                        print(f"[AUDIO BUS] subscriber {sub.name} failed: {e}")
+
+    def push(self, samples):
+        """Append samples and deliver every complete frame on the calling thread."""
+        self.write(samples)
+        self.deliver()
+
+    def callback(self, indata, frames, time_info, status):
+        """`sounddevice`-style callback that sources drive; only writes to the ring."""
+        if status:
+            print(status)
+        self.write(np.asarray(indata[:, 0], dtype=np.float32))
+
+    def _dispatch(self, done: threading.Event):
+        while not done.is_set():
+            if self._captured.wait(0.1):
+                self._captured.clear()
+                self.deliver()
+
+    def run(self, source, stop_event: threading.Event = None):
+        """Capture from `source` until it ends or `stop_event` is set.
+
+        Frames are delivered on a bus thread; audio captured before the
+        source ended is delivered before this returns.
+        """
+        self.clock = getattr(source, "clock", time.time)
+        done = threading.Event()
+        dispatcher = threading.Thread(target=self._dispatch, args=(done,), daemon=True, name="audio-bus")
+        dispatcher.start()
+        try:
+            source.run(self.callback, stop_event)
+        finally:
+            done.set()
+            dispatcher.join()
+            self.deliver()
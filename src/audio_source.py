@@ -0,0 +1,255 @@
+"""
+audio_source.py
+
+Pluggable audio inputs for the audio bus and StreamingSTT.
+
+Every source drives a callback with the same signature as a
+`sounddevice.InputStream` callback: ``callback(indata, frames, time_info, status)``
+where ``indata`` is a float32 array of shape (frames, channels). That way
+`AudioBus.callback` does not care whether audio comes from the microphone,
+a pipe, a socket or a recorded WAV file.
+
+Sources that replay faster than real time expose a `clock` that follows the
+audio timeline instead of the wall clock, so silence/pause detection behaves
+exactly like it would during a live recording.
+"""
+
+import threading
+import time
+import wave
+
+import numpy as np
+
+
+class ReplayClock:
+    """Clock that advances with the amount of audio delivered, not wall time."""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            return self._now
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._now += seconds
+
+
+def load_wav(path: str, samplerate: int = 16000) -> np.ndarray:
+    """Load a PCM WAV file as mono float32 in [-1, 1] at `samplerate`.
+
+    Multi-channel files are downmixed and other sample rates are linearly
+    resampled, which is good enough for feeding Whisper and the VAD.
+    """
+    with wave.open(path, "rb") as wav_file:
+        rate = wav_file.getframerate()
+        channels = wav_file.getnchannels()
+        width = wav_file.getsampwidth()
+        raw = wav_file.readframes(wav_file.getnframes())
+
+    if width == 2:
+        audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 2147483648.0
+    elif width == 1:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        raise ValueError(f"Unsupported sample width {width} in {path}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+
+    if rate != samplerate and len(audio) > 0:
+        duration = len(audio) / rate
+        target_len = int(round(duration * samplerate))
+        src_times = np.arange(len(audio)) / rate
+        dst_times = np.arange(target_len) / samplerate
+        audio = np.interp(dst_times, src_times, audio).astype(np.float32)
+
+    return audio
+
+
+class MicrophoneSource:
+    """Live microphone input through `sounddevice.InputStream`."""
+
+    def __init__(self, samplerate: int, blocksize: int, channels: int = 1, latency="high"):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.channels = channels
+        self.latency = latency
+        # Live audio follows the wall clock
+        self.clock = time.time
+
+    def run(self, callback, stop_event: threading.Event = None):
+        """Open the input stream and block until `stop_event` is set (or forever)."""
+        # Imported here so pipe/socket input works without PortAudio (e.g. in Docker)
+        import sounddevice as sd
+
+        stop_event = stop_event or threading.Event()
+        with sd.InputStream(
+            channels=self.channels,
+            samplerate=self.samplerate,
+            blocksize=self.blocksize,
+            dtype="float32",
+            callback=callback,
+            latency=self.latency,
+        ):
+            while not stop_event.is_set():
+                stop_event.wait(0.1)
+
+
+class WavFileSource:
+    """Replay a WAV file block by block into an audio callback.
+
+    Args:
+        path: WAV file to replay.
+        samplerate: Rate the callback expects; the file is resampled if needed.
+        blocksize: Frames per callback, same meaning as for `sd.InputStream`.
+        speed: 1.0 replays in real time, 4.0 four times faster, and
+            ``float("inf")`` as fast as the consumer allows.
+        leading_silence: Seconds of digital silence before the file.
+        trailing_silence: Seconds of digital silence after the file, so the
+            consumer's end-of-utterance detection gets a chance to fire.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        samplerate: int = 16000,
+        blocksize: int = 8000,
+        speed: float = 1.0,
+        leading_silence: float = 0.0,
+        trailing_silence: float = 3.0,
+    ):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.path = path
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.speed = speed
+
+        audio = load_wav(path, samplerate)
+        lead = np.zeros(int(leading_silence * samplerate), dtype=np.float32)
+        tail = np.zeros(int(trailing_silence * samplerate), dtype=np.float32)
+        self.speech_duration = len(audio) / samplerate
+        self.speech_end = (len(lead) + len(audio)) / samplerate
+        self.audio = np.concatenate([lead, audio, tail])
+        self.duration = len(self.audio) / samplerate
+
+        # Timeline position of the next block (seconds of audio delivered so far)
+        self.clock = ReplayClock(time.time())
+        self.position = 0.0
+
+    def run(self, callback, stop_event: threading.Event = None):
+        """Feed the file into `callback`, pacing blocks according to `speed`."""
+        stop_event = stop_event or threading.Event()
+        block_duration = self.blocksize / self.samplerate
+        pace = 0.0 if self.speed == float("inf") else block_duration / self.speed
+        next_deadline = time.perf_counter()
+
+        for start in range(0, len(self.audio), self.blocksize):
+            if stop_event.is_set():
+                break
+            block = self.audio[start:start + self.blocksize]
+            if len(block) < self.blocksize:
+                block = np.pad(block, (0, self.blocksize - len(block)))
+
+            # Advance before delivering so the callback sees the time at the
+            # end of the block, like a live stream would
+            self.clock.advance(block_duration)
+            self.position += block_duration
+            callback(block.reshape(-1, 1), self.blocksize, None, None)
+
+            if pace:
+                next_deadline += pace
+                delay = next_deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+class PipeSource:
+    """Raw PCM input from a binary stream, e.g. stdin or a named pipe.
+
+    Expects signed 16-bit little-endian mono audio at `samplerate`, which is
+    what e.g. ``arecord -f S16_LE -r 16000 -c 1 -t raw`` or
+    ``ffmpeg -f s16le -ac 1 -ar 16000 -`` produce.
+    """
+
+    def __init__(self, stream, samplerate: int = 16000, blocksize: int = 512):
+        self.stream = stream
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.clock = time.time
+
+    def run(self, callback, stop_event: threading.Event = None):
+        stop_event = stop_event or threading.Event()
+        block_bytes = self.blocksize * 2
+        pending = b""
+        while not stop_event.is_set():
+            data = self.stream.read(block_bytes - len(pending))
+            if not data:
+                break  # Writer closed the pipe
+            pending += data
+            if len(pending) < block_bytes:
+                continue
+            block = np.frombuffer(pending, dtype="<i2").astype(np.float32) / 32768.0
+            pending = b""
+            callback(block.reshape(-1, 1), self.blocksize, None, None)
+
+
+class SocketSource:
+    """Raw PCM input over TCP, for running the assistant in a container.
+
+    Listens on (host, port) and reads the same format as `PipeSource` from one
+    client at a time; when a client disconnects the next one is accepted.
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 5055, samplerate: int = 16000, blocksize: int = 512):
+        self.host = host
+        self.port = port
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.clock = time.time
+
+    def run(self, callback, stop_event: threading.Event = None):
+        import socket
+
+        stop_event = stop_event or threading.Event()
+        with socket.create_server((self.host, self.port)) as server:
+            server.settimeout(0.5)
+            print(f"[AUDIO] Waiting for PCM stream on {self.host}:{self.port}")
+            while not stop_event.is_set():
+                try:
+                    conn, addr = server.accept()
+                except socket.timeout:
+                    continue
+                print(f"[AUDIO] PCM stream connected from {addr[0]}")
+                with conn, conn.makefile("rb") as stream:
+                    PipeSource(stream, self.samplerate, self.blocksize).run(callback, stop_event)
+                print("[AUDIO] PCM stream disconnected")
+
+
+def create_source(spec: str = "mic", samplerate: int = 16000, blocksize: int = 512):
+    """Build an audio source from a short spec (e.g. the `AUDIO_INPUT` env variable).
+
+    - ``mic``: default microphone
+    - ``file:<path.wav>``: replay a WAV file in real time
+    - ``pipe:-`` or ``pipe:<path>``: raw PCM from stdin or a named pipe
+    - ``tcp:<host>:<port>``: raw PCM from a TCP client
+    """
+    kind, _, arg = (spec or "mic").partition(":")
+    if kind == "mic":
+        return MicrophoneSource(samplerate=samplerate, blocksize=blocksize, latency="low")
+    if kind == "file":
+        return WavFileSource(arg, samplerate=samplerate, blocksize=blocksize)
+    if kind == "pipe":
+        import sys
+
+        stream = sys.stdin.buffer if arg in ("", "-") else open(arg, "rb")
+        return PipeSource(stream, samplerate=samplerate, blocksize=blocksize)
+    if kind == "tcp":
+        host, _, port = arg.rpartition(":")
+        return SocketSource(host or "0.0.0.0", int(port), samplerate=samplerate, blocksize=blocksize)
+    raise ValueError(f"Unknown audio input '{spec}'")
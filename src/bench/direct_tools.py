@@ -0,0 +1,89 @@
+"""
+direct_tools.py
+
+Which utterances are answered by a direct tool (`tools/registry.py`) instead
+of the conversation call, and how fast.
+
+Every utterance is routed by the local router (no remote call) and, for
+actions, answered through the registry. NFL data comes from the fake ESPN
+server (`bench/fake_espn_server.py`), the waste schedule from
+`bench/data/waste_schedule.ics`. Every direct answer skips one conversation
+round trip; its latency is assumed (`--conversation-ms`). The expected paths
+are asserted in `tests/test_registry.py`.
+
+Run from the `src` directory:
+    python -m bench.direct_tools
+"""
+
+import argparse
+import os
+import time
+
+from bench.fake_espn_server import start_server
+from llm import local_router
+from tools import nfl_data, registry, timers, waste
+
+WASTE_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "waste_schedule.ics")
+
+UTTERANCES = [
+    "what time is it",
+    "what day is it",
+    "set a timer for fifteen minutes",
+    "start a three minute timer for the eggs",
+    "how much time is left on my timer",
+    "cancel all timers",
+    "set a timer",
+    "what are the nfl scores",
+    "when is the trash collected",
+    "turn off the kitchen light",
+    "who was albert einstein",
+]
+
+
+def run(utterances, conversation_ms: float):
+    rows = []
+    for text in utterances:
+        started = time.perf_counter()
+        routed = local_router.route(text)
+        tool_answer = None
+        if routed is not None and routed.get("tool") == "action":
+            tool_answer = registry.answer(routed.get("action"), text)
+        elapsed = time.perf_counter() - started
+        rows.append((text, routed, tool_answer, elapsed))
+
+    direct = [row for row in rows if row[2] is not None]
+    for text, routed, tool_answer, elapsed in rows:
+        if tool_answer is not None:
+            path = f"direct  {tool_answer.tool.name:<20}"
+        elif routed is None:
+            path = f"remote  {'-':<20}"
+        else:
+            path = f"llm     {routed.get('action') or '-':<20}"
+        spoken = f" -> {tool_answer.text[:70]}" if tool_answer is not None else ""
+        print(f"[TOOLS] {path} {elapsed * 1000:6.1f}ms  '{text}'{spoken}")
+
+    mean = sum(row[3] for row in direct) / len(direct) if direct else 0.0
+    print(f"[TOOLS] {len(direct)}/{len(rows)} answered directly, mean {mean * 1000:.1f}ms")
+    print(f"[TOOLS] conversation round trips saved: {len(direct)} ({len(direct) * conversation_ms / 1000:.1f}s at {conversation_ms:.0f}ms)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Direct tool answers vs. the conversation path")
+    parser.add_argument("--conversation-ms", type=float, default=1500.0, help="Assumed conversation call latency")
+    args = parser.parse_args()
+
+    server, url = start_server()
+    nfl_data._client = nfl_data.NflDataClient(url)
+    waste.WASTE_SCHEDULE_FILE = WASTE_FIXTURE
+    local_router.classify("warm up")
+
+    try:
+        run(UTTERANCES, args.conversation_ms)
+    finally:
+        timers.cancel_timers()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+fake_espn_server.py
+
+Local ESPN scoreboard server replaying the recorded fixture
+`bench/data/espn_scoreboard.json`, so the NFL tool can be exercised offline.
+
+Mimics the parts of the real API the tool uses:
+- without `week`: the current week's scoreboard plus the league calendar
+- ``?seasontype=<n>&week=<n>[&dates=<year>]``: that week's scoreboard
+- ETag / Last-Modified headers and 304 answers to conditional requests
+- an optional per-request `delay`, to check that weeks are fetched concurrently
+
+`tests/test_nfl_data.py` and `tests/test_registry.py` run the NFL tools
+against it.
+
+Point the assistant at it with
+    ESPN_SCOREBOARD_URL=http://127.0.0.1:8766/scoreboard
+
+Run from the `src` directory:
+    python -m bench.fake_espn_server --port 8766
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "espn_scoreboard.json")
+
+
+def load_fixture(path: str = FIXTURE) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class FakeEspnHandler(BaseHTTPRequestHandler):
+    """Builds scoreboard responses from `server.fixture`."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        server.requests += 1
+        time.sleep(server.delay)
+
+        fixture = server.fixture
+        current = fixture["current"]
+        season_type = int(query.get("seasontype", current["seasontype"]))
+        week = int(query.get("week", current["week"]))
+        payload = {
+            "leagues": [fixture["league"]],
+            "season": {"type": season_type, "year": fixture["league"]["season"]["year"]},
+            "week": {"number": week},
+            "events": fixture["weeks"].get(f"{season_type}:{week}", []),
+        }
+        body = json.dumps(payload).encode("utf-8")
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+
+        if self.headers.get("If-None-Match") == etag:
+            server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", server.last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, fixture: dict = None, delay: float = 0.0):
+    """Start the fake server on a background thread; returns (server, scoreboard_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeEspnHandler)
+    server.fixture = fixture or load_fixture()
+    server.delay = delay
+    server.requests = 0
+    server.not_modified = 0
+    server.last_modified = formatdate(time.time(), usegmt=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/scoreboard"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake ESPN scoreboard server (recorded fixture)")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--fixture", default=FIXTURE, help="Recorded scoreboard fixture (JSON)")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, load_fixture(args.fixture))
+    print(f"Fake ESPN scoreboard on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+fake_llm_server.py
+
+Local OpenAI-compatible stand-in for the LLM calls in `llm/api.py`, replaying
+the canned answers in `bench/data/llm_responses.json`, so the whole pipeline
+can be load-tested and benchmarked without network access.
+
+Serves the Responses API subset the backend (`llm/backend.py`) uses:
+- ``POST /v1/responses``: JSON, or an SSE stream of text deltas with
+  ``stream: true`` (chunked, so connections stay alive)
+- ``GET /v1/models``: used by the backend's preconnect
+
+Requests are answered by kind (detected from the system prompt):
+- router: the fixture's JSON for the utterance, else the local router's result
+- summary: the fixture's summary
+- conversation: the first fixture reply whose `match` is in the utterance,
+  else the default reply
+
+Latency is configurable: `latency` (+ uniform `jitter`) before the answer
+and `token_delay` between streamed deltas. For tests, `fail_next` answers
+the next n requests with 503 and `slow_next` delays them by `slow_delay`.
+Counters: requests per kind, TCP connections opened, peak concurrency.
+
+`tests/test_llm_backend.py` runs `llm/api.py` and the backend against it.
+
+Point the assistant at it with
+    LLM_BASE_URL=http://127.0.0.1:8767/v1
+
+Run from the `src` directory:
+    python -m bench.fake_llm_server --port 8767 --latency 0.3 --token-delay 0.02
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from context_builder import estimate_tokens
+from llm import local_router
+from llm.system_prompt import router_system_prompt, history_summary_prompt
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_responses.json")
+
+_ids = itertools.count(1)
+
+
+def load_fixture(path: str = FIXTURE) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"[^\w\s']", "", text.lower()).strip()
+
+
+def _content(message) -> str:
+    content = message.get("content", "")
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content
+
+
+def canned_reply(fixture: dict, messages):
+    """(kind, text) answering a Responses API `input` list."""
+    system = _content(messages[0]) if messages and messages[0].get("role") == "system" else ""
+    user = next((_content(m) for m in reversed(messages) if m.get("role") == "user"), "")
+
+    if system == router_system_prompt:
+        routed = fixture["router"].get(_normalize(user))
+        if routed is None:
+            result = local_router.classify(user)
+            routed = {key: result[key] for key in ("corrected_text", "intent", "tool", "action") if key in result}
+        return "router", json.dumps(routed, ensure_ascii=False)
+    if system == history_summary_prompt:
+        return "summary", fixture["summary"]
+
+    lowered = user.lower()
+    for reply in fixture["conversation"]:
+        if reply["match"] in lowered:
+            return "conversation", reply["text"]
+    return "conversation", fixture["default"]
+
+
+def _response(model: str, text: str, input_tokens: int, status: str = "completed") -> dict:
+    output_tokens = estimate_tokens(text) if text else 0
+    return {
+        "id": f"resp_fake_{next(_ids)}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "model": model,
+        "status": status,
+        "error": None,
+        "incomplete_details": None,
+        "instructions": None,
+        "parallel_tool_calls": False,
+        "tool_choice": "auto",
+        "tools": [],
+        "output": [{
+            "type": "message",
+            "id": "msg_fake",
+            "role": "assistant",
+            "status": status,
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        }] if text else [],
+        "usage": {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + output_tokens,
+        },
+    }
+
+
+class FakeLlmHandler(BaseHTTPRequestHandler):
+    """Answers from the fixture and latency settings stored on the server (see `start_server`)."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        if urlparse(self.path).path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model", "created": 0, "owned_by": "bench"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+        if not urlparse(self.path).path.rstrip("/").endswith("/responses"):
+            self._send_json(404, {"error": {"message": "not found", "type": "invalid_request_error"}})
+            return
+        request = json.loads(body or b"{}")
+        server = self.server
+        messages = request.get("input") or []
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        kind, text = canned_reply(server.fixture, messages)
+
+        with server.lock:
+            server.requests[kind] = server.requests.get(kind, 0) + 1
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+            fail = server.fail_next > 0
+            server.fail_next -= 1 if fail else 0
+            slow = server.slow_next > 0
+            server.slow_next -= 1 if slow else 0
+        try:
+            if fail:
+                server.failed += 1
+                self._send_json(503, {"error": {"message": "overloaded (injected)", "type": "server_error"}})
+                return
+            time.sleep(server.latency + random.uniform(0, server.jitter) + (server.slow_delay if slow else 0.0))
+            input_tokens = sum(estimate_tokens(_content(m)) for m in messages)
+            model = request.get("model", "fake")
+            if request.get("stream"):
+                self._stream(model, text, input_tokens)
+            else:
+                self._send_json(200, _response(model, text, input_tokens))
+        except (BrokenPipeError, ConnectionResetError):
+            # The client closed the stream early (e.g. a cancelled turn)
+            self.close_connection = True
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send_json(self, status: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _event(self, payload: dict):
+        self._chunk(f"event: {payload['type']}\ndata: {json.dumps(payload)}\n\n".encode("utf-8"))
+
+    def _stream(self, model: str, text: str, input_tokens: int):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        sequence = itertools.count()
+        self._event({"type": "response.created", "sequence_number": next(sequence),
+                     "response": _response(model, "", input_tokens, status="in_progress")})
+        for i, delta in enumerate(re.findall(r"\S+\s*", text)):
+            if i:
+                time.sleep(self.server.token_delay)
+            self._event({
+                "type": "response.output_text.delta", "sequence_number": next(sequence),
+                "item_id": "msg_fake", "output_index": 0, "content_index": 0, "delta": delta, "logprobs": [],
+            })
+        self._event({"type": "response.completed", "sequence_number": next(sequence),
+                     "response": _response(model, text, input_tokens)})
+        self._chunk(b"")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, fixture: dict = None, latency: float = 0.0, token_delay: float = 0.0, jitter: float = 0.0):
+    """Start the fake server on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeLlmHandler)
+    server.daemon_threads = True
+    server.fixture = fixture or load_fixture()
+    server.latency = latency
+    server.token_delay = token_delay
+    server.jitter = jitter
+    server.fail_next = 0
+    server.slow_next = 0
+    server.slow_delay = 1.0
+    server.lock = threading.Lock()
+    server.requests = {}
+    server.failed = 0
+    server.connections = 0
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    local_router.classify("warm up")  # Builds the classifier, which would stall the first router requests
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible LLM server (canned responses)")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--fixture", default=FIXTURE, help="Canned responses (JSON)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the answer (or its first delta)")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Seconds between streamed deltas")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform extra latency, seconds")
+    args = parser.parse_args()
+
+    server, url = start_server(args.port, load_fixture(args.fixture), args.latency, args.token_delay, args.jitter)
+    print(f"Fake LLM server on {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+fake_search_server.py
+
+Local stand-in for the web search sources, so `web_search` can be exercised
+without network access and with controlled latencies.
+
+Serves:
+- ``/w/api.php``: MediaWiki API subset (generator=search + prop=extracts;
+  the whole article unless ``exintro`` asks for the lead section only)
+- ``/search``: HTTP JSON search endpoint in the `SEARCH_API_URL` format
+
+Paths in `server.failing` answer with HTTP 500. `tests/test_web_search.py`
+runs `web_search` against it.
+
+Point the assistant at it with
+    WIKI_API_URL=http://127.0.0.1:8765/w/api.php SEARCH_API_URL=http://127.0.0.1:8765/search
+
+Run from the `src` directory:
+    python -m bench.fake_search_server --port 8765 --wiki-delay 0.2
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeSearchHandler(BaseHTTPRequestHandler):
+    """Answers from the delays and counters stored on the server (see `start_server`)."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        server = self.server
+        server.requests[url.path] = server.requests.get(url.path, 0) + 1
+
+        if url.path in server.failing:
+            self.send_error(500)
+            return
+        if url.path == "/w/api.php":
+            time.sleep(server.wiki_delay)
+            term = query.get("gsrsearch", "")
+            server.wiki_queries.append(query)
+            extract = f"{term.title()} is a test article. " * 20
+            if "exintro" not in query:
+                # Whole article: lead plus sections
+                extract += f"\n\n== History ==\n{term.title()} has a long history. " * 200
+            payload = {"query": {"pages": {"1": {"pageid": 1, "title": term.title(), "extract": extract}}}}
+        elif url.path == "/search":
+            time.sleep(server.search_delay)
+            term = query.get("q", "")
+            count = int(query.get("max_results", 10))
+            payload = {"results": [
+                {"title": f"Result {i} for {term}", "content": f"Snippet {i} about {term}.", "url": f"https://example.com/{i}"}
+                for i in range(min(count, 5))
+            ]}
+        else:
+            self.send_error(404)
+            return
+
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, wiki_delay: float = 0.0, search_delay: float = 0.0):
+    """Start the fake server on a background thread; returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeSearchHandler)
+    server.wiki_delay = wiki_delay
+    server.search_delay = search_delay
+    server.requests = {}
+    server.wiki_queries = []
+    server.failing = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake search + MediaWiki server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--wiki-delay", type=float, default=0.0, help="Seconds before each wiki response")
+    parser.add_argument("--search-delay", type=float, default=0.0, help="Seconds before each search response")
+    args = parser.parse_args()
+
+    server, base = start_server(args.port, args.wiki_delay, args.search_delay)
+    print(f"Fake search server on {base} (wiki {base}/w/api.php, search {base}/search)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+history_tokens.py
+
+Prompt size and reusable prefix of the conversation call over a session.
+
+Simulates `--turns` exchanges and prints, per turn, the prompt tokens of the
+conversation request and how many of them are a prefix identical to the
+previous request (what provider-side prompt caching can reuse), for:
+- bounded: `llm.history.ConversationHistory` (last N turns + summary)
+- naive: every earlier turn verbatim
+
+The summary is produced by a local stand-in (first sentence of each folded
+answer, capped) unless `--live` uses the real summarizer (needs OPENAI_API_KEY).
+`tests/test_history.py` asserts the bounded growth and the stable prefix.
+
+Run from the `src` directory:
+    python -m bench.history_tokens --turns 12 --keep 4 --fold-batch 2
+"""
+
+import argparse
+
+from context_builder import estimate_tokens
+from llm.history import ConversationHistory
+from llm.system_prompt import conversation_system_prompt
+
+TOPICS = [
+    ("Who won the Lions game?", "The Lions beat the Cowboys 44 to 30. Jared Goff threw four touchdowns."),
+    ("When do they play next?", "Detroit plays the Rams on Sunday at 7 PM. It's a home game at Ford Field."),
+    ("Set a timer for ten minutes", "Okay, timer set for 10 minutes."),
+    ("How tall is the Eiffel Tower?", "The Eiffel Tower is about 330 meters tall, including its antennas."),
+    ("When was it built?", "It was built between 1887 and 1889 for the World's Fair in Paris."),
+    ("Tell me a joke", "Why did the scarecrow win an award? Because he was outstanding in his field."),
+]
+
+
+def local_summarize(previous_summary: str, turns):
+    """Stand-in summarizer: keeps the first sentence of each answer, capped at 120 words."""
+    facts = [turn.assistant.split(". ")[0].rstrip(".") + "." for turn in turns]
+    words = " ".join(filter(None, [previous_summary] + facts)).split()
+    return " ".join(words[-120:])
+
+
+def _tokens(messages):
+    return [estimate_tokens(message["content"]) for message in messages]
+
+
+def _shared_prefix(previous, current):
+    """Tokens of the leading messages identical in both requests."""
+    shared = 0
+    for before, after in zip(previous, current):
+        if before != after:
+            break
+        shared += estimate_tokens(after["content"])
+    return shared
+
+
+def simulate(turns: int, keep: int, fold_batch: int, summarize):
+    history = ConversationHistory(keep, summarize=summarize, fold_batch=fold_batch)
+    naive = []
+    system = {"role": "system", "content": conversation_system_prompt}
+    rows, previous_bounded, previous_naive = [], [], []
+    for i in range(turns):
+        user, assistant = TOPICS[i % len(TOPICS)]
+        bounded = [system] + history.messages() + [{"role": "user", "content": user}]
+        full = [system] + naive + [{"role": "user", "content": user}]
+        rows.append((
+            i + 1,
+            sum(_tokens(bounded)), _shared_prefix(previous_bounded, bounded),
+            sum(_tokens(full)), _shared_prefix(previous_naive, full),
+        ))
+        previous_bounded, previous_naive = bounded, full
+        history.add_turn(user, assistant)
+        history.wait()
+        naive += [{"role": "user", "content": user}, {"role": "assistant", "content": assistant}]
+    return rows, history
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversation prompt tokens with bounded vs. naive history")
+    parser.add_argument("--turns", type=int, default=12)
+    parser.add_argument("--keep", type=int, default=4, help="Turns kept verbatim at most")
+    parser.add_argument("--fold-batch", type=int, default=2, help="Turns folded into the summary at once")
+    parser.add_argument("--live", action="store_true", help="Summarize with the real model")
+    args = parser.parse_args()
+
+    summarize = local_summarize
+    if args.live:
+        from llm.api import _summarize_history as summarize
+
+    rows, history = simulate(args.turns, args.keep, args.fold_batch, summarize)
+    print(f"[HISTORY] {'turn':>4} {'bounded':>8} {'prefix':>7} {'naive':>7} {'prefix':>7}")
+    for turn, bounded, bounded_prefix, naive, naive_prefix in rows:
+        print(f"[HISTORY] {turn:>4} {bounded:>8} {bounded_prefix:>7} {naive:>7} {naive_prefix:>7}")
+    print(history.report())
+
+
+if __name__ == "__main__":
+    main()
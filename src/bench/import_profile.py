@@ -0,0 +1,73 @@
+"""
+import_profile.py
+
+Import-time profile of the assistant's entry point, based on Python's
+`-X importtime`.
+
+Imports the given module in a fresh interpreter with `-X importtime` and
+reports the total import time plus the slowest imports, both by cumulative
+time (including their own imports) and by self time. Run it before and
+after touching imports to see what startup pays for.
+
+Run from the `src` directory:
+    python -m bench.import_profile --module main --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def profile_imports(module: str):
+    """Import `module` with `-X importtime` and return [(name, self_us, cumulative_us, depth)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # Importing failed (e.g. a missing dependency); show why, keep the partial profile
+        print(result.stderr.strip().splitlines()[-1], file=sys.stderr)
+
+    entries = []
+    for line in result.stderr.splitlines():
+        # "import time:       self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile (-X importtime)")
+    parser.add_argument("--module", default="main", help="Module to import (default: main)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to list")
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    if not entries:
+        print("No import timings collected")
+        return
+
+    # The module itself is listed last with everything it imported as cumulative time
+    # (interpreter startup imports like encodings/site are not counted)
+    total_us = next((cumulative for name, _, cumulative, _ in reversed(entries) if name == args.module), 0)
+    print(f"import {args.module}: {total_us / 1000:.1f}ms, {len(entries)} modules")
+
+    print("\nSlowest by cumulative time:")
+    for name, _, cumulative, depth in sorted(entries, key=lambda e: e[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {'  ' * (depth - 1)}{name}")
+
+    print("\nSlowest by self time:")
+    for name, self_us, _, _ in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
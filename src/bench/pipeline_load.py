@@ -0,0 +1,174 @@
+"""
+pipeline_load.py
+
+Load test of the text pipeline (router -> streamed conversation -> sentence
+chunks) against the fake LLM server (`bench/fake_llm_server.py`), or any
+OpenAI-compatible endpoint given with `--base-url`.
+
+`--sessions` concurrent sessions each run `--turns` utterances from
+`bench/data/router_utterances.jsonl`. Per turn it measures the router call,
+the first streamed delta and the first speakable sentence (what TTS would
+start on). It reports p50/p95/max, throughput, retries and hedges, and, with
+the fake server, how many connections were opened for how many requests
+(keep-alive reuse). Caches, the local router and the history are off so that
+every turn makes both remote calls; no search, TTS or audio is involved.
+Connection reuse under load is asserted in `tests/test_llm_backend.py`.
+
+Run from the `src` directory:
+    python -m bench.pipeline_load --sessions 8 --turns 5 --latency 0.3 --token-delay 0.02
+    python -m bench.pipeline_load --max-connections 16 --slow-every 10 --hedge-delay 0.5
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench.fake_llm_server import start_server
+from llm import api, backend
+from sentence_chunker import iter_chunks
+
+UTTERANCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "router_utterances.jsonl")
+
+
+def load_utterances(path: str = UTTERANCES):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["text"] for line in f if line.strip()]
+
+
+def run_turn(text: str) -> dict:
+    started = time.perf_counter()
+    routed = json.loads(api.classification(text))
+    routed_at = time.perf_counter()
+    first_delta = first_sentence = None
+    sentences = 0
+
+    def deltas():
+        nonlocal first_delta
+        corrected = routed.get("corrected_text")
+        prompt = corrected if corrected and corrected != "unchanged" else text
+        for delta in api.conversation_stream(prompt):
+            if first_delta is None:
+                first_delta = time.perf_counter()
+            yield delta
+
+    for _ in iter_chunks(deltas()):
+        if first_sentence is None:
+            first_sentence = time.perf_counter()
+        sentences += 1
+    done = time.perf_counter()
+    return {
+        "router": routed_at - started,
+        "first_delta": (first_delta or done) - started,
+        "first_sentence": (first_sentence or done) - started,
+        "total": done - started,
+        "sentences": sentences,
+    }
+
+
+def _percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def run(sessions: int, turns: int, utterances):
+    def session(index):
+        results = []
+        for turn in range(turns):
+            text = utterances[(index * turns + turn) % len(utterances)]
+            try:
+                results.append(run_turn(text))
+            except Exception as e:
+                results.append({"error": f"{type(e).__name__}: {e}"})
+        return results
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        results = [row for rows in pool.map(session, range(sessions)) for row in rows]
+    return results, time.perf_counter() - started
+
+
+def report(results, elapsed: float):
+    ok = [row for row in results if "error" not in row]
+    errors = [row["error"] for row in results if "error" in row]
+    print(f"[LOAD] {len(results)} turns in {elapsed:.2f}s ({len(results) / elapsed:.1f} turns/s), {len(errors)} failed")
+    for metric in ("router", "first_delta", "first_sentence", "total"):
+        values = [row[metric] * 1000 for row in ok]
+        if values:
+            print(
+                f"[LOAD] {metric:<15} p50 {_percentile(values, 0.5):7.0f}ms  "
+                f"p95 {_percentile(values, 0.95):7.0f}ms  max {max(values):7.0f}ms"
+            )
+    for error in sorted(set(errors))[:5]:
+        print("[LOAD] error:", error)
+    return ok, errors
+
+
+def _inject_faults(server, slow_every: int, slow_delay: float, fail_every: int):
+    """Arm a stall / 503 after every n requests the server has seen."""
+    server.slow_delay = slow_delay
+
+    def ticker():
+        armed_slow = armed_fail = 0
+        while True:
+            seen = sum(server.requests.values())
+            with server.lock:
+                if slow_every and seen // slow_every > armed_slow:
+                    armed_slow = seen // slow_every
+                    server.slow_next += 1
+                if fail_every and seen // fail_every > armed_fail:
+                    armed_fail = seen // fail_every
+                    server.fail_next += 1
+            time.sleep(0.005)
+
+    threading.Thread(target=ticker, daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test of the LLM pipeline against a local fake server")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent sessions")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per session")
+    parser.add_argument("--base-url", help="Use this endpoint instead of starting the fake server")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake server: seconds to the first byte")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="Fake server: seconds between deltas")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Fake server: uniform extra latency")
+    parser.add_argument("--slow-every", type=int, default=0, help="Fake server: stall every n-th request")
+    parser.add_argument("--slow-delay", type=float, default=1.5, help="Fake server: length of a stall")
+    parser.add_argument("--fail-every", type=int, default=0, help="Fake server: answer every n-th request with 503")
+    parser.add_argument("--hedge-delay", type=float, default=backend.HEDGE_DELAY, help="Hedge router calls after this (0: off)")
+    parser.add_argument("--max-connections", type=int, default=backend.MAX_CONNECTIONS)
+    args = parser.parse_args()
+
+    server = None
+    url = args.base_url
+    if url is None:
+        server, url = start_server(latency=args.latency, token_delay=args.token_delay, jitter=args.jitter)
+    backend._backend = backend.Backend(url, max_connections=args.max_connections)
+    api.CACHE_ENABLED = False
+    api.LOCAL_ROUTER_ENABLED = False
+    api.history = None
+    api.HEDGE_DELAY = args.hedge_delay
+    backend.get_backend().preconnect()
+
+    utterances = load_utterances()
+    if server is not None and (args.slow_every or args.fail_every):
+        # Injected faults are spread over the run: arm them from a ticker
+        _inject_faults(server, args.slow_every, args.slow_delay, args.fail_every)
+
+    results, elapsed = run(args.sessions, args.turns, utterances)
+    report(results, elapsed)
+    client = backend.get_backend()
+    print(client.report())
+    if server is not None:
+        requests = sum(server.requests.values())
+        print(
+            f"[LOAD] server: {requests} requests over {server.connections} connections, "
+            f"peak {server.peak_in_flight} concurrent, {server.failed} injected failures"
+        )
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+router_eval.py
+
+Offline evaluation of the local intent router (`llm.local_router`) against a
+labelled utterance set (`bench/data/router_utterances.jsonl`, one
+``{"text": ..., "category": ...}`` per line).
+
+Reports:
+- coverage: share of utterances answered locally (confident, local category)
+- precision of the local answers, and raw category accuracy of the local
+  classifier over all utterances
+- local routing latency (mean / p95)
+- latency saved: every local answer skips one remote router call. The remote
+  latency is assumed (`--remote-ms`) or measured with `--remote`, which also
+  calls the remote router for every utterance (needs OPENAI_API_KEY)
+- negatives: utterances (`NEGATIVE_CASES`) that look like a command but must
+  not be routed to that action locally; any hit is listed and makes the
+  script exit with status 1
+
+Run from the `src` directory:
+    python -m bench.router_eval --threshold 0.55
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from llm import local_router
+
+DEFAULT_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "router_utterances.jsonl")
+
+
+# (utterance, action the local router must not pick)
+NEGATIVE_CASES = [
+    ("what were the nfl scores in week 3", "get_nfl_scores"),
+    ("nfl schedule for christmas day", "get_nfl_scores"),
+    ("who played in the nfl games in 1995", "get_nfl_scores"),
+    ("did the lions win their nfl game last season", "get_nfl_scores"),
+    ("what are the nfl games on thanksgiving", "get_nfl_scores"),
+    ("lights on the christmas tree look nice", "turn_on_light"),
+    ("remind me how the nfl playoffs work", "set_reminder"),
+    ("stop the timer in the oven? no, play the next song", "cancel_timer"),
+]
+
+
+def negative_hits(threshold: float):
+    """Negative cases the local router still answers with the forbidden action."""
+    hits = []
+    for text, action in NEGATIVE_CASES:
+        routed = local_router.route(text, threshold)
+        if routed is not None and routed.get("action") == action:
+            hits.append((text, action))
+    return hits
+
+
+def load_utterances(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def measure_remote(utterances):
+    """Call the remote router once per utterance; returns [(category or None, seconds)]."""
+    from llm import api
+
+    results = []
+    for item in utterances:
+        started = time.perf_counter()
+        # Bypass the local router and the response cache, we want the raw remote call
+        raw = api._classify(item["text"])
+        elapsed = time.perf_counter() - started
+        try:
+            category = json.loads(raw)["intent"]["category"]
+        except (ValueError, KeyError, TypeError):
+            category = None
+        results.append((category, elapsed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local intent router")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="Labelled utterances (JSONL)")
+    parser.add_argument("--threshold", type=float, default=0.55, help="Local confidence threshold")
+    parser.add_argument("--remote-ms", type=float, default=800.0, help="Assumed remote router latency")
+    parser.add_argument("--remote", action="store_true", help="Measure the remote router instead of assuming its latency")
+    args = parser.parse_args()
+
+    utterances = load_utterances(args.data)
+    local_router.classify("warm up")  # Builds the classifier outside the timings
+
+    timings, handled, handled_correct, raw_correct, misroutes = [], 0, 0, 0, []
+    for item in utterances:
+        started = time.perf_counter()
+        routed = local_router.route(item["text"], args.threshold)
+        timings.append(time.perf_counter() - started)
+        prediction = routed or local_router.classify(item["text"])
+
+        category = prediction["intent"]["category"]
+        raw_correct += category == item["category"]
+        if routed is not None:
+            handled += 1
+            if category == item["category"]:
+                handled_correct += 1
+            else:
+                misroutes.append((item, prediction))
+
+    timings.sort()
+    n = len(utterances)
+    local_mean = sum(timings) / n
+    p95 = timings[min(n - 1, int(n * 0.95))]
+    print(f"[ROUTER] {n} utterances, threshold {args.threshold}")
+    print(f"  coverage      {handled}/{n} ({handled / n:.0%}) answered locally")
+    print(f"  precision     {handled_correct}/{handled} ({handled_correct / handled if handled else 0:.0%}) of local answers correct")
+    print(f"  raw accuracy  {raw_correct}/{n} ({raw_correct / n:.0%}) local category over all utterances")
+    print(f"  local latency mean {local_mean * 1000:.2f}ms, p95 {p95 * 1000:.2f}ms")
+
+    remote_ms = args.remote_ms
+    if args.remote:
+        remote = measure_remote(utterances)
+        remote_ms = sum(elapsed for _, elapsed in remote) / n * 1000
+        remote_correct = sum(category == item["category"] for (category, _), item in zip(remote, utterances))
+        print(f"  remote        accuracy {remote_correct}/{n} ({remote_correct / n:.0%}), mean latency {remote_ms:.0f}ms")
+
+    saved = handled * (remote_ms - local_mean * 1000)
+    print(f"  latency saved {saved / 1000:.1f}s total, {saved / n:.0f}ms per utterance on average (remote {remote_ms:.0f}ms)")
+
+    for item, prediction in misroutes:
+        print(
+            f"  MISROUTE '{item['text']}': expected {item['category']}, got {prediction['intent']['category']} "
+            f"({prediction['source']}, {prediction['confidence']:.2f})"
+        )
+
+    hits = negative_hits(args.threshold)
+    print(f"  negatives     {len(NEGATIVE_CASES) - len(hits)}/{len(NEGATIVE_CASES)} kept off their look-alike action")
+    for text, action in hits:
+        print(f"  FALSE ACTION '{text}' -> {action}")
+    if hits:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
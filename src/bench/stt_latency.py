@@ -0,0 +1,138 @@
+"""
+stt_latency.py
+
+End-to-end latency benchmark for StreamingSTT, driven by recorded WAV files
+instead of the microphone.
+
+For every Whisper model size and every input file it reports:
+- time to final message: from the moment the long pause ends the utterance
+  until the full message is in `full_message_queue`
+- per-partial transcription latency (mean / max)
+- real-time factor (RTF): transcription time divided by transcribed audio
+  duration, so < 1.0 means faster than real time
+- VAD speech/non-speech statistics of the run
+
+Each file is transcribed in its own language: the prefix of the file name
+("en_US.wav" -> "en", "de.wav" -> "de") unless `--language` is given.
+All files of one model size share one transcription executor, which is shut
+down before the next size is loaded.
+
+Run from the `src` directory:
+    python -m bench.stt_latency --sizes tiny base small --speed 4
+    python -m bench.stt_latency ../audio/recording.wav --language de
+"""
+
+import argparse
+import os
+import threading
+import time
+
+from audio_source import WavFileSource
+from streaming_stt import StreamingSTT, load_whisper_model
+from transcription_pool import TranscriptionExecutor
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_FILES = [
+    os.path.join(PROJECT_ROOT, "audio", "en_US.wav"),
+    os.path.join(PROJECT_ROOT, "audio", "en_GB.wav"),
+    os.path.join(PROJECT_ROOT, "audio", "de.wav"),
+]
+DEFAULT_SIZES = ["tiny", "base", "small"]
+
+
+def language_of(path: str) -> str:
+    """Whisper language code from the file name: "en_US.wav" -> "en", "de.wav" -> "de"."""
+    return os.path.splitext(os.path.basename(path))[0].split("_")[0].split("-")[0].lower()
+
+
+def run_file(model, executor, path: str, speed: float, language: str = None, timeout: float = 60.0):
+    """Replay one file through a fresh StreamingSTT on the shared `executor` and collect its timings."""
+    language = language or language_of(path)
+    stt = StreamingSTT(model=model, executor=executor, language=language)
+    source = WavFileSource(path, samplerate=stt.SAMPLERATE, blocksize=stt.CHUNK_SIZE, speed=speed)
+    stt.bus.clock = source.clock
+    stt.start_recording()
+
+    stop = threading.Event()
+    started = time.perf_counter()
+    feeder = threading.Thread(target=stt.start_stream, args=(source, stop), daemon=True)
+    feeder.start()
+
+    # Wait for the final message; the feeder may finish first on fast replays
+    deadline = started + timeout
+    while not stt.full_message_queue and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    stop.set()
+    feeder.join(timeout=1.0)
+    # Passes of a timed out run must not be billed to the next file
+    executor.drain(timeout=timeout)
+
+    message = stt.full_message_queue.popleft() if stt.full_message_queue else ""
+    partial_latencies = [elapsed for kind, _, elapsed in stt.transcription_log if kind == "partial"]
+    audio_total = sum(audio for _, audio, _ in stt.transcription_log)
+    elapsed_total = sum(elapsed for _, _, elapsed in stt.transcription_log)
+
+    time_to_final = None
+    if stt.final_ready_time is not None and stt.utterance_end_time is not None:
+        time_to_final = stt.final_ready_time - stt.utterance_end_time
+
+    return {
+        "file": os.path.basename(path),
+        "language": language,
+        "speech_seconds": source.speech_duration,
+        "message": message,
+        "time_to_final": time_to_final,
+        "partials": len(partial_latencies),
+        "partial_mean": sum(partial_latencies) / len(partial_latencies) if partial_latencies else None,
+        "partial_max": max(partial_latencies) if partial_latencies else None,
+        "rtf": elapsed_total / audio_total if audio_total else None,
+        "wall": time.perf_counter() - started,
+        "vad": stt.vad.report(),
+    }
+
+
+def _ms(value):
+    return "-" if value is None else f"{value * 1000:.0f}ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark StreamingSTT latency on recorded audio")
+    parser.add_argument("files", nargs="*", default=DEFAULT_FILES, help="WAV files to replay")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Whisper model sizes")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Replay speed, 1 = real time, 0 = as fast as possible")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per file")
+    parser.add_argument("--language", help="Whisper language code for every file (default: from the file name)")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the warmup transcription")
+    args = parser.parse_args()
+    speed = float("inf") if args.speed == 0 else args.speed
+
+    for size in args.sizes:
+        load_started = time.perf_counter()
+        model = load_whisper_model(size)
+        print(f"\n=== faster-whisper-{size} (loaded in {time.perf_counter() - load_started:.1f}s) ===")
+
+        executor = TranscriptionExecutor(num_workers=1)
+        if not args.no_warmup:
+            # One throwaway pass so graph initialization is not billed to the first file
+            warmup = StreamingSTT(model=model, executor=executor, language=args.language or language_of(args.files[0]))
+            warmup.transcribe_buffer(WavFileSource(args.files[0], trailing_silence=0.0).audio, kind="warmup")
+
+        print(f"{'file':<14}{'lang':>5}{'speech':>8}{'final':>9}{'partials':>10}{'p-mean':>9}{'p-max':>9}{'rtf':>7}  text")
+        try:
+            for path in args.files:
+                for _ in range(args.repeat):
+                    r = run_file(model, executor, path, speed, args.language)
+                    rtf = "-" if r["rtf"] is None else f"{r['rtf']:.2f}"
+                    print(
+                        f"{r['file']:<14}{r['language']:>5}{r['speech_seconds']:>7.1f}s{_ms(r['time_to_final']):>9}"
+                        f"{r['partials']:>10}{_ms(r['partial_mean']):>9}{_ms(r['partial_max']):>9}"
+                        f"{rtf:>7}  {r['message']}"
+                    )
+                    print(f"{'':<14}{r['vad']}")
+        finally:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+context_builder.py
+
+Turns raw web search output into a compact context block for the
+conversation call.
+
+`run_web_search` returns up to 15 title/snippet strings and a Wikipedia
+excerpt; sending all of it inflates prompt tokens and the latency of the
+answer. `build_context`:
+1. splits the wiki excerpt into paragraphs (long ones into sentence groups)
+2. drops near-duplicate passages (word 3-gram Jaccard similarity)
+3. ranks snippets and paragraphs against the query with BM25
+4. packs the best passages into a token budget (`CONTEXT_TOKEN_BUDGET`)
+
+Token counts use tiktoken if it is installed and ~4 characters per token
+otherwise. Every call reports how many tokens packing saved compared with
+what was sent before it existed: the first `BASELINE_WIKI_CHARS` characters
+of the wiki excerpt plus all snippets.
+"""
+
+import math
+import os
+import re
+from collections import Counter
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "600"))
+# Wiki characters the prompt carried before packing; the baseline for "tokens saved"
+BASELINE_WIKI_CHARS = 2500
+
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "for", "is", "are", "was", "were", "be",
+    "it", "its", "this", "that", "with", "as", "by", "from", "what", "who", "when", "where", "how", "why",
+    "which", "do", "does", "did", "me", "my", "i", "you", "your", "about", "tell", "please", "can", "could",
+}
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count of `text` (tiktoken if available, else ~4 chars per token)."""
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _terms(text: str):
+    return [word for word in re.findall(r"\w+", text.lower()) if word not in _STOPWORDS]
+
+
+def split_paragraphs(text: str, max_words: int = 80):
+    """Split wiki text into paragraphs; long paragraphs become sentence groups of <= max_words."""
+    passages = []
+    # Section headings ("== History ==") separate paragraphs but are no content
+    text = re.sub(r"^\s*=+[^=\n]*=+\s*$", "\n", text, flags=re.MULTILINE)
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = " ".join(paragraph.split())
+        if len(paragraph.split()) < 4:
+            continue
+        if len(paragraph.split()) <= max_words:
+            passages.append(paragraph)
+            continue
+        group = []
+        for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+            if group and len(" ".join(group + [sentence]).split()) > max_words:
+                passages.append(" ".join(group))
+                group = []
+            group.append(sentence)
+        if group:
+            passages.append(" ".join(group))
+    return passages
+
+
+def _shingles(text: str, n: int = 3):
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < n:
+        return {tuple(words)}
+    return {tuple(words[i:i + n]) for i in range(len(words) - n + 1)}
+
+
+def dedupe(passages, threshold: float = 0.7):
+    """Drop passages whose 3-gram Jaccard similarity to an earlier one exceeds `threshold`."""
+    kept, kept_shingles = [], []
+    for passage in passages:
+        shingles = _shingles(passage["text"])
+        if any(len(shingles & other) / len(shingles | other) > threshold for other in kept_shingles):
+            continue
+        kept.append(passage)
+        kept_shingles.append(shingles)
+    return kept
+
+
+def bm25_scores(query: str, documents, k1: float = 1.5, b: float = 0.75):
+    """BM25 score of every document for the query terms."""
+    tokenized = [_terms(document) for document in documents]
+    if not tokenized:
+        return []
+    average_length = sum(len(tokens) for tokens in tokenized) / len(tokenized) or 1.0
+    df = Counter(term for tokens in tokenized for term in set(tokens))
+    n = len(tokenized)
+    query_terms = set(_terms(query))
+
+    scores = []
+    for tokens in tokenized:
+        tf = Counter(tokens)
+        score = 0.0
+        for term in query_terms:
+            if term not in tf:
+                continue
+            idf = math.log(1 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(tokens) / average_length))
+        scores.append(score)
+    return scores
+
+
+def build_context(query: str, search_output: dict, token_budget: int = None) -> dict:
+    """Rank, dedupe and pack web search output into a token budget.
+
+    Returns a dict with "wiki" (selected paragraphs) and "recent_searches"
+    (selected snippets), the shape `additional_data` already uses, plus
+    "stats" with token counts: fetched, before (what used to be sent) and after.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    snippets = search_output.get("results", []) or []
+    wiki = search_output.get("wiki", "") or ""
+
+    passages = [{"source": "search", "order": i, "text": text} for i, text in enumerate(snippets)]
+    passages += [{"source": "wiki", "order": i, "text": text} for i, text in enumerate(split_paragraphs(wiki))]
+    snippet_tokens = sum(estimate_tokens(text) for text in snippets)
+    tokens_before = estimate_tokens(wiki[:BASELINE_WIKI_CHARS]) + snippet_tokens
+
+    unique = dedupe(passages)
+    for passage, score in zip(unique, bm25_scores(query, [p["text"] for p in unique])):
+        passage["score"] = score
+        passage["tokens"] = estimate_tokens(passage["text"])
+
+    # Best first; ties keep the sources' own order (search rank, wiki position).
+    # Passages sharing no term with the query only fill up the prompt
+    ranked = sorted(unique, key=lambda p: (-p["score"], p["order"]))
+    if any(p["score"] > 0 for p in ranked):
+        ranked = [p for p in ranked if p["score"] > 0]
+    selected, used = [], 0
+    for passage in ranked:
+        if used + passage["tokens"] > token_budget:
+            continue
+        selected.append(passage)
+        used += passage["tokens"]
+
+    # Wiki paragraphs read best in article order
+    wiki_selected = sorted((p for p in selected if p["source"] == "wiki"), key=lambda p: p["order"])
+    stats = {
+        "passages": len(passages),
+        "duplicates": len(passages) - len(unique),
+        "selected": len(selected),
+        "tokens_fetched": estimate_tokens(wiki) + snippet_tokens,
+        "tokens_before": tokens_before,
+        "tokens_after": used,
+        "tokens_saved": tokens_before - used,
+    }
+    return {
+        "wiki": "\n\n".join(p["text"] for p in wiki_selected),
+        "recent_searches": [p["text"] for p in selected if p["source"] == "search"],
+        "stats": stats,
+    }
+
+
+def report(stats: dict) -> str:
+    saved_share = stats["tokens_saved"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+    return (
+        f"[CONTEXT] {stats['selected']}/{stats['passages']} passages ({stats['duplicates']} duplicates), "
+        f"{stats['tokens_before']} -> {stats['tokens_after']} tokens, saved {stats['tokens_saved']} ({saved_share:.0%}); "
+        f"{stats['tokens_fetched']} fetched"
+    )
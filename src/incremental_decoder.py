@@ -0,0 +1,171 @@
+"""
+incremental_decoder.py
+
+Incremental Whisper decoding for streaming speech, following the
+LocalAgreement policy (as used by whisper_streaming).
+
+Instead of transcribing disjoint slices of audio and gluing the strings
+together, the decoder keeps a rolling window over the current utterance and
+re-decodes it whenever new audio arrived. Words are split into two prefixes:
+- committed: words that two consecutive hypotheses agreed on. They never
+  change again and are passed to Whisper as prompt, so context survives when
+  the window is trimmed.
+- uncommitted: the tail of the latest hypothesis that may still change.
+
+When the utterance ends, the full text is the committed words plus the latest
+hypothesis. If that hypothesis already covers all audio, no additional Whisper
+call is needed and the final message is available right away.
+
+The decoder does not own audio: the window is an absolute sample range into
+an `audio_buffer.AudioRingBuffer` that the audio callback writes into.
+"""
+
+import string
+import threading
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def _normalize_word(word: str) -> str:
+    """Normalize a word for agreement checks (case and punctuation insensitive)."""
+    return word.strip().lower().translate(_PUNCTUATION)
+
+
+class LocalAgreementDecoder:
+    """Rolling-window incremental decoder with committed/uncommitted prefixes.
+
+    Args:
+        ring: `AudioRingBuffer` holding the captured audio.
+        transcribe_words: Callable ``(audio, prompt, kind) -> list[(start, end, word)]``
+            returning word timestamps relative to the start of `audio`.
+        samplerate: Sample rate of the ring buffer audio.
+        max_window: Once the window gets longer than this (seconds), audio up
+            to the last committed word is dropped from it.
+        prompt_chars: How much committed text is passed as prompt.
+    """
+
+    def __init__(self, ring, transcribe_words, samplerate: int = 16000, max_window: float = 12.0, prompt_chars: int = 200):
+        self.ring = ring
+        self.transcribe_words = transcribe_words
+        self.samplerate = samplerate
+        self.max_window = max_window
+        self.prompt_chars = prompt_chars
+        # Protects committed/hypothesis; passes must be applied in order
+        self.lock = threading.Lock()
+        # Protects the window bounds, which the audio thread extends while a pass runs
+        self.audio_lock = threading.Lock()
+        self.reset(ring.total_written)
+
+    def reset(self, start: int):
+        """Forget the current utterance and start a new one at absolute sample `start`."""
+        with self.audio_lock:
+            self.utterance_start = start
+            self.window_start = start  # First sample of the rolling window
+            self.window_end = start  # One past the last sample to decode
+            self.processed_end = start  # window_end at the last decoding pass
+        self.committed = []  # (start, end, word) in utterance time
+        self.hypothesis = []  # Uncommitted tail of the latest hypothesis
+
+    def extend_to(self, end: int):
+        """Grow the window up to absolute sample `end` (exclusive)."""
+        with self.audio_lock:
+            self.window_end = max(self.window_end, end)
+
+    def unprocessed_seconds(self) -> float:
+        """Seconds of audio that arrived since the last decoding pass."""
+        return (self.window_end - self.processed_end) / self.samplerate
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(word for _, _, word in self.committed)
+
+    def _prompt(self) -> str:
+        return self.committed_text[-self.prompt_chars:]
+
+    def _strip_committed(self, words):
+        """Drop words of a new hypothesis that were already committed.
+
+        The window still contains audio of committed words, so Whisper
+        re-transcribes them. Words ending before the last committed word are
+        removed by time, then a short n-gram overlap with the committed tail
+        is removed by text.
+        """
+        if not self.committed:
+            return words
+        last_end = self.committed[-1][1]
+        words = [w for w in words if w[1] > last_end + 0.05]
+        for n in range(min(5, len(self.committed), len(words)), 0, -1):
+            tail = [_normalize_word(w[2]) for w in self.committed[-n:]]
+            head = [_normalize_word(w[2]) for w in words[:n]]
+            if tail == head:
+                return words[n:]
+        return words
+
+    def snapshot(self):
+        """Capture the window for a decoding pass.
+
+        Returns ``(audio, offset, prompt)`` where `audio` is a ring buffer view
+        (or one contiguous copy if it wraps) and marks the audio as submitted,
+        so `unprocessed_seconds` only counts audio no pass has seen yet.
+        """
+        with self.audio_lock:
+            # Never reach back further than the ring buffer still holds
+            self.window_start = max(self.window_start, self.ring.oldest)
+            start, end = self.window_start, self.window_end
+            self.processed_end = end
+        audio = self.ring.read(start, end)
+        offset = (start - self.utterance_start) / self.samplerate
+        return audio, offset, self._prompt()
+
+    def apply(self, words, offset: float) -> str:
+        """Merge the words of a decoding pass into the committed prefix.
+
+        `words` are relative to the snapshot starting at `offset`. Passes
+        must be applied in the order they were snapshotted. Returns the
+        newly committed text (may be empty).
+        """
+        with self.lock:
+            words = [(start + offset, end + offset, word) for start, end, word in words]
+            words = self._strip_committed(words)
+
+            # LocalAgreement-2: commit the longest common prefix of the last two hypotheses
+            agreed = 0
+            for old, new in zip(self.hypothesis, words):
+                if _normalize_word(old[2]) != _normalize_word(new[2]):
+                    break
+                agreed += 1
+            newly_committed = words[:agreed]
+            self.committed.extend(newly_committed)
+            self.hypothesis = words[agreed:]
+
+            self._trim_window()
+            return " ".join(word for _, _, word in newly_committed)
+
+    def process(self, kind: str = "partial") -> str:
+        """Synchronously decode the current window and commit the agreed prefix."""
+        audio, offset, prompt = self.snapshot()
+        return self.apply(self.transcribe_words(audio, prompt, kind), offset)
+
+    def needs_final_pass(self, min_unprocessed: float = 0.3) -> bool:
+        """True if enough audio arrived after the last pass to decode once more."""
+        return self.unprocessed_seconds() > min_unprocessed
+
+    def _trim_window(self):
+        """Drop audio up to the last committed word once the window gets too long."""
+        if not self.committed:
+            return
+        with self.audio_lock:
+            if (self.window_end - self.window_start) / self.samplerate <= self.max_window:
+                return
+            cut = self.utterance_start + int(self.committed[-1][1] * self.samplerate)
+            self.window_start = min(max(self.window_start, cut), self.window_end)
+
+    def finish(self) -> str:
+        """Commit the latest hypothesis and return the full utterance text.
+
+        Run a last pass first if `needs_final_pass` says so.
+        """
+        with self.lock:
+            self.committed.extend(self.hypothesis)
+            self.hypothesis = []
+            return self.committed_text
@@ -1,42 +1,122 @@
 import os
-from openai import OpenAI
 import json
 from dotenv import load_dotenv
-from .system_prompt import router_system_prompt, conversation_system_prompt
+from .system_prompt import router_system_prompt, conversation_system_prompt, history_summary_prompt
+from .cache import ResponseCache
+from .history import ConversationHistory
+from . import local_router
+from .backend import (
+    get_backend, ROUTER_MODEL, CONVERSATION_MODEL, SUMMARY_MODEL,
+    ROUTER_DEADLINE, CONVERSATION_DEADLINE, FIRST_DELTA_DEADLINE, SUMMARY_DEADLINE, HEDGE_DELAY,
+)
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+# Endpoint, models, deadlines, retries and hedging are configured in `backend.py`
+# (LLM_BASE_URL, LLM_*_MODEL, LLM_*_DEADLINE, LLM_RETRIES, LLM_HEDGE_DELAY)
 
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Response caches; router results depend only on the utterance and can live
+# much longer than answers (which may contain the time, scores, ...).
+# LLM_CACHE=0 disables caching, LLM_CACHE_SEMANTIC=<min cosine> enables the semantic tier
+# of the conversation cache. The router cache is exact only: its result carries
+# `corrected_text`, which replaces the user's words, so a near match must never answer.
+# With history enabled the conversation cache is bypassed, since an answer depends
+# on the turns before it.
+CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+_semantic = float(os.getenv("LLM_CACHE_SEMANTIC")) if os.getenv("LLM_CACHE_SEMANTIC") else None
+router_cache = ResponseCache("router", ttl=float(os.getenv("LLM_ROUTER_CACHE_TTL", "86400")))
+conversation_cache = ResponseCache("conversation", ttl=float(os.getenv("LLM_CONVERSATION_CACHE_TTL", "120")), semantic_threshold=_semantic)
 
-# TODO add conversation history for last X prompts and answers
+# Local fast-path router; LOCAL_ROUTER=0 sends everything to the remote router
+LOCAL_ROUTER_ENABLED = os.getenv("LOCAL_ROUTER", "1") != "0"
+LOCAL_ROUTER_THRESHOLD = float(os.getenv("LOCAL_ROUTER_THRESHOLD", "0.55"))
 
-# TODO provide tools that can be used like get_weather(), get_nfl_schedule(), get_joke(), get_waste_collection_schedule()
-# Some tasks don't need the LLM so add another tool choice: basic, if tool resulted in full text output
-def classification(prompt: str):
-    response = client.responses.create(
-        model="gpt-5-nano",
-        input=[
-            {"role": "system", "content": router_system_prompt},
-            {"role": "user", "content": prompt}
-        ]
+# Conversation history: up to HISTORY_TURNS turns verbatim, older ones summarized in the
+# background HISTORY_FOLD_BATCH at a time; HISTORY=0 sends every prompt without context.
+# After HISTORY_MAX_FAILED_FOLDS failed summaries in a row the turns are appended truncated
+HISTORY_ENABLED = os.getenv("HISTORY", "1") != "0"
+HISTORY_TURNS = int(os.getenv("HISTORY_TURNS", "4"))
+HISTORY_FOLD_BATCH = int(os.getenv("HISTORY_FOLD_BATCH", "2"))
+HISTORY_MAX_FAILED_FOLDS = int(os.getenv("HISTORY_MAX_FAILED_FOLDS", "3"))
+
+
+def _summarize_history(previous_summary: str, turns):
+    """Fold `turns` into the rolling summary (runs on the history's background thread)."""
+    transcript = "\n".join(f"User: {turn.user}\nAssistant: {turn.assistant}" for turn in turns)
+    return get_backend().complete(
+        SUMMARY_MODEL,
+        [
+            {"role": "system", "content": history_summary_prompt},
+            {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nDropped turns:\n{transcript}"},
+        ],
+        SUMMARY_DEADLINE,
+    ).text
+
+
+history = (
+    ConversationHistory(
+        HISTORY_TURNS, summarize=_summarize_history, fold_batch=HISTORY_FOLD_BATCH,
+        max_failed_folds=HISTORY_MAX_FAILED_FOLDS,
     )
+    if HISTORY_ENABLED else None
+)
 
-    return response.output_text
 
+# TODO provide get_weather() and get_joke() as tools; time, timers, NFL scores and the
+# waste schedule are answered directly from templates (see tools/registry.py)
+def _classify(prompt: str):
+    backend = get_backend()
+    messages = [
+        {"role": "system", "content": router_system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+    # The router call is small and on the critical path: hedge a slow one (LLM_HEDGE_DELAY)
+    return backend.hedged(lambda: backend.complete(ROUTER_MODEL, messages, ROUTER_DEADLINE).text, HEDGE_DELAY)
 
-def conversation(prompt: str, additional_data=None):
-    """Run a conversational LLM call using `conversation_system_prompt`.
 
-    If `additional_data` is provided it will be included as an extra system
-    context message so the model can use it when producing the reply.
-    ``additional_data`` should be a JSON-serializable object (dict/list).
+def classification(prompt: str):
+    """Return the router JSON for `prompt`.
+
+    Obvious commands are routed locally (see `local_router`); everything
+    else goes to the remote router model.
     """
+    if LOCAL_ROUTER_ENABLED:
+        local = local_router.route(prompt, LOCAL_ROUTER_THRESHOLD)
+        if local is not None:
+            return json.dumps(local, ensure_ascii=False)
+    if not CACHE_ENABLED:
+        return _classify(prompt)
+    return router_cache.get_or_call(router_system_prompt, prompt, lambda: _classify(prompt))
+
+
+def _conversation_cached() -> bool:
+    """Conversation replies are only cached without history (they depend on earlier turns)."""
+    return CACHE_ENABLED and history is None
+
+
+def _additional_key(additional_data) -> str:
+    """Cache key part for the context (search results) of a conversation call."""
+    if additional_data is None:
+        return ""
+    try:
+        return json.dumps(additional_data, ensure_ascii=False, sort_keys=True)
+    except Exception:
+        return str(additional_data)
 
+
+def _conversation_messages(prompt: str, additional_data=None):
+    """Build the message list for a conversational call.
+
+    Order: system prompt, history summary, history turns, additional data,
+    user prompt. The first three only grow between calls, so they form a
+    prefix the provider can serve from its prompt cache; per-turn data goes
+    after them.
+    """
     # Build messages: system prompt first
     messages = [
         {"role": "system", "content": conversation_system_prompt}
     ]
+    if history is not None:
+        messages.extend(history.messages())
 
     # Attach additional data as a system-level context block if provided.
     # Keep it compact JSON to avoid ambiguity.
@@ -49,10 +129,62 @@ def conversation(prompt: str, additional_data=None):
 
     # Then the user message
     messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def conversation(prompt: str, additional_data=None):
+    """Run a conversational LLM call using `conversation_system_prompt`.
+
+    If `additional_data` is provided it will be included as an extra system
+    context message so the model can use it when producing the reply.
+    ``additional_data`` should be a JSON-serializable object (dict/list).
+    """
+    def call():
+        completion = get_backend().complete(
+            CONVERSATION_MODEL, _conversation_messages(prompt, additional_data), CONVERSATION_DEADLINE
+        )
+        if history is not None:
+            history.note_usage(prompt, completion.usage)
+        return completion.text
+
+    if not _conversation_cached():
+        return call()
+    return conversation_cache.get_or_call(conversation_system_prompt, prompt, call, extra=_additional_key(additional_data))
+
+
+def conversation_stream(prompt: str, additional_data=None):
+    """Streaming variant of `conversation` that yields text deltas.
+
+    The reply can be spoken sentence by sentence while the model is still
+    generating. Closing the generator early (e.g. on cancellation) closes
+    the underlying HTTP stream.
+
+    A cached reply is yielded as a single delta; a streamed reply is cached
+    only if it was received completely.
+    """
+    use_cache = _conversation_cached()
+    extra = _additional_key(additional_data)
+    if use_cache:
+        cached = conversation_cache.get(conversation_system_prompt, prompt, extra)
+        if cached is not None:
+            yield cached
+            return
 
-    response = client.responses.create(
-        model="gpt-5-mini",
-        input=messages
+    on_usage = (lambda usage: history.note_usage(prompt, usage)) if history is not None else None
+    stream = get_backend().stream(
+        CONVERSATION_MODEL,
+        _conversation_messages(prompt, additional_data),
+        CONVERSATION_DEADLINE,
+        first_delta_deadline=FIRST_DELTA_DEADLINE,
+        on_usage=on_usage,
     )
+    parts = []
+    try:
+        for delta in stream:
+            parts.append(delta)
+            yield delta
+    finally:
+        stream.close()
 
-    return response.output_text
\ No newline at end of file
+    if use_cache and parts:
+        conversation_cache.put(conversation_system_prompt, prompt, "".join(parts), extra)
@@ -0,0 +1,297 @@
+"""
+backend.py
+
+LLM backend used by `llm/api.py`: one OpenAI-compatible Responses API
+endpoint behind a small interface (`complete`, `stream`, `hedged`).
+
+- `LLM_BASE_URL` selects the endpoint (default: OpenAI). Any server speaking
+  the Responses API works, e.g. `bench/fake_llm_server.py` for offline load
+  tests.
+- Model names come from `LLM_ROUTER_MODEL`, `LLM_CONVERSATION_MODEL` and
+  `LLM_SUMMARY_MODEL`.
+- Every call has a deadline. Timeouts, connection errors, 429 and 5xx
+  responses are retried with full jitter backoff (`LLM_RETRIES`), as long as
+  the deadline allows. A stream is only retried before its first delta.
+- One HTTP client with a keep-alive pool (`LLM_MAX_CONNECTIONS`) is shared by
+  all calls, and `preconnect()` opens a connection during startup. The
+  first request therefore skips the TCP/TLS handshake.
+- `hedged()` starts a second identical request when the first has not
+  answered after `LLM_HEDGE_DELAY` seconds, and uses whichever answers
+  first. It is meant for the small, latency-critical router call.
+"""
+
+import os
+import queue
+import random
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") or None
+
+ROUTER_MODEL = os.getenv("LLM_ROUTER_MODEL", "gpt-5-nano")
+CONVERSATION_MODEL = os.getenv("LLM_CONVERSATION_MODEL", "gpt-5-mini")
+SUMMARY_MODEL = os.getenv("LLM_SUMMARY_MODEL", ROUTER_MODEL)
+
+# Seconds per call, including retries
+ROUTER_DEADLINE = float(os.getenv("LLM_ROUTER_DEADLINE", "6"))
+CONVERSATION_DEADLINE = float(os.getenv("LLM_CONVERSATION_DEADLINE", "30"))
+FIRST_DELTA_DEADLINE = float(os.getenv("LLM_FIRST_DELTA_DEADLINE", "10"))
+SUMMARY_DEADLINE = float(os.getenv("LLM_SUMMARY_DEADLINE", "20"))
+
+RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.2"))
+HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "0"))  # 0 disables hedging
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "8"))
+KEEPALIVE_SECONDS = float(os.getenv("LLM_KEEPALIVE_SECONDS", "120"))
+
+_RETRYABLE_ERRORS = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class Completion:
+    """Text and token usage of a finished call."""
+
+    __slots__ = ("text", "usage")
+
+    def __init__(self, text: str, usage: dict = None):
+        self.text = text
+        self.usage = usage
+
+
+def usage_dict(usage) -> dict:
+    """Token usage of a Responses API call as a plain dict (None if not reported)."""
+    if usage is None:
+        return None
+    details = getattr(usage, "input_tokens_details", None)
+    return {
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "cached_tokens": getattr(details, "cached_tokens", None) if details is not None else None,
+        "output_tokens": getattr(usage, "output_tokens", None),
+    }
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, DeadlineExceeded):
+        return False
+    if type(error).__name__ in _RETRYABLE_ERRORS or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status in (408, 409, 429) or (status is not None and status >= 500)
+
+
+def _warm_stream_events():
+    """Build the SDK's stream event schema now; it is built lazily on the first event (~0.5 s)."""
+    try:
+        from openai._models import construct_type
+        from openai.types.responses import ResponseStreamEvent
+
+        construct_type(type_=ResponseStreamEvent, value={"type": "response.output_text.delta", "delta": ""})
+    except Exception:
+        pass
+
+
+class Backend:
+    """OpenAI-compatible Responses API backend.
+
+    Args:
+        base_url: API base URL; defaults to `LLM_BASE_URL` (OpenAI if unset).
+        api_key: Defaults to `OPENAI_API_KEY`.
+        max_connections: Size of the keep-alive connection pool.
+        retries: Retries per call after the first attempt.
+        retry_base_delay: Backoff base; attempt n sleeps uniform(0, base * 2**n).
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        api_key: str = None,
+        max_connections: int = MAX_CONNECTIONS,
+        retries: int = RETRIES,
+        retry_base_delay: float = RETRY_BASE_DELAY,
+    ):
+        self.base_url = base_url or LLM_BASE_URL
+        self.api_key = api_key or OPENAI_API_KEY
+        self.max_connections = max_connections
+        self.retries = retries
+        self.retry_base_delay = retry_base_delay
+        self._client = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retried = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def client(self):
+        """The OpenAI client, created on first use (importing openai is slow)."""
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                # A local stand-in needs no key, but the client insists on one
+                api_key = self.api_key or ("local" if self.base_url else None)
+                self._client = OpenAI(
+                    api_key=api_key,
+                    base_url=self.base_url,
+                    max_retries=0,  # Retries are ours, bounded by the call's deadline
+                    http_client=self._http_client(),
+                )
+            return self._client
+
+    def _http_client(self):
+        """Keep-alive pool for the client; None (SDK default pool) if it cannot be configured."""
+        try:
+            import httpx
+            from openai import DefaultHttpxClient
+
+            return DefaultHttpxClient(limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=KEEPALIVE_SECONDS,
+            ))
+        except Exception:
+            return None
+
+    def preconnect(self):
+        """Create the client and open a pooled connection (startup warmup)."""
+        client = self.client
+        _warm_stream_events()
+        try:
+            client.with_options(timeout=5.0).models.list()
+        except Exception as e:
+            # Only a warmup; the endpoint may not implement /models
+            print("[LLM] Preconnect:", type(e).__name__)
+
+    def _with_retries(self, call, deadline: float):
+        """Run ``call(timeout)`` until it succeeds, retrying transient errors before `deadline`."""
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded("LLM call deadline exceeded")
+            try:
+                return call(remaining)
+            except Exception as e:
+                if attempt >= self.retries or not is_retryable(e):
+                    raise
+                delay = random.uniform(0, self.retry_base_delay * 2 ** attempt)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                with self._lock:
+                    self.retried += 1
+                print(f"[LLM] {type(e).__name__}, retry {attempt}/{self.retries} in {delay * 1000:.0f}ms")
+                time.sleep(delay)
+
+    def complete(self, model: str, messages, deadline: float) -> Completion:
+        """Non-streaming call; `deadline` is in seconds from now."""
+        with self._lock:
+            self.calls += 1
+
+        def call(timeout):
+            return self.client.with_options(timeout=timeout).responses.create(model=model, input=messages)
+
+        response = self._with_retries(call, time.monotonic() + deadline)
+        return Completion(response.output_text, usage_dict(getattr(response, "usage", None)))
+
+    def stream(self, model: str, messages, deadline: float, first_delta_deadline: float = None, on_usage=None):
+        """Yield text deltas of a streaming call.
+
+        Opening the stream is retried within `first_delta_deadline`; once
+        text has been yielded the call is never repeated. `on_usage(dict)` is
+        called with the reported usage when the response completes.
+        Closing the generator closes the HTTP stream.
+        """
+        with self._lock:
+            self.calls += 1
+        started = time.monotonic()
+        first_delta_deadline = min(first_delta_deadline or deadline, deadline)
+
+        def open_stream(timeout):
+            return self.client.with_options(timeout=timeout).responses.create(model=model, input=messages, stream=True)
+
+        stream = self._with_retries(open_stream, started + first_delta_deadline)
+        try:
+            for event in stream:
+                if event.type == "response.output_text.delta":
+                    yield event.delta
+                elif event.type == "response.completed" and on_usage is not None:
+                    on_usage(usage_dict(getattr(event.response, "usage", None)))
+                if time.monotonic() - started > deadline:
+                    raise DeadlineExceeded("LLM stream deadline exceeded")
+        finally:
+            stream.close()
+
+    def hedged(self, call, delay: float = HEDGE_DELAY):
+        """Run ``call()``; if it has not returned after `delay` seconds, race a second one.
+
+        Returns the first successful result; raises only if both fail.
+        """
+        if delay <= 0:
+            return call()
+
+        results = queue.Queue()
+
+        def run(index):
+            try:
+                results.put((index, call(), None))
+            except Exception as e:
+                results.put((index, None, e))
+
+        threading.Thread(target=run, args=(0,), daemon=True).start()
+        try:
+            index, result, error = results.get(timeout=delay)
+            started = 1
+        except queue.Empty:
+            with self._lock:
+                self.hedges += 1
+            threading.Thread(target=run, args=(1,), daemon=True).start()
+            index, result, error = results.get()
+            started = 2
+
+        if error is not None and started == 1:
+            # The only request failed fast; hedging is for slow answers, not errors
+            raise error
+        if error is not None:
+            index, result, error = results.get()
+        if error is not None:
+            raise error
+        if index == 1:
+            with self._lock:
+                self.hedge_wins += 1
+        return result
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "retried": self.retried, "hedges": self.hedges, "hedge_wins": self.hedge_wins}
+
+    def report(self) -> str:
+        return (
+            f"[LLM] {self.base_url or 'openai'}: {self.calls} calls, {self.retried} retries, "
+            f"{self.hedges} hedged ({self.hedge_wins} won by the hedge)"
+        )
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> Backend:
+    """Process-wide backend, so all calls share one connection pool."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = Backend()
+        return _backend
+
+
+def preconnect():
+    """Warmup for `main`: create the shared client and open a connection."""
+    get_backend().preconnect()
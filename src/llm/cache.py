@@ -0,0 +1,275 @@
+"""
+cache.py
+
+Response cache for the LLM calls in `api.py`.
+
+Repeated commands ("what time is it in Tokyo", a question asked again after
+a misheard answer) should not pay a full OpenAI round trip. Responses are
+cached per call type with their own TTL:
+- exact tier: key = hash of the system prompt + normalized prompt (+ extra
+  context such as search results), so editing a system prompt invalidates
+  its entries
+- semantic tier (optional): the nearest cached prompt by embedding cosine
+  similarity above a threshold. Embeddings come from sentence-transformers
+  if installed (`LLM_CACHE_EMBEDDING_MODEL`), otherwise from hashed
+  character n-grams, which catches rephrasings like reordered or
+  slightly misheard words. A hit also needs the same numbers and on/off
+  words, and every other differing word must be a near-spelling of one in
+  the cached prompt: "ten minute timer" never answers "two minute timer",
+  nor "time in Tokyo" "time in Toronto"
+
+`SingleFlight` makes concurrent identical requests share one call.
+"""
+
+import difflib
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    text = re.sub(r"[^\w\s]", " ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+_NUMBER_WORDS = {
+    "zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten",
+    "eleven", "twelve", "fifteen", "twenty", "thirty", "forty", "fifty", "sixty", "hundred",
+    "thousand", "half", "quarter", "first", "second", "third", "last", "next",
+}
+_POLARITY_WORDS = {
+    "on", "off", "up", "down", "open", "close", "start", "stop", "lock", "unlock",
+    "enable", "disable", "increase", "decrease", "more", "less", "not", "no", "dont", "don't",
+}
+
+
+def _exact_terms(words) -> set:
+    """Words a semantic hit must share exactly: numbers and on/off style words."""
+    return {word for word in words if word.isdigit() or word in _NUMBER_WORDS or word in _POLARITY_WORDS}
+
+
+def compatible_prompts(a: str, b: str, min_ratio: float = 0.8) -> bool:
+    """True if normalized prompts `a` and `b` may share a semantic cache entry.
+
+    Numbers and on/off words must match exactly; any other word that only one
+    of them contains must be a near-spelling (misheard word) of one in the other.
+    """
+    words_a, words_b = set(a.split()), set(b.split())
+    if _exact_terms(words_a) != _exact_terms(words_b):
+        return False
+    for only, other in ((words_a - words_b, words_b - words_a), (words_b - words_a, words_a - words_b)):
+        for word in only:
+            if not any(difflib.SequenceMatcher(None, word, candidate).ratio() >= min_ratio for candidate in other):
+                return False
+    return True
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class HashedNgramEmbedder:
+    """Dependency-free embeddings: hashed character trigrams, L2 normalized."""
+
+    def __init__(self, dim: int = 1024, n: int = 3):
+        self.dim = dim
+        self.n = n
+
+    def __call__(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        padded = f" {text} "
+        for i in range(len(padded) - self.n + 1):
+            gram = padded[i:i + self.n].encode("utf-8")
+            vector[int.from_bytes(hashlib.md5(gram).digest()[:4], "little") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+
+    def __call__(self, text: str) -> np.ndarray:
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Shared embedder: sentence-transformers if configured and installed, else hashed n-grams."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            model_name = os.getenv("LLM_CACHE_EMBEDDING_MODEL", "")
+            if model_name:
+                try:
+                    _embedder = SentenceTransformerEmbedder(model_name)
+                except ImportError as e:
+                    print(f"[LLM CACHE] sentence-transformers unavailable ({e}), using n-gram embeddings")
+            if _embedder is None:
+                _embedder = HashedNgramEmbedder()
+        return _embedder
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> (done event, result holder)
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = (threading.Event(), {})
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+        done, holder = call
+
+        if not leader:
+            done.wait()
+            if "error" in holder:
+                raise holder["error"]
+            return holder["value"]
+
+        try:
+            holder["value"] = fn()
+            return holder["value"]
+        except BaseException as e:
+            holder["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            done.set()
+
+
+class ResponseCache:
+    """TTL cache of LLM responses with an optional semantic tier.
+
+    Args:
+        name: Shown in the stats report.
+        ttl: Seconds an entry stays valid.
+        max_entries: LRU bound of the cache.
+        semantic_threshold: Minimum cosine similarity for a semantic hit;
+            None disables the semantic tier.
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 512, semantic_threshold: float = None):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.semantic_threshold = semantic_threshold
+        # key -> (expires_at, scope, normalized prompt, embedding or None, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.flight = SingleFlight()
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(system_prompt: str, prompt: str, extra: str = "") -> tuple:
+        """Return (key, scope): scope groups entries a semantic hit may come from."""
+        scope = text_hash(system_prompt + "\0" + extra)
+        return text_hash(scope + "\0" + normalize_prompt(prompt)), scope
+
+    def get(self, system_prompt: str, prompt: str, extra: str = ""):
+        """Return the cached response or None."""
+        key, scope = self.make_key(system_prompt, prompt, extra)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[4]
+
+        if self.semantic_threshold is not None:
+            value = self._semantic_lookup(scope, normalize_prompt(prompt), now)
+            if value is not None:
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _semantic_lookup(self, scope, normalized, now):
+        embedding = get_embedder()(normalized)
+        best, best_score = None, self.semantic_threshold
+        with self._lock:
+            for entry in self._entries.values():
+                if entry[1] != scope or entry[0] <= now or entry[3] is None:
+                    continue
+                score = float(np.dot(embedding, entry[3]))
+                if score >= best_score and compatible_prompts(normalized, entry[2]):
+                    best, best_score = entry, score
+            if best is not None:
+                self.semantic_hits += 1
+                print(f"[LLM CACHE] {self.name}: semantic hit ({best_score:.2f}) '{best[2]}'")
+                return best[4]
+        return None
+
+    def put(self, system_prompt: str, prompt: str, value, extra: str = ""):
+        key, scope = self.make_key(system_prompt, prompt, extra)
+        normalized = normalize_prompt(prompt)
+        embedding = get_embedder()(normalized) if self.semantic_threshold is not None else None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, scope, normalized, embedding, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_call(self, system_prompt: str, prompt: str, fn, extra: str = ""):
+        """Return the cached response, or run `fn()` once (even for concurrent callers) and cache it."""
+        value = self.get(system_prompt, prompt, extra)
+        if value is not None:
+            return value
+
+        def call():
+            result = fn()
+            if result:  # Never cache empty replies
+                self.put(system_prompt, prompt, result, extra)
+            return result
+
+        return self.flight.do(self.make_key(system_prompt, prompt, extra)[0], call)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.semantic_hits + self.misses
+        return {
+            "name": self.name,
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "coalesced": self.flight.coalesced,
+            "hit_rate": (self.hits + self.semantic_hits) / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (
+            f"[LLM CACHE] {s['name']}: {s['hits']} hits, {s['semantic_hits']} semantic, {s['misses']} misses "
+            f"({s['hit_rate']:.0%}), {s['coalesced']} coalesced, {s['entries']} entries"
+        )
@@ -0,0 +1,210 @@
+"""
+history.py
+
+Bounded conversation history for `conversation()`.
+
+The last `max_turns` exchanges are sent verbatim; older ones are folded into
+a rolling summary by a background worker after the reply that pushed them
+out, `fold_batch` at a time, so the prompt stays bounded and no turn waits
+for the summary call.
+Until a fold has finished, the turns it covers are still sent verbatim.
+A failed fold is retried with the next one; after `max_failed_folds`
+failures in a row the waiting turns are cut short and appended to the
+summary without the model, so they cannot pile up while the summarizer is
+down.
+
+`messages()` returns the history in a stable order: summary first, then the
+turns oldest to newest. Placed right after the static system prompt (and
+before per-turn data such as search results), everything but the newest
+turn is the same prefix as in the previous request, which the provider's
+prompt caching can reuse. The summary only changes when a batch is folded.
+
+Token counts per turn are estimated locally (`context_builder.estimate_tokens`)
+and complemented with the usage the API reports (input / cached / output).
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from context_builder import estimate_tokens
+
+# Characters kept per side of a turn, and of the whole summary, when turns are
+# appended without the summarizer
+DIGEST_TURN_CHARS = 160
+DIGEST_SUMMARY_CHARS = 1500
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def digest_summary(previous_summary: str, turns, max_chars: int = DIGEST_SUMMARY_CHARS) -> str:
+    """Summary with `turns` appended as truncated lines, oldest lines cut first."""
+    lines = [previous_summary] if previous_summary else []
+    for turn in turns:
+        lines.append(f"User: {_clip(turn.user, DIGEST_TURN_CHARS)} / Assistant: {_clip(turn.assistant, DIGEST_TURN_CHARS)}")
+    text = "\n".join(lines)
+    if len(text) > max_chars:
+        text = text[-max_chars:]
+        text = text.split("\n", 1)[1] if "\n" in text else text
+    return text
+
+
+class Turn:
+    """One user message and the spoken answer."""
+
+    __slots__ = ("user", "assistant", "user_tokens", "assistant_tokens", "usage")
+
+    def __init__(self, user: str, assistant: str, usage: dict = None):
+        self.user = user
+        self.assistant = assistant
+        self.user_tokens = estimate_tokens(user)
+        self.assistant_tokens = estimate_tokens(assistant)
+        self.usage = usage
+
+    def messages(self):
+        return [{"role": "user", "content": self.user}, {"role": "assistant", "content": self.assistant}]
+
+
+class ConversationHistory:
+    """Last `max_turns` turns verbatim plus a rolling summary of older ones.
+
+    Args:
+        max_turns: Turns kept verbatim at most.
+        fold_batch: Turns folded at once when the window overflows. Folding
+            in batches keeps the summary (and so the cached prefix) unchanged
+            for `fold_batch - 1` turns between folds.
+        summarize: ``summarize(previous_summary, turns)`` returning the new
+            summary text; called on a background thread. Without it, old
+            turns are dropped.
+        max_failed_folds: Failed folds in a row after which the waiting
+            turns go into the summary as truncated lines (`digest_summary`).
+    """
+
+    def __init__(self, max_turns: int = 4, summarize=None, fold_batch: int = 2, max_failed_folds: int = 3):
+        self.max_turns = max_turns
+        self.fold_batch = max(1, min(fold_batch, max_turns))
+        self.summarize = summarize
+        self.summary = ""
+        self._turns = deque()
+        self._folding = []  # Turns out of the window whose fold has not finished yet
+        self._usage = {}  # user prompt -> usage reported by the API
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-summary")
+        self._pending = None
+        self.max_failed_folds = max(1, max_failed_folds)
+        self.failed_folds = 0  # Failures since the last successful fold
+        self.folds = 0
+        self.digested = 0  # Turns appended to the summary without the summarizer
+
+    def note_usage(self, prompt: str, usage: dict):
+        """Usage reported for the conversation call answering `prompt`; attached by `add_turn`."""
+        with self._lock:
+            self._usage[prompt] = usage
+
+    def add_turn(self, user: str, assistant: str):
+        """Record a finished exchange; folds turns beyond `max_turns` in the background."""
+        if not user or not assistant:
+            return
+        with self._lock:
+            self._turns.append(Turn(user, assistant, self._usage.pop(user, None)))
+            self._usage.clear()
+            if len(self._turns) <= self.max_turns:
+                return
+            evicted = [self._turns.popleft() for _ in range(min(self.fold_batch, len(self._turns)))]
+            if self.summarize is None:
+                return
+            self._folding.extend(evicted)
+            self._pending = self._executor.submit(self._fold)
+
+    def _fold(self):
+        # Everything still waiting, so turns of a failed fold are retried with the next one
+        with self._lock:
+            previous = self.summary
+            turns = list(self._folding)
+        if not turns:
+            return
+        try:
+            summary = (self.summarize(previous, turns) or "").strip()
+        except Exception as e:
+            print("[HISTORY] Summary failed:", str(e))
+            with self._lock:
+                self.failed_folds += 1
+                if self.failed_folds < self.max_failed_folds:
+                    return
+                print(f"[HISTORY] {self.failed_folds} summaries failed, appending {len(turns)} turns truncated")
+                self.summary = digest_summary(self.summary, turns)
+                self.digested += len(turns)
+                self.failed_folds = 0
+                self._remove_folding(turns)
+            return
+        with self._lock:
+            self.summary = summary
+            self.failed_folds = 0
+            self._remove_folding(turns)
+            self.folds += 1
+
+    def _remove_folding(self, turns):
+        for turn in turns:
+            if turn in self._folding:
+                self._folding.remove(turn)
+
+    def wait(self, timeout: float = None):
+        """Block until the latest background fold has finished (for tests and benchmarks)."""
+        pending = self._pending
+        if pending is not None:
+            pending.result(timeout)
+
+    def messages(self):
+        """History messages for the request: summary, then turns oldest first."""
+        with self._lock:
+            summary = self.summary
+            turns = list(self._folding) + list(self._turns)
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": "Summary of the earlier conversation:\n" + summary})
+        for turn in turns:
+            messages.extend(turn.messages())
+        return messages
+
+    def token_counts(self) -> dict:
+        """Estimated tokens of the summary and each verbatim turn, plus reported usage."""
+        with self._lock:
+            turns = list(self._folding) + list(self._turns)
+            summary = self.summary
+        per_turn = [
+            {"user": turn.user_tokens, "assistant": turn.assistant_tokens, "usage": turn.usage}
+            for turn in turns
+        ]
+        summary_tokens = estimate_tokens(summary) if summary else 0
+        return {
+            "summary": summary_tokens,
+            "turns": per_turn,
+            "total": summary_tokens + sum(t["user"] + t["assistant"] for t in per_turn),
+        }
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self._turns.clear()
+            self._folding.clear()
+            self._usage.clear()
+
+    def report(self) -> str:
+        counts = self.token_counts()
+        last = counts["turns"][-1] if counts["turns"] else None
+        line = (
+            f"[HISTORY] {len(counts['turns'])} turns verbatim, summary {counts['summary']} tokens "
+            f"({self.folds} folds), history {counts['total']} tokens"
+        )
+        if self.digested:
+            line += f"; {self.digested} turns appended without the summarizer"
+        if last and last["usage"]:
+            usage = last["usage"]
+            line += (
+                f"; last call input {usage.get('input_tokens')} (cached {usage.get('cached_tokens')}), "
+                f"output {usage.get('output_tokens')}"
+            )
+        return line
@@ -0,0 +1,208 @@
+"""
+local_router.py
+
+Local fast path for `classification()`.
+
+Obvious commands ("turn off the kitchen light", "set a timer for ten
+minutes", "pause the music", "hello") do not need a remote model to be
+routed. This router answers with the same JSON schema as
+`router_system_prompt`, plus a "confidence" score, from two tiers:
+- rules: keyword/regex patterns for unambiguous commands (high confidence)
+- classifier: TF-IDF (word uni- and bigrams) nearest-centroid over the
+  labelled examples in `EXAMPLES`, running in well under a millisecond
+
+Only categories in `LOCAL_CATEGORIES` are answered locally; questions and
+web searches need the remote router to rewrite the search prompt. Rules for
+actions in `tools/registry.py` (time, NFL scores, ...) are the exception:
+they only match requests the tool answers completely ("nfl scores last
+week", not "nfl scores in week 3"). Utterances that correct themselves go to
+the remote router. Callers use the remote router whenever `route()` returns
+None.
+"""
+
+import math
+import re
+from collections import Counter
+
+import numpy as np
+
+from tools.registry import NFL_SCORES_PATTERN, normalize_utterance
+
+# Categories the local router may answer on its own
+LOCAL_CATEGORIES = {"smart_home", "media_control", "reminder", "chat"}
+
+# (category, tool, action, description, pattern)
+RULES = [
+    ("smart_home", "action", "turn_on_light", "Turn on the lights",
+     r"\b(turn|switch) on (the )?([\w ]+ )?(light|lights|lamp)\b|^(please )?(the )?(\w+ )?lights? on( please)?$"),
+    ("smart_home", "action", "turn_off_light", "Turn off the lights",
+     r"\b(turn|switch) off (the )?([\w ]+ )?(light|lights|lamp)\b|^(please )?(the )?(\w+ )?lights? off( please)?$"),
+    ("smart_home", "action", "dim_light", "Dim the lights", r"\b(dim|brighten) (the )?([\w ]+ )?(light|lights|lamp)\b"),
+    ("smart_home", "action", "set_temperature", "Change the temperature",
+     r"\b(set|turn (up|down)|raise|lower) (the )?(heating|thermostat|temperature|heater)\b"),
+    ("reminder", "action", "cancel_timer", "Cancel the timer", r"\b(cancel|stop|delete) (the |my |all )?(\w+ )?timers?\b"),
+    ("reminder", "action", "timer_status", "Check the time left on the timer",
+     r"\bhow (much time|long) is (left|remaining) on (the |my )?(\w+ )?timer\b|\btime left on (the |my )?timer\b"),
+    ("reminder", "action", "set_timer", "Set a timer",
+     r"\b(set|start) (a |an )?(\w+ )?timer\b|\btimer for\b"),
+    ("reminder", "action", "set_alarm", "Set an alarm", r"\b(set|create) (an |the )?alarm\b|\bwake me (up )?at\b"),
+    ("reminder", "action", "set_reminder", "Create a reminder",
+     r"\bremind me (to|about|at|in|on|that|tomorrow|tonight|later)\b"),
+    ("reminder", "action", "get_waste_collection", "Waste collection schedule",
+     r"\b(trash|garbage|waste|rubbish|recycling|bins?)\b.*\b(collect\w*|pick ?up|picked up)\b|\bwhich bins?\b"),
+    ("question", "action", "get_time", "Current time", r"^(what|what's) (is )?the time( now| right now)?$|^what time is it( now| right now)?$"),
+    ("question", "action", "get_date", "Today's date", r"^what('s| is) (the date|today's date)( today)?$|^what day is (it|today)$"),
+    ("web_search", "action", "get_nfl_scores", "NFL scores", NFL_SCORES_PATTERN),
+    ("media_control", "action", "pause_media", "Pause playback", r"^(please )?(pause|stop) (the )?(music|song|playback|podcast|video)\b"),
+    ("media_control", "action", "resume_media", "Resume playback", r"^(please )?(resume|continue|unpause) (the )?(music|song|playback|podcast|video)?\b"),
+    ("media_control", "action", "next_track", "Skip to the next track", r"\b(next|skip (this|the)?) ?(song|track)\b|^skip$"),
+    ("media_control", "action", "change_volume", "Change the volume", r"\bvolume (up|down)\b|\b(turn|make) it (louder|quieter)\b|\b(louder|quieter)$"),
+    ("media_control", "action", "play_music", "Play music", r"^(please )?play (some |the |my )?[\w' ]*(music|song|songs|playlist|album|radio|podcast)\b"),
+    ("chat", "llm", None, "Greeting or small talk",
+     r"^(hi|hello|hey|hey there|good (morning|afternoon|evening|night)|thanks|thank you|how are you( doing)?( today)?)$"),
+    ("chat", "llm", None, "Tell a joke", r"\btell me (a |another )?joke\b"),
+]
+_CORRECTION = re.compile(r"\b(no|actually|i mean|wait|instead|scratch that|never ?mind)\b")
+
+_COMPILED_RULES = [(category, tool, action, description, re.compile(pattern)) for category, tool, action, description, pattern in RULES]
+
+# Labelled seed utterances for the classifier, per category
+EXAMPLES = {
+    "smart_home": [
+        "turn on the living room light", "switch off the kitchen lamp", "lights off please",
+        "make it warmer in here", "set the thermostat to twenty degrees", "turn the heating down",
+        "is the front door locked", "close the blinds", "open the garage door", "turn on the fan",
+    ],
+    "media_control": [
+        "play some jazz", "pause the music", "next song", "skip this track", "turn the volume up",
+        "play my workout playlist", "resume the podcast", "stop the music", "play the radio", "make it louder",
+    ],
+    "reminder": [
+        "set a timer for ten minutes", "remind me to call mom tomorrow", "wake me up at seven",
+        "set an alarm for six thirty", "how much time is left on my timer", "cancel the timer",
+        "remind me to take out the trash tonight", "add a meeting to my calendar", "start a five minute timer",
+    ],
+    "chat": [
+        "hello", "hi there", "good morning", "how are you", "tell me a joke", "thank you",
+        "what's your name", "you are funny", "i'm bored", "do you like music", "good night",
+    ],
+    "question": [
+        "how far is the moon", "why is the sky blue", "what is the capital of france",
+        "how many legs does a spider have", "what is photosynthesis", "how do airplanes fly",
+        "what does dna stand for", "how many days are in a leap year", "who wrote romeo and juliet",
+    ],
+    "web_search": [
+        "what's the weather tomorrow", "who won the game last night", "latest news about the election",
+        "what time is it in tokyo", "how did the stock market do today", "what are the nfl scores",
+        "when does the store close today", "what's the price of bitcoin", "is it going to rain today",
+    ],
+    "web_search_with_wiki": [
+        "who was albert einstein", "tell me about the roman empire", "what is the history of the eiffel tower",
+        "who is the president of brazil", "explain the french revolution", "what is quantum computing",
+        "who invented the telephone", "tell me about mount everest",
+    ],
+    "translation": [
+        "translate good morning into german", "how do you say thank you in spanish", "what is cat in french",
+        "translate this to italian", "what does danke mean",
+    ],
+}
+
+
+def _tokens(text: str):
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class TfidfCentroidClassifier:
+    """Nearest-centroid classifier on L2-normalized TF-IDF vectors."""
+
+    def __init__(self, examples: dict):
+        documents = [(category, _tokens(text)) for category, texts in examples.items() for text in texts]
+        df = Counter(token for _, tokens in documents for token in set(tokens))
+        self.vocabulary = {token: i for i, token in enumerate(sorted(df))}
+        n = len(documents)
+        self.idf = np.array([math.log((1 + n) / (1 + df[token])) + 1.0 for token in sorted(df)], dtype=np.float32)
+
+        self.categories = sorted(examples)
+        centroids = np.zeros((len(self.categories), len(self.vocabulary)), dtype=np.float32)
+        for category, tokens in documents:
+            centroids[self.categories.index(category)] += self._vector(tokens)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.maximum(norms, 1e-9)
+
+    def _vector(self, tokens):
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for token, count in Counter(tokens).items():
+            index = self.vocabulary.get(token)
+            if index is not None:
+                vector[index] = (1.0 + math.log(count)) * self.idf[index]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def predict(self, text: str):
+        """Return (category, confidence).
+
+        Confidence combines the best cosine similarity with its margin over
+        the runner-up, so both unknown vocabulary and ties score low.
+        """
+        scores = self.centroids @ self._vector(_tokens(text))
+        order = np.argsort(scores)[::-1]
+        best, second = float(scores[order[0]]), float(scores[order[1]])
+        if best <= 0:
+            return None, 0.0
+        margin = (best - second) / best
+        return self.categories[order[0]], min(1.0, best) * 0.5 + margin * 0.5
+
+
+_classifier = None
+
+
+def _get_classifier():
+    global _classifier
+    if _classifier is None:
+        _classifier = TfidfCentroidClassifier(EXAMPLES)
+    return _classifier
+
+
+def _result(text, category, tool, action, description, confidence, source):
+    result = {
+        "corrected_text": "unchanged",
+        "intent": {"category": category, "description": description or text},
+        "tool": tool,
+        "confidence": round(confidence, 3),
+        "source": source,
+    }
+    if action:
+        result["action"] = action
+    return result
+
+
+def classify(text: str) -> dict:
+    """Local prediction for `text` in the router schema (any category, with confidence)."""
+    normalized = normalize_utterance(text)
+
+    for category, tool, action, description, pattern in _COMPILED_RULES:
+        if pattern.search(normalized):
+            return _result(text, category, tool, action, description, 0.95, "rule")
+
+    category, confidence = _get_classifier().predict(normalized)
+    if category is None:
+        return _result(text, "other", "llm", None, None, 0.0, "classifier")
+    # The classifier only picks a category, actions come from the rules
+    return _result(text, category, "llm", None, None, confidence, "classifier")
+
+
+def route(text: str, threshold: float = 0.55):
+    """Return the local routing result, or None if the remote router should decide.
+
+    Utterances that correct themselves ("stop the timer? no, play the next
+    song") always go to the remote router: a rule would act on the wrong part.
+    """
+    if _CORRECTION.search(normalize_utterance(text)):
+        return None
+    result = classify(text)
+    if result["source"] == "rule" and result["tool"] == "action":
+        return result
+    if result["intent"]["category"] not in LOCAL_CATEGORIES or result["confidence"] < threshold:
+        return None
+    return result
@@ -14,8 +14,17 @@ You are an assistant router. For each user request:
    - media_control: playing music, videos, podcasts
    - other: anything that doesn't fit above categories
 3. Decide which tool should handle it:
-   - "action" → if it can be executed directly (like turn_on_light, set_timer, play_music)
+   - "action" → if it can be executed directly by one of the actions below
    - "llm" → if it needs reasoning, knowledge, or conversation
+4. For "action", pick the action name from this list (exact spelling):
+   - get_time: the current local time (not the time in another city)
+   - get_date: today's date or weekday
+   - set_timer, cancel_timer, timer_status: kitchen timers
+   - get_nfl_scores: NFL scores or schedule of this, last or next week
+   - get_waste_collection: upcoming trash / recycling collection dates
+   - set_alarm, set_reminder
+   - turn_on_light, turn_off_light, dim_light, set_temperature
+   - play_music, pause_media, resume_media, next_track, change_volume
 
 Output in strict JSON (no extra text):
 
@@ -26,7 +35,7 @@ Output in strict JSON (no extra text):
       "description": "<short description of user's task>"
   },
   "tool": "<'action' or 'llm'>",
-  "action": "<optional action name if tool is 'action'>"
+  "action": "<action name from the list if tool is 'action'>"
 }
 
 Rules:
@@ -126,4 +135,13 @@ Examples
 Be concise, keep answers to a few sentences at most. Assume the timezone of the user is Europe/Berlin.
 '''
 
+history_summary_prompt = '''
+You maintain the running summary of a conversation between a user and a voice assistant.
+You get the current summary and the turns that are dropped from the verbatim history.
+Return the updated summary only:
+- Keep facts that later questions may refer to: names, places, teams, preferences, open tasks, what was already answered.
+- Drop greetings, small talk and anything superseded.
+- Plain text, at most 120 words, no lists, no commentary.
+'''
+
 # TODO always provide timezone/date/time in additional data
\ No newline at end of file
@@ -1,33 +1,68 @@
+import os
 import threading
-import time
-from streaming_stt import WhisperModel, WakeWordActivation, StreamingSTT
-from llm.api import classification, conversation
+from streaming_stt import WakeWordActivation, StreamingSTT
+from transcription_pool import TranscriptionExecutor, whisper_thread_config
+from model_manager import ModelManager, DeferredWhisper
+from audio_bus import AudioBus
+from audio_source import create_source
+from orchestrator import Orchestrator, CancelToken, Cancelled
+from llm.api import classification, conversation_stream, router_cache, conversation_cache, history
+from llm.backend import get_backend, preconnect as preconnect_llm
 from sound import play_thinking, stop_thinking_sound
-from web_search import run_web_search
-from tts import speak
+from web_search import run_web_search, preload as preload_web_search
+from tts import speak, speak_stream, phrase_cache
+from sentence_chunker import iter_chunks
+from speculative import SpeculativeTurn, SEARCH_CATEGORIES
+from context_builder import build_context, report as context_report
+from tools import registry as tool_registry, timers
+from tools.nfl_async import preload as preload_nfl
 import json
 
 
-def setup_services(whisper_model_size: str = "small"):
-    """Initialize and return (whisper_model, stt, activator, stt_thread).
+def setup_services(whisper_model_size: str = "small", transcribe_workers: int = 1, fast_start: bool = None):
+    """Initialize and return (stt, activator, capture_thread).
 
     The caller is responsible for starting/stopping threads and activator.
+    `transcribe_workers` sizes both the Whisper model and the transcription pool.
+    Audio is captured once (from `AUDIO_INPUT`, default microphone) and shared
+    by the wake word detector and the STT.
+
+    With `fast_start` (default, `FAST_START=0` disables it) only Porcupine is
+    loaded before this returns; Whisper, the voices, the LLM client (with an
+    open pooled connection) and the search and NFL tool imports load in the
+    background. Otherwise all models are loaded and warmed up in parallel
+    first.
     """
-    whisper_model = WhisperModel(
-        f"Systran/faster-whisper-{whisper_model_size}",
-        device="cpu",
-        compute_type="int8"
-    )
-    stt = StreamingSTT(model=whisper_model)
-    activator = WakeWordActivation()
-    stt_thread = threading.Thread(target=stt.start_stream, daemon=True)
-    return stt, activator, stt_thread
-
-
-def process_queue_message(msg: str, stt: StreamingSTT):
-    """Process a single transcribed message from the queue.
-
-    Returns True if processing completed and the caller should stop recording.
+    if fast_start is None:
+        fast_start = os.getenv("FAST_START", "1") != "0"
+    _, num_workers = whisper_thread_config(transcribe_workers)
+    models = ModelManager(whisper_model_size, whisper_workers=num_workers)
+    if fast_start:
+        models.start_background(
+            extra_warmups={"llm-backend": preconnect_llm, "web-search": preload_web_search, "nfl-tool": preload_nfl}
+        )
+        whisper_model = DeferredWhisper(models)
+    else:
+        whisper_model = models.load_all().whisper
+    # Timers set by voice announce themselves when they go off
+    timers.set_alarm_handler(lambda timer: speak(f"Your {timer.name()} is done."))
+    executor = TranscriptionExecutor(num_workers=num_workers)
+    bus = AudioBus()
+    source = create_source(os.getenv("AUDIO_INPUT", "mic"), samplerate=bus.samplerate)
+    stt = StreamingSTT(model=whisper_model, executor=executor, bus=bus)
+    activator = WakeWordActivation(bus, porcupine=models.porcupine)
+    # Start recording right at the end of the keyword, on the bus thread
+    activator.add_listener(stt.start_recording)
+    capture_thread = threading.Thread(target=bus.run, args=(source,), daemon=True)
+    return stt, activator, capture_thread
+
+
+def process_queue_message(msg: str, cancel: CancelToken):
+    """Process a single transcribed message.
+
+    Runs on the orchestrator's turn thread. Checks `cancel` between stages
+    (raising `Cancelled`) so a new wake word aborts the turn.
+    Returns True if processing completed.
     """
     print("\n" + "=" * 50)
     print("[QUEUE] Message received:")
@@ -36,8 +71,12 @@ def process_queue_message(msg: str, stt: StreamingSTT):
     # Start thinking sound immediately
     play_thinking()
     
+    # Router, web search and conversation start together; the turn keeps
+    # whatever matches the router's decision
+    turn = SpeculativeTurn(msg, classify=classification, search=run_web_search, converse=conversation_stream)
     try:
-        result = classification(msg)
+        result = turn.classification(cancel)
+        cancel.raise_if_cancelled()
         try:
             parsed = json.loads(result)
             print("[CLASSIFICATION]", json.dumps(parsed, indent=2, ensure_ascii=False))
@@ -46,15 +85,7 @@ def process_queue_message(msg: str, stt: StreamingSTT):
             if isinstance(parsed, dict):
                 intent = parsed.get("intent") or {}
                 category = intent.get("category")
-                # Only run web_search if desired
-                if category == "web_search" or category == "web_search_with_wiki":
-                    prompt = intent.get("description")
-                    web_search_output = run_web_search(prompt, category)
-                    # Print a short summary of results
-                    print("[WEB SEARCH PROMPT]", web_search_output.get("prompt"))
-                    print("[WIKI EXCERPT]", web_search_output.get("wiki"))
-                    print("[RESULTS]", "\n".join(web_search_output.get("results", [])))
-                
+
                 # Build the prompt to send to the LLM safely
                 corrected = parsed.get("corrected_text") or ""
                 try:
@@ -69,80 +100,105 @@ def process_queue_message(msg: str, stt: StreamingSTT):
                 else:
                     llm_prompt = msg
 
-                # Prepare additional_data as a dict
-                additional_data = parsed.get("additional_data") or {}
-                # Attach web search results if available
+                # Deterministic actions (time, timers, scores, ...) answer from their
+                # result template; no conversation call
+                if parsed.get("tool") == "action":
+                    tool_answer = tool_registry.answer(parsed.get("action"), llm_prompt)
+                    if tool_answer is not None:
+                        cancel.raise_if_cancelled()
+                        turn.set_path("direct_tool", f"{tool_answer.tool.name}, {tool_answer.elapsed * 1000:.0f}ms")
+                        answer = speak_stream(
+                            iter_chunks([tool_answer.text]),
+                            voice="en_US",
+                            cancel=cancel,
+                            on_first_audio=stop_thinking_sound,
+                        )
+                        print("[TOOL ANSWER]", answer)
+                        if history is not None:
+                            # Only what was played; cut short by a new wake word, that is a prefix
+                            history.add_turn(llm_prompt, answer)
+                        cancel.raise_if_cancelled()
+                        return True
+
+                # Only run web_search if desired
+                if category in SEARCH_CATEGORIES:
+                    prompt = intent.get("description")
+                    web_search_output = turn.search(prompt, category, cancel)
+                    cancel.raise_if_cancelled()
+                    # Print a short summary of results
+                    print("[WEB SEARCH PROMPT]", web_search_output.get("prompt"))
+                    print("[WIKI EXCERPT]", web_search_output.get("wiki"))
+                    print("[RESULTS]", "\n".join(web_search_output.get("results", [])))
+
+                # Extra context for the conversation call; None when there is none, so the
+                # speculative no-context stream can be reused
+                additional_data = parsed.get("additional_data") or None
+                # Attach the most relevant web search passages, packed into a token budget
                 if 'web_search_output' in locals() and web_search_output:
+                    context = build_context(f"{llm_prompt} {intent.get('description') or ''}", web_search_output)
+                    print(context_report(context["stats"]))
                     additional_data = additional_data or {}
-                    additional_data.setdefault("wiki", web_search_output.get("wiki", ""))
-                    additional_data.setdefault("recent_searches", web_search_output.get("results", []))
-
-                answer = conversation(prompt=llm_prompt, additional_data=additional_data)
+                    additional_data.setdefault("wiki", context["wiki"])
+                    additional_data.setdefault("recent_searches", context["recent_searches"])
+                    turn.set_path("search+conversation")
+                else:
+                    turn.set_path("conversation")
+
+                # Stream the reply and speak it sentence by sentence while it is generated.
+                # The thinking sound stops right before the first sentence plays
+                deltas = turn.conversation(llm_prompt, additional_data, cancel)
+                answer = speak_stream(
+                    iter_chunks(deltas),
+                    voice="en_US",
+                    cancel=cancel,
+                    on_first_audio=stop_thinking_sound,
+                )
                 print("[LLM ANSWER]", answer)
-                
-                # Stop thinking sound before playing the LLM answer
-                stop_thinking_sound()
-                speak(answer, voice="en_US", wait=False)
-                    
-        except Exception:
+                if history is not None:
+                    # Only what was played, also when a new wake word cut the reply short.
+                    # Older turns are summarized in the background, after the reply
+                    history.add_turn(llm_prompt, answer)
+                cancel.raise_if_cancelled()
+
+        except (json.JSONDecodeError, KeyError):
             # If not valid JSON, just print raw
             print("[CLASSIFICATION RAW]", result)
+    except Cancelled:
+        raise
     except Exception as e:
-        print("[CLASSIFICATION ERROR]", str(e))
-    print("=" * 50 + "\n")
-    stt.is_recording = False
+        print("[TURN ERROR]", f"{type(e).__name__}: {e}")
+    finally:
+        stop_thinking_sound()
+        turn.close()
+        print(turn.report())
+        print("=" * 50 + "\n")
     return True
 
-def reset_stt_flags(stt: StreamingSTT):
-    # Reset all flags
-    stt.is_recording = False
-    stt.recording_start_time = None
-    stt.last_speech_time = None
-    stt.last_chunk_time = None
-    stt.in_initial_grace_period = False
-
+def print_session_report(stt):
+    """Print the cache, backend, history and VAD statistics of the session (once, at shutdown)."""
+    print(router_cache.report())
+    print(conversation_cache.report())
+    print(get_backend().report())
+    if phrase_cache is not None:
+        print(phrase_cache.report())
+    if history is not None:
+        print(history.report())
+    print(stt.vad.report())
 
 def main():
-    # Setup services and start background threads
-    stt, activator, stt_thread = setup_services()
-    stt_thread.start()
+    # Setup services; the orchestrator owns the turn state machine
+    stt, activator, capture_thread = setup_services()
+    orchestrator = Orchestrator(stt, activator, process_queue_message)
+    capture_thread.start()
 
     try:
-        while True:
-            activator.wait_for_wake()
-            print("Starting transcription. Speak into your microphone...")
-            stt.is_recording = True  # Activate the transcription via flag
-            stt.in_initial_grace_period = True  # Enable grace period for this recording session
-
-            # Update the last speech times to now
-            now = time.time()
-            stt.recording_start_time = now
-            stt.last_speech_time = None  # Reset to None so grace period works
-            stt.last_chunk_time = now
-
-            # Wait for the transcribed message to appear in the queue
-            try:
-                while True:
-                    time.sleep(0.05)
-                    # TODO fix sometimes "us" of "Atlas" is being transcribed
-                    # TODO fix sometimes "Thank you." is transcribed multiple times (possibly from keyboard noise)
-                    if stt.full_message_queue:
-                        reset_stt_flags(stt)
-                        # Extract latest message
-                        msg = stt.full_message_queue.popleft()
-                        # Process the message and stop recording afterwards
-                        # TODO "wake word, stop" needs to work and stop all running tasks and actions
-                        # TODO Upon saying wake word, abort all current running tasks and actions
-                        process_queue_message(msg, stt)
-                        break
-            except KeyboardInterrupt:
-                print("Stopping transcription after next wake word...")
-                reset_stt_flags(stt)
-                raise
+        orchestrator.run()
     except KeyboardInterrupt:
         print("Stopping transcription...")
+        stt.stop_recording()
     finally:
         activator.stop()
+        print_session_report(stt)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+"""
+model_manager.py
+
+Loads and warms all models at startup so the first utterance is as fast as
+later ones.
+
+Whisper, the Piper voices and Porcupine are loaded in parallel; each one
+then runs a dummy inference (Whisper's first `transcribe` initializes the
+CTranslate2 graph, Piper's first synthesis the ONNX session). Per-model
+load and warmup timings are kept in `timings` and printed by `report()`.
+
+With fast start (`start_background`), only Porcupine is loaded up front so
+the wake word listener is live right away; Whisper, the voices and any extra
+warmups (OpenAI client, search imports) load in the background.
+`DeferredWhisper` stands in for the Whisper model until it is ready.
+
+Voices listed in `TTS_VOICES` (default: every voice in `tts._VOICE_PATHS`
+whose model exists) stay resident unless `TTS_VOICE_BUDGET_MB` forces the
+least recently used ones out, see `tts.VOICE_BUDGET_BYTES`.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import tts
+from streaming_stt import create_porcupine, load_whisper_model
+
+
+class ModelManager:
+    """Parallel loading and warmup of Whisper, Piper and Porcupine.
+
+    Args:
+        whisper_model_size: faster-whisper model size.
+        whisper_workers: Concurrent transcriptions (see `load_whisper_model`).
+        voices: Voice keys to keep resident; defaults to `TTS_VOICES` or all
+            available voices.
+        default_voice: Loaded last so it survives a tight voice budget.
+    """
+
+    def __init__(self, whisper_model_size: str = "small", whisper_workers: int = 1, voices=None, default_voice: str = "en_US"):
+        self.whisper_model_size = whisper_model_size
+        self.whisper_workers = whisper_workers
+        if voices is None:
+            configured = os.getenv("TTS_VOICES", "")
+            voices = [v.strip() for v in configured.split(",") if v.strip()] or tts.available_voices()
+        # The default voice goes last, so the LRU budget keeps it
+        self.voices = sorted(voices, key=lambda key: key == default_voice)
+
+        self.whisper = None
+        self.porcupine = None
+        # name -> {"load": seconds, "warmup": seconds}
+        self.timings = {}
+        self.total = None
+        self._whisper_future = None
+
+    def _timed(self, name, load, warmup):
+        started = time.perf_counter()
+        model = load()
+        loaded = time.perf_counter()
+        warmup(model)
+        self.timings[name] = {"load": loaded - started, "warmup": time.perf_counter() - loaded}
+        return model
+
+    def _load_whisper(self):
+        def warmup(model):
+            # Low noise instead of zeros so the decoder actually runs; word
+            # timestamps warm the alignment path the incremental decoder uses
+            audio = np.random.default_rng(0).normal(0, 0.01, 16000).astype(np.float32)
+            segments, _ = model.transcribe(audio, beam_size=1, language="en", word_timestamps=True, vad_filter=False)
+            list(segments)
+
+        self.whisper = self._timed(
+            f"whisper-{self.whisper_model_size}",
+            lambda: load_whisper_model(self.whisper_model_size, num_workers=self.whisper_workers),
+            warmup,
+        )
+
+    def _load_porcupine(self):
+        def warmup(porcupine):
+            porcupine.process(np.zeros(porcupine.frame_length, dtype=np.int16))
+
+        self.porcupine = self._timed("porcupine", create_porcupine, warmup)
+
+    def _load_voices(self):
+        for key in self.voices:
+            self._timed(f"piper-{key}", lambda key=key: tts._load_voice(key), lambda _, key=key: tts.warm_voice(key))
+
+    def load_all(self):
+        """Load and warm every model in parallel; re-raises the first failure."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-load") as pool:
+            futures = [pool.submit(self._load_whisper), pool.submit(self._load_porcupine), pool.submit(self._load_voices)]
+            for future in futures:
+                future.result()
+        self.total = time.perf_counter() - started
+        print(self.report())
+        return self
+
+    def start_background(self, extra_warmups=None):
+        """Fast start: load Porcupine now and everything else in the background.
+
+        `extra_warmups` maps a name to a callable (e.g. creating the OpenAI
+        client) that is run and timed alongside the models.
+        """
+        started = time.perf_counter()
+        self._load_porcupine()
+
+        pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="model-load")
+        self._whisper_future = pool.submit(self._load_whisper)
+        futures = [self._whisper_future, pool.submit(self._load_voices)]
+        for name, warmup in (extra_warmups or {}).items():
+            futures.append(pool.submit(self._timed, name, warmup, lambda _: None))
+        pool.shutdown(wait=False)
+
+        def report_when_done():
+            for future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    print("[MODELS] Background load failed:", str(e))
+            self.total = time.perf_counter() - started
+            print(self.report())
+
+        threading.Thread(target=report_when_done, daemon=True).start()
+        return self
+
+    def get_whisper(self):
+        """Return the Whisper model, waiting for a background load to finish."""
+        if self.whisper is None and self._whisper_future is not None:
+            self._whisper_future.result()
+        return self.whisper
+
+    def report(self) -> str:
+        lines = [f"[MODELS] ready in {self.total:.2f}s" if self.total is not None else "[MODELS]"]
+        for name, t in self.timings.items():
+            lines.append(f"[MODELS]   {name:<22} load {t['load'] * 1000:7.0f}ms  warmup {t['warmup'] * 1000:6.0f}ms")
+        return "\n".join(lines)
+
+
+class DeferredWhisper:
+    """Stand-in for the Whisper model while it loads in the background.
+
+    `transcribe` blocks until the model is ready, so StreamingSTT can be
+    created (and recording can start) before loading finished.
+    """
+
+    def __init__(self, manager: ModelManager):
+        self.manager = manager
+
+    def transcribe(self, *args, **kwargs):
+        return self.manager.get_whisper().transcribe(*args, **kwargs)
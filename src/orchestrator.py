@@ -0,0 +1,162 @@
+"""
+orchestrator.py
+
+Event-driven turn handling: wake -> record -> transcribe -> respond.
+
+The wake word detector and StreamingSTT post events into one blocking queue
+and a single loop owns the state machine, so nothing polls and no other
+thread flips StreamingSTT flags. Every turn runs with a `CancelToken`; a new
+wake word (or "<wake word>, stop") cancels the running turn, which stops
+the thinking sound and TTS playback and discards pending LLM/search results.
+"""
+
+import queue
+import threading
+
+from sound import stop_thinking_sound
+
+# Utterances that only cancel what is running
+STOP_COMMANDS = {"stop", "cancel", "never mind", "nevermind", "be quiet", "shut up", "quiet"}
+
+IDLE = "idle"
+RECORDING = "recording"
+PROCESSING = "processing"
+
+
+class Cancelled(Exception):
+    """Raised inside a turn once its token was cancelled."""
+
+
+class CancelToken:
+    """Cooperative cancellation flag handed to every stage of a turn.
+
+    Stages that block on something else (a branch result, a delta queue)
+    register a callback that wakes them up, instead of polling the flag.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def add_callback(self, callback):
+        """Call ``callback()`` once when cancelled (right away if already cancelled)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remove_callback(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Sleep up to `timeout` seconds; returns True early if cancelled."""
+        return self._event.wait(timeout)
+
+
+def _is_stop_command(text: str) -> bool:
+    normalized = "".join(c for c in text.lower() if c.isalnum() or c.isspace()).strip()
+    return normalized in STOP_COMMANDS
+
+
+class Orchestrator:
+    """State machine driving the assistant's turns.
+
+    Args:
+        stt: StreamingSTT posting "final" / "no_speech" events.
+        activator: WakeWordActivation posting "wake" events.
+        handle_message: ``handle_message(text, cancel_token)`` producing the
+            answer; runs on its own thread per turn.
+    """
+
+    def __init__(self, stt, activator, handle_message):
+        self.stt = stt
+        self.handle_message = handle_message
+        self.events = queue.Queue()
+        self.state = IDLE
+        self.turn_token = None
+        self.turn_thread = None
+
+        activator.add_listener(lambda position: self.events.put(("wake", position)))
+        stt.add_listener(lambda kind, text: self.events.put((kind, text)))
+
+    def run(self):
+        """Process events until `stop` is called."""
+        while True:
+            kind, payload = self.events.get()
+            if kind == "stop":
+                self._cancel_turn()
+                return
+            handler = getattr(self, f"_on_{kind}", None)
+            if handler is not None:
+                handler(payload)
+
+    def stop(self):
+        self.events.put(("stop", None))
+
+    def _cancel_turn(self):
+        if self.turn_token is not None and not self.turn_token.cancelled:
+            print("[ORCHESTRATOR] Cancelling running turn")
+            self.turn_token.cancel()
+            stop_thinking_sound()
+
+    def _on_wake(self, position):
+        # Recording already started at the keyword end on the bus thread
+        self._cancel_turn()
+        self.state = RECORDING
+        print("Starting transcription. Speak into your microphone...")
+
+    def _on_no_speech(self, _):
+        if self.state == RECORDING:
+            self.state = IDLE
+
+    def _on_final(self, text):
+        if self.state != RECORDING:
+            return
+        if _is_stop_command(text):
+            print("[ORCHESTRATOR] Stop command")
+            self.state = IDLE
+            return
+
+        self.state = PROCESSING
+        token = CancelToken()
+        self.turn_token = token
+        self.turn_thread = threading.Thread(target=self._run_turn, args=(text, token), daemon=True)
+        self.turn_thread.start()
+
+    def _run_turn(self, text, token):
+        try:
+            self.handle_message(text, token)
+        except Cancelled:
+            print("[ORCHESTRATOR] Turn cancelled")
+        except Exception as e:
+            print("[TURN ERROR]", str(e))
+        finally:
+            self.events.put(("turn_done", token))
+
+    def _on_turn_done(self, token):
+        # Ignore turns that were superseded by a newer wake word
+        if token is self.turn_token:
+            self.turn_token = None
+            if self.state == PROCESSING:
+                self.state = IDLE
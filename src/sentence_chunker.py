@@ -0,0 +1,118 @@
+"""
+sentence_chunker.py
+
+Turns a stream of LLM text deltas into speakable pieces for TTS.
+
+A piece is emitted as soon as a sentence ends (., !, ? or a line break
+followed by more text). Long sentences are cut at a clause boundary (, ; :)
+once they exceed `max_chars`, and the very first piece may be a clause as
+short as `first_min_chars`, so the first audio starts as early as possible.
+Dots in numbers ("3.5") and common abbreviations ("Dr.", "e.g.", "No. 5") do
+not end a sentence; a number before a period ("won 24 to 17.") does.
+"""
+
+import re
+
+_ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "approx", "nr", "ca", "fig", "jan", "feb", "mar", "apr", "jun", "jul",
+    "aug", "sep", "sept", "oct", "nov", "dec", "u.s", "a.m", "p.m",
+}
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n+")
+_CLAUSE_END = re.compile(r"[,;:—](?=\s)")
+
+
+def _is_false_sentence_end(text: str, end: int) -> bool:
+    """True if the match ending at `end` is an abbreviation, not a sentence end.
+
+    "No." only counts as one when capitalized and followed by a number
+    ("No. 5"); until the next word has arrived it is not cut either.
+    """
+    if text[end - 1] != ".":
+        return False
+    word = re.search(r"([\w.]+)\.$", text[:end])
+    if word is None:
+        return False
+    token = word.group(1)
+    if token == "No":
+        following = text[end:].lstrip()
+        return not following or following[0].isdigit()
+    token = token.lower()
+    return token in _ABBREVIATIONS or (len(token) == 1 and not token.isdigit())
+
+
+class SentenceChunker:
+    """Incrementally split streamed text into sentence/clause chunks.
+
+    Args:
+        max_chars: Cut at a clause boundary once a sentence gets this long.
+        first_min_chars: The first chunk may end at a clause boundary after
+            this many characters.
+    """
+
+    def __init__(self, max_chars: int = 160, first_min_chars: int = 30):
+        self.max_chars = max_chars
+        self.first_min_chars = first_min_chars
+        self._buffer = ""
+        self._emitted = 0
+
+    def _next_cut(self):
+        """Return the end index of the next complete chunk in the buffer, or None."""
+        for match in _SENTENCE_END.finditer(self._buffer):
+            end = match.end()
+            if not _is_false_sentence_end(self._buffer, end):
+                return end
+
+        if self._emitted == 0 and len(self._buffer) >= self.first_min_chars:
+            for match in _CLAUSE_END.finditer(self._buffer):
+                if match.end() >= self.first_min_chars:
+                    return match.end()
+
+        if len(self._buffer) >= self.max_chars:
+            clause_ends = [match.end() for match in _CLAUSE_END.finditer(self._buffer)]
+            if clause_ends:
+                return clause_ends[-1]
+            if len(self._buffer) >= self.max_chars * 1.5:
+                # No punctuation at all: cut at a word boundary to bound latency
+                space = self._buffer.rfind(" ", 0, self.max_chars)
+                if space > 0:
+                    return space
+        return None
+
+    def feed(self, delta: str):
+        """Add a text delta and return the list of chunks completed by it."""
+        self._buffer += delta
+        chunks = []
+        while True:
+            cut = self._next_cut()
+            if cut is None:
+                break
+            chunk = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if chunk:
+                chunks.append(chunk)
+                self._emitted += 1
+        return chunks
+
+    def flush(self):
+        """Return whatever text is left as a final chunk list."""
+        chunk = self._buffer.strip()
+        self._buffer = ""
+        if chunk:
+            self._emitted += 1
+            return [chunk]
+        return []
+
+
+def iter_chunks(deltas, **kwargs):
+    """Yield speakable chunks from an iterable of text deltas."""
+    chunker = SentenceChunker(**kwargs)
+    for delta in deltas:
+        yield from chunker.feed(delta)
+    yield from chunker.flush()
+
+
+def split_sentences(text: str, **kwargs):
+    """Split a complete text into the chunks the streaming path would produce."""
+    return list(iter_chunks([text], **kwargs))
@@ -0,0 +1,285 @@
+"""
+speculative.py
+
+Speculative execution of a turn's network stages.
+
+Without speculation a web-search turn pays three round trips in a row:
+router -> search -> conversation. `SpeculativeTurn` starts a web search on
+the raw transcript and a no-context conversation call at the same moment as
+the router. Once the router has answered, the branch that matches its
+decision is kept and the rest are discarded:
+- search category: the speculative search results are used, as long as the
+  router's search prompt is the transcript (after `normalize_prompt`);
+  a rewritten prompt gets a search of its own
+- anything else: the speculative conversation stream is used, as long as
+  the router did not correct the transcript (the answer would be for the
+  misheard text otherwise)
+
+Speculation is skipped when the router answers within `grace` seconds (local
+router or cache hit), so obvious commands do not pay for wasted calls.
+Per-stage timings and the latency hidden behind the router are printed by
+`report()`, together with the path that answered the turn (see
+`set_path`). Set `SPECULATIVE=0` to run the stages one after another.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+from llm.cache import normalize_prompt
+from orchestrator import Cancelled
+
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE", "1") != "0"
+
+SEARCH_CATEGORIES = ("web_search", "web_search_with_wiki")
+
+# How turns were answered ("conversation", "search+conversation", "direct_tool"), over the session
+PATH_COUNTS = Counter()
+_path_lock = threading.Lock()
+
+
+class Branch:
+    """Runs ``fn(*args)`` on a daemon thread and records when it ran."""
+
+    def __init__(self, name: str, origin: float, fn, *args, speculative: bool = False):
+        self.name = name
+        self.origin = origin
+        self.speculative = speculative
+        self.used = False
+        self.result = None
+        self.error = None
+        self.started = time.perf_counter()
+        self.finished = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters = []  # Events of `wait` calls, set when the branch finishes
+        threading.Thread(target=self._run, args=(fn, args), daemon=True).start()
+
+    def _run(self, fn, args):
+        try:
+            self.result = fn(*args)
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._lock:
+                self.finished = time.perf_counter()
+                self.done.set()
+                waiters, self._waiters = self._waiters, []
+            for waiter in waiters:
+                waiter.set()
+
+    def wait(self, cancel=None, timeout: float = None):
+        """Return the result, raising its error; raises `Cancelled` once `cancel` fires.
+
+        Blocks on one event that either the branch or `cancel` sets.
+        """
+        wake = threading.Event()
+        with self._lock:
+            if self.done.is_set():
+                wake.set()
+            else:
+                self._waiters.append(wake)
+        if cancel is not None:
+            cancel.add_callback(wake.set)
+        try:
+            wake.wait(timeout)
+        finally:
+            if cancel is not None:
+                cancel.remove_callback(wake.set)
+            with self._lock:
+                if wake in self._waiters:
+                    self._waiters.remove(wake)
+        if not self.done.is_set():
+            if cancel is not None:
+                cancel.raise_if_cancelled()
+            raise TimeoutError(self.name)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def span(self):
+        """(start, end) in seconds since the turn started; end is None while running."""
+        end = None if self.finished is None else self.finished - self.origin
+        return self.started - self.origin, end
+
+
+class StreamBranch(Branch):
+    """Consumes a delta generator on a daemon thread and buffers the deltas.
+
+    The generator is closed on its own thread, so discarding a branch also
+    closes the underlying HTTP stream.
+    """
+
+    _END = object()
+    _CANCELLED = object()
+
+    def __init__(self, name: str, origin: float, generator_fn, *args, speculative: bool = False):
+        self._deltas = queue.Queue()
+        self._discarded = threading.Event()
+        self.first_delta = None
+        super().__init__(name, origin, self._consume, generator_fn, *args, speculative=speculative)
+
+    def _consume(self, generator_fn, *args):
+        deltas = generator_fn(*args)
+        try:
+            for delta in deltas:
+                if self._discarded.is_set():
+                    break
+                if self.first_delta is None:
+                    self.first_delta = time.perf_counter()
+                self._deltas.put(delta)
+        finally:
+            deltas.close()
+            self._deltas.put(self._END)
+
+    def discard(self):
+        self._discarded.set()
+
+    def iter_deltas(self, cancel=None):
+        """Yield buffered and live deltas; re-raises an error of the stream.
+
+        `cancel` wakes the blocked reader by queueing a marker, and is checked
+        before every delta, so a stream that keeps producing stops as well.
+        """
+        self.used = True
+        wake = None
+        if cancel is not None:
+            def wake():
+                self._deltas.put(self._CANCELLED)
+            cancel.add_callback(wake)
+        try:
+            while True:
+                delta = self._deltas.get()
+                if delta is self._CANCELLED or (cancel is not None and cancel.cancelled):
+                    self.discard()
+                    raise Cancelled()
+                if delta is self._END:
+                    break
+                yield delta
+        finally:
+            if wake is not None:
+                cancel.remove_callback(wake)
+        if self.error is not None:
+            raise self.error
+
+    def span(self):
+        # For a stream the first delta is what TTS waits for
+        start, end = super().span()
+        if self.first_delta is not None:
+            end = self.first_delta - self.origin
+        return start, end
+
+
+class SpeculativeTurn:
+    """The network stages of one turn, started speculatively where possible.
+
+    Args:
+        message: Raw transcript.
+        classify: ``classify(text)`` returning the router JSON string.
+        search: ``search(prompt, category)`` returning the web search dict.
+        converse: ``converse(prompt, additional_data)`` yielding text deltas.
+        grace: Seconds to wait for the router before speculating.
+        enabled: Defaults to `SPECULATIVE_ENABLED`.
+    """
+
+    def __init__(self, message: str, classify, search, converse, grace: float = 0.03, enabled: bool = None):
+        self.message = message
+        self.search_fn = search
+        self.converse_fn = converse
+        self.origin = time.perf_counter()
+        self.branches = []
+        self.spec_search = None
+        self.spec_conversation = None
+        self.path = None
+        self.path_detail = None
+
+        self.router = self._start(Branch("router", self.origin, classify, message))
+        enabled = SPECULATIVE_ENABLED if enabled is None else enabled
+        if enabled and not self.router.done.wait(grace):
+            self.spec_search = self._start(
+                Branch("search (speculative)", self.origin, search, message, "web_search_with_wiki", speculative=True)
+            )
+            self.spec_conversation = self._start(
+                StreamBranch("conversation (speculative)", self.origin, converse, message, None, speculative=True)
+            )
+
+    def _start(self, branch):
+        self.branches.append(branch)
+        return branch
+
+    def classification(self, cancel=None):
+        """Wait for the router and return its raw output."""
+        result = self.router.wait(cancel)
+        self.router.used = True
+        return result
+
+    def search(self, prompt: str, category: str, cancel=None):
+        """Web search results for the router's decision.
+
+        The speculative search ran on the raw transcript; it is only reused
+        when the router searches for that same text.
+        """
+        if self.spec_conversation is not None:
+            self.spec_conversation.discard()
+
+        branch = self.spec_search
+        if (
+            branch is None
+            or normalize_prompt(prompt or "") != normalize_prompt(self.message)
+            or (branch.done.is_set() and branch.error is not None)
+        ):
+            branch = self._start(Branch("search", self.origin, self.search_fn, prompt, category))
+        result = dict(branch.wait(cancel))
+        branch.used = True
+        if category != "web_search_with_wiki":
+            result["wiki"] = ""
+        return result
+
+    def conversation(self, prompt: str, additional_data=None, cancel=None):
+        """Reply deltas; reuses the speculative stream when its input matches.
+
+        The speculative stream was started without `additional_data`; any
+        other value, even an empty one, is sent to the model and needs a new call.
+        """
+        branch = self.spec_conversation
+        if branch is None or prompt != self.message or additional_data is not None or branch.error is not None:
+            if branch is not None:
+                branch.discard()
+            branch = self._start(StreamBranch("conversation", self.origin, self.converse_fn, prompt, additional_data))
+        return branch.iter_deltas(cancel)
+
+    def set_path(self, path: str, detail: str = None):
+        """Record how the turn was answered (e.g. "direct_tool", "get_time")."""
+        self.path = path
+        self.path_detail = detail
+        with _path_lock:
+            PATH_COUNTS[path] += 1
+
+    def close(self):
+        """Stop all streams still running (unused branches, or a cancelled reply)."""
+        for branch in self.branches:
+            if isinstance(branch, StreamBranch):
+                branch.discard()
+
+    def report(self) -> str:
+        """Per-stage timings and how much latency speculation hid behind the router."""
+        _, router_end = self.router.span()
+        lines = [f"[TIMING]   {'stage':<28} {'start':>8} {'end':>8}  used"]
+        hidden = 0.0
+        for branch in self.branches:
+            start, end = branch.span()
+            end_text = "-" if end is None else f"{end * 1000:.0f}ms"
+            lines.append(f"[TIMING]   {branch.name:<28} {start * 1000:6.0f}ms {end_text:>8}  {'yes' if branch.used else 'no'}")
+            if branch.speculative and branch.used and router_end is not None:
+                # Work done while waiting for the router would have run after it otherwise
+                finished = end if end is not None else time.perf_counter() - self.origin
+                hidden += max(0.0, min(finished, router_end) - start)
+        lines.append(f"[TIMING]   latency hidden by speculation: {hidden * 1000:.0f}ms")
+        if self.path is not None:
+            detail = f" ({self.path_detail})" if self.path_detail else ""
+            with _path_lock:
+                totals = ", ".join(f"{path}={count}" for path, count in sorted(PATH_COUNTS.items()))
+            lines.append(f"[TIMING]   path: {self.path}{detail}; session: {totals}")
+        return "\n".join(lines)
@@ -1,116 +1,155 @@
-import sounddevice as sd
 import numpy as np
-from faster_whisper import WhisperModel
 import threading
 import time
 from collections import deque
 import os
-import pvporcupine
-import pyaudio
-import struct
 from sound import play_wake_detected, play_wake_off
+from audio_bus import AudioBus
+from audio_source import create_source
+from incremental_decoder import LocalAgreementDecoder
+from transcription_pool import TranscriptionExecutor, whisper_thread_config
+from vad import create_vad
 from dotenv import load_dotenv
 load_dotenv()
 
-# TODO input audio into the file from the outside (so it is able to run in docker)
+def load_whisper_model(model_size: str = "small", num_workers: int = 1):
+    """Load the faster-whisper model of the given size the way the assistant runs it.
+
+    `num_workers` is the number of transcriptions that may run concurrently;
+    the cores are split between them (see `whisper_thread_config`).
+    """
+    # Imported here; faster_whisper (CTranslate2) is the slowest import of the assistant
+    from faster_whisper import WhisperModel
+
+    cpu_threads, num_workers = whisper_thread_config(num_workers)
+    return WhisperModel(
+        f"Systran/faster-whisper-{model_size}",
+        device="cpu",
+        compute_type="int8",
+        cpu_threads=cpu_threads,
+        num_workers=num_workers,
+    )
+
+def create_porcupine():
+    """Create the Porcupine wake word engine from the environment configuration."""
+    import pvporcupine
+
+    ACCESS_KEY = os.getenv("PORCUPINE_ACCESS_KEY", "")
+    MODEL_FILE_NAME = os.getenv("POCCUPINE_MODEL_FILE_NAME", "")
+
+    # NOTE current wake word is: "Hey Atlas"
+    model_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "porcupine-model", MODEL_FILE_NAME)
+    return pvporcupine.create(
+        access_key=ACCESS_KEY,
+        keyword_paths=[model_path],
+        sensitivities=[0.6]
+    )
+
 # Wake word gate using Porcupine
 # TODO fix Upon not speaking to at start keep listening for X seconds till abort, dont go into long pause and end (bot gets stuck in that mode) 
 class WakeWordActivation:
     """
-    Listens for the Porcupine wake word in a background thread and sets a flag when detected.
+    Listens for the Porcupine wake word on the shared audio bus and sets a flag when detected.
+    The flag stays set until the consumer takes it (`wait_for_wake`) or clears it (`reset`),
+    so a detection is never missed by a thread that was not waiting at that moment.
+    Pass a prewarmed `porcupine` (see `ModelManager`) to skip creating one here.
     """
-    def __init__(self):
+    def __init__(self, bus, porcupine=None):
         self.detected = threading.Event()
-        self._stop = threading.Event()
-        self.thread = threading.Thread(target=self._listen, daemon=True)
-        self.thread.start()
-
-    def _listen(self):
-        ACCESS_KEY = os.getenv("PORCUPINE_ACCESS_KEY", "")
-        MODEL_FILE_NAME = os.getenv("POCCUPINE_MODEL_FILE_NAME", "")
-
-        # NOTE current wake word is: "Hey Atlas"
-        model_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "porcupine-model", MODEL_FILE_NAME)
-        porcupine = pvporcupine.create(
-            access_key=ACCESS_KEY,
-            keyword_paths=[model_path],
-            sensitivities=[0.6]
-        )
-        pa = pyaudio.PyAudio()
-        stream = pa.open(
-            rate=porcupine.sample_rate,
-            channels=1,
-            format=pyaudio.paInt16,
-            input=True,
-            frames_per_buffer=porcupine.frame_length
-        )
+        self.bus = bus
+        # Ring position right after the last detected keyword
+        self.last_keyword_end = None
+        # Called with last_keyword_end on the bus thread, before anything else runs
+        self._listeners = []
+
+        self.porcupine = porcupine or create_porcupine()
+        if self.porcupine.sample_rate != bus.samplerate:
+            raise ValueError(f"Porcupine needs {self.porcupine.sample_rate} Hz audio, bus runs at {bus.samplerate} Hz")
+
+        # Porcupine consumes frames of exactly frame_length samples
+        self.subscription = bus.subscribe(self._on_frame, self.porcupine.frame_length, name="wake_word")
         print("Listening for wake word...")
-        try:
-            while not self._stop.is_set():
-                pcm = stream.read(
-                    porcupine.frame_length,
-                    exception_on_overflow=False
-                )
-                pcm = struct.unpack_from(
-                    "h" * porcupine.frame_length,
-                    pcm
-                )
-                keyword_index = porcupine.process(pcm)
-                if keyword_index >= 0:
-                    play_wake_detected()
-                    print("Wake word detected! Listening...")
-                    self.detected.set()
-                    self.detected.wait()
-                    self.detected.clear()
-        finally:
-            stream.stop_stream()
-            stream.close()
-            pa.terminate()
-            porcupine.delete()
-
-    def wait_for_wake(self):
-        self.detected.wait()
-        
+
+    def _on_frame(self, frame, position):
+        """Runs Porcupine on one bus frame (float32 view, clipped and converted to int16 PCM)."""
+        pcm = (np.clip(frame, -1.0, 1.0) * 32767).astype(np.int16)
+        keyword_index = self.porcupine.process(pcm)
+        if keyword_index >= 0:
+            self.last_keyword_end = position + len(frame)
+            for listener in self._listeners:
+                listener(self.last_keyword_end)
+            play_wake_detected()
+            print("Wake word detected! Listening...")
+            self.detected.set()
+
+    def add_listener(self, callback):
+        """Call ``callback(keyword_end_position)`` directly on every detection.
+
+        Runs on the bus thread, so e.g. `StreamingSTT.start_recording` starts
+        without waiting for another thread to notice the wake word.
+        """
+        self._listeners.append(callback)
+
+    def wait_for_wake(self, timeout=None):
+        """Block until a wake word was detected and consume the detection.
+
+        Returns False if `timeout` expired first.
+        """
+        if not self.detected.wait(timeout):
+            return False
+        self.detected.clear()
+        return True
+
     def reset(self):
-        self.detected.set()
+        """Drop a detection nobody consumed yet."""
+        self.detected.clear()
 
     def stop(self):
-        self._stop.set()
-        self.thread.join()
+        self.bus.unsubscribe(self.subscription)
+        self.porcupine.delete()
 
 class StreamingSTT:
-    def __init__(self, model):
+    def __init__(self, model, executor=None, vad=None, bus=None, language="en"):
         """
         Streaming speech-to-text (STT) with real-time partial and final message output.
         Loads a Whisper model and sets up audio streaming parameters.
+
+        `executor` runs the transcription jobs; it should have as many workers
+        as the model's `num_workers`. Defaults to a single worker.
+        `vad` decides which chunks contain speech; defaults to `vad.create_vad()`.
+        `bus` is the shared audio capture; without one, StreamingSTT gets its
+        own and `start_stream` drives it.
+        `language` is the Whisper language code of the speech (e.g. "en", "de").
         """
         if model is not None:
             self.model = model
+        self.language = language
             
         # Audio stream parameters
         self.SAMPLERATE = 16000
-        self.CHUNK_DURATION = 0.5  # seconds per audio chunk
+        self.CHUNK_DURATION = 0.1  # seconds per audio chunk (bounds end-of-speech detection latency)
         self.CHUNK_SIZE = int(self.SAMPLERATE * self.CHUNK_DURATION)
 
-        # Buffer for incoming audio chunks (for partial transcription)
-        self.current_buffer = deque()
-        # Lock to ensure thread-safe access to the buffer
-        self.buffer_lock = threading.Lock()
-        # List of partial transcriptions (strings)
+        # Shared capture; its preallocated ring buffer holds the audio we decode
+        self.bus = bus or AudioBus(samplerate=self.SAMPLERATE)
+        if self.bus.samplerate != self.SAMPLERATE:
+            raise ValueError(f"StreamingSTT needs {self.SAMPLERATE} Hz audio, bus runs at {self.bus.samplerate} Hz")
+        self.ring = self.bus.ring
+        # Committed text increments of the current utterance (strings)
         self.partials = []
-        # Index to track which part of the buffer has already been processed for partials
-        self.last_partial_index = 0
+
+        # Frame-level voice activity detection with an adaptive noise floor
+        self.vad = vad or create_vad(self.SAMPLERATE)
 
         # Silence and timing thresholds
-        # TODO: Adapt to environment and mic sensitivity (How?) 
-        # Capture and pre-process audio in Rust and send it to container/this file?
-        self.silence_threshold = 0.004
         self.min_audio_length = (
             0.5  # Minimum audio length (seconds) for valid transcription
         )
         self.short_silence_duration = 0.5  # Short pause (seconds) triggers partial message transcription
         self.long_silence_duration = 2.0  # Long pause (seconds) triggers final message
         self.initial_silence_window = 5.0 # After this pause upon activation go back to wake word listening
+        self.decode_interval = 1.0  # Re-decode during continuous speech after this much new audio (seconds)
+        self.preroll_seconds = 1.5  # How far back a recording may start (audio captured before start_recording)
 
 
         # State variables for speech detection and timing
@@ -119,29 +158,46 @@ class StreamingSTT:
         self.last_speech_time = None  # Last time speech was detected
         self.last_chunk_time = None  # Last time a chunk was processed
         self.in_initial_grace_period = False  # Flag to track if we're in the grace period at recording start
+        self._rewind_to = None  # Ring position a new recording starts at (pre-roll or keyword end)
 
-        # List of threads currently processing partials
-        self.partial_threads = []
-        # Lock to protect access to partial_threads
-        self.partial_threads_lock = threading.Lock()
+        # Incremental decoder holding the rolling window of the current utterance. Every
+        # utterance gets a new one, so finalizing the previous utterance on a worker
+        # cannot mix with the next one that the bus thread already started
+        self.decoder = self._new_decoder(self.ring.total_written)
+        # Bounded, ordered pool running the decoding passes. One queued pass is
+        # enough: it snapshots the window when it starts, so it also covers
+        # audio of passes refused in the meantime
+        self.executor = executor or TranscriptionExecutor(num_workers=1)
 
         # Queue for full messages (max 10 to prevent unbounded growth, meaning last 10 prompts)
         self.full_message_queue = deque(maxlen=20)
 
+        # Latency bookkeeping (perf_counter based) for benchmarks and debugging
+        # Entries are (kind, audio_seconds, elapsed_seconds)
+        self.transcription_log = deque(maxlen=500)
+        self.utterance_end_time = None  # When the long pause ended the utterance
+        self.final_ready_time = None  # When the full message was queued
+
+        # Called with ("final", text) or ("no_speech", None) when an utterance ends
+        self._listeners = []
+        self._stop_requested = False
+
+        self.subscription = self.bus.subscribe(self.on_audio_frame, self.CHUNK_SIZE, name="stt")
+
+    @property
+    def clock(self):
+        """Time source for pause detection: the bus source's timeline, so
+        faster than real time replays keep their timing."""
+        return self.bus.clock
+
     def detect_voice_activity(self, audio_chunk):
         """
-        Detects if the audio chunk contains speech based on RMS and peak amplitude.
+        Detects if the audio chunk contains speech using the configured VAD backend.
         Returns True if speech is detected, otherwise False.
         """
-        # Calculate root mean square (RMS) and peak amplitude
-        rms = np.sqrt(np.mean(audio_chunk**2))
-        peak = np.max(np.abs(audio_chunk))
-        has_speech = rms > self.silence_threshold or peak > self.silence_threshold * 2
+        return self.vad.is_speech(audio_chunk)
 
-        # Return True if either RMS or peak exceeds threshold (robust to both loud and soft speech)
-        return has_speech
-
-    def transcribe_buffer(self, audio_data):
+    def transcribe_buffer(self, audio_data, kind="partial"):
         """
         Transcribes the given audio data using the Whisper model.
         Returns the transcribed text or an empty string on error/short input.
@@ -149,6 +205,7 @@ class StreamingSTT:
         # Ignore very short audio (likely noise or silence)
         if len(audio_data) < self.SAMPLERATE * self.min_audio_length:
             return ""
+        started = time.perf_counter()
         try:
             # Transcribe using Whisper. VAD is off; handle silence in code here for now.
             segments, _ = self.model.transcribe(
@@ -159,106 +216,203 @@ class StreamingSTT:
                 vad_filter=False,
                 condition_on_previous_text=False,
                 no_speech_threshold=0.6,
-                language="en",
+                language=self.language,
+            )
+            # Join all non-empty segment texts (segments is lazy, decoding happens here)
+            text = " ".join(seg.text.strip() for seg in segments if seg.text.strip())
+            self.transcription_log.append(
+                (kind, len(audio_data) / self.SAMPLERATE, time.perf_counter() - started)
             )
-            # Join all non-empty segment texts
-            return " ".join(seg.text.strip() for seg in segments if seg.text.strip())
+            return text
         except Exception as e:
             print(f"Transcription error: {e}")
             return ""
 
-    def _process_partial(self, audio_data):
+    def transcribe_words(self, audio_data, prompt="", kind="partial"):
         """
-        Transcribes a partial audio buffer and appends the result to partials.
-        Runs in a background thread.
+        Transcribes audio with word timestamps for the incremental decoder.
+        Returns a list of (start, end, word) tuples relative to the audio start.
         """
-        # Transcribe the audio buffer and append result to partials if not empty
-        text = self.transcribe_buffer(audio_data)
-        if text:
+        if len(audio_data) < self.SAMPLERATE * self.min_audio_length:
+            return []
+        started = time.perf_counter()
+        try:
+            segments, _ = self.model.transcribe(
+                audio_data,
+                beam_size=1,
+                best_of=3,
+                temperature=0.2,
+                vad_filter=False,
+                condition_on_previous_text=False,
+                no_speech_threshold=0.6,
+                language=self.language,
+                word_timestamps=True,
+                initial_prompt=prompt or None,
+            )
+            words = [
+                (w.start, w.end, w.word.strip())
+                for seg in segments
+                for w in (seg.words or [])
+                if w.word.strip()
+            ]
+            self.transcription_log.append(
+                (kind, len(audio_data) / self.SAMPLERATE, time.perf_counter() - started)
+            )
+            return words
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            return []
+
+    def _new_decoder(self, start):
+        decoder = LocalAgreementDecoder(self.ring, self.transcribe_words, samplerate=self.SAMPLERATE)
+        decoder.reset(start)
+        return decoder
+
+    def _run_pass(self, decoder, kind):
+        """
+        Snapshots the window of `decoder` (the utterance the pass was queued for)
+        and transcribes it. Runs on a transcription worker.
+        """
+        audio, offset, prompt = decoder.snapshot()
+        return decoder, offset, self.transcribe_words(audio, prompt, kind)
+
+    def _apply_pass(self, result):
+        """
+        Merges a finished pass into its decoder and records newly committed text.
+        Called in submission order by the executor.
+        """
+        decoder, offset, words = result
+        text = decoder.apply(words, offset)
+        if text and decoder is self.decoder:
             self.partials.append(text)
             print(f"[DEBUG] partial {len(self.partials)} → {text}")
 
     def safe_process_current_buffer(self):
         """
-        Safely processes the current audio buffer as a partial transcription.
-        Clears the buffer and starts a background thread for processing.
-        """
-        # Lock buffer to safely extract and clear current audio
-        with self.buffer_lock:
-            if not self.current_buffer:
-                return
-            audio_data = np.concatenate(list(self.current_buffer))
-            self.current_buffer.clear()
+        Queues a decoding pass over the window unless the executor is full
+        or no speech arrived since the last pass.
 
-        # Start a background thread to process this partial
-        thread = threading.Thread(
-            target=self._process_partial, args=(audio_data,), daemon=True
-        )
-        thread.start()
-
-        # Track the thread so we can wait for all partials before finalizing
-        with self.partial_threads_lock:
-            self.partial_threads.append(thread)
+        A refused pass loses nothing: the queued one decodes the whole window,
+        including audio that arrived in the meantime.
+        """
+        if self.decoder.unprocessed_seconds() > 0:
+            self.executor.submit(self._run_pass, self.decoder, "partial", on_result=self._apply_pass)
 
-    def _process_final_message(self, audio_data):
+    def _process_final_message(self, decoder):
         """
-        Waits for all partial threads to finish, processes any remaining audio,
-        combines all partials into a full message, and adds it to the queue.
+        Waits for pending decoding passes and finalizes the utterance of
+        `decoder` into a full message on the queue.
         Runs in a background thread.
         """
-        # Wait for all partial-processing threads to finish before finalizing
-        with self.partial_threads_lock:
-            threads_to_wait = list(self.partial_threads)
-            self.partial_threads.clear()
-        for t in threads_to_wait:
-            t.join()
-
-        # Process any remaining audio not yet transcribed
-        last_text = self.transcribe_buffer(audio_data)
-        if last_text:
-            self.partials.append(last_text)
-
-        # Combine all partials into a single full message
-        full_message = " ".join(self.partials)
-        self.partials.clear()
+        self.executor.drain()
+
+        # Only decodes again if speech arrived after the last partial pass
+        if decoder.needs_final_pass():
+            self.executor.submit(self._run_pass, decoder, "final", on_result=self._apply_pass, block=True)
+            self.executor.drain()
+        full_message = decoder.finish()
 
         # Push to queue if not empty (thread-safe, as only one final thread runs at a time)
         if full_message:
             self.full_message_queue.append(full_message)
+            self.final_ready_time = time.perf_counter()
+            self._notify("final", full_message)
+        else:
+            self._notify("no_speech", None)
+
+    def add_listener(self, callback):
+        """Call ``callback(kind, text)`` when an utterance ends.
 
-    def audio_callback(self, indata, frames, time_info, status):
+        `kind` is "final" (with the full message) or "no_speech" (nothing
+        transcribable was said). Runs on the STT's threads and must not block.
         """
-        Callback for the audio stream. Handles chunking, voice activity detection,
-        and triggers partial/final transcription based on silence duration.
+        self._listeners.append(callback)
+
+    def _notify(self, kind, text):
+        for listener in self._listeners:
+            try:
+                listener(kind, text)
+            except Exception as e:
+                print(f"[STT] listener failed: {e}")
+
+    def stop_recording(self):
+        """Ask the bus thread to abandon the current recording."""
+        self._stop_requested = True
+
+    def start_recording(self, start_position=None):
+        """Start listening for a new utterance (called after the wake word).
+
+        `start_position` is the ring position where the utterance may begin,
+        typically the end of the wake word. Audio captured since then (at most
+        `preroll_seconds`) is re-read from the ring, so a command spoken in
+        the same breath as the wake word is not lost.
         """
-        if status:
-            print(status)
-
-        audio_chunk = self._extract_audio_chunk(indata)
-        current_time = time.time()
+        now = self.clock()
+        self.recording_start_time = now
+        self.last_speech_time = None  # Reset to None so grace period works
+        self.last_chunk_time = now
+        self.in_initial_grace_period = True  # Enable grace period for this recording session
+        self._stop_requested = False
+        # TODO fix sometimes "us" of "Atlas" is being transcribed (Porcupine may fire before the keyword fully ended)
+        if start_position is not None:
+            earliest = self.ring.total_written - int(self.preroll_seconds * self.SAMPLERATE)
+            self._rewind_to = max(start_position, earliest, self.ring.oldest)
+        self.is_recording = True  # Activate the transcription via flag
+
+    def _frame_time(self, position, length):
+        """Timeline time at the end of the frame, also for frames re-read from the past."""
+        behind = self.ring.total_written - (position + length)
+        return self.clock() - behind / self.SAMPLERATE
+
+    def on_audio_frame(self, audio_chunk, position):
+        """
+        Audio bus subscriber. Handles voice activity detection and triggers
+        partial/final transcription based on silence duration.
+        `position` is the ring buffer index of the chunk's first sample.
+        """
+        if self._stop_requested:
+            # Flags are only changed on the bus thread
+            self._stop_requested = False
+            self.is_recording = False
+            self.in_initial_grace_period = False
         if not self.is_recording:
+            # Idle audio keeps the VAD noise floor adapted to the room
+            self.vad.calibrate(audio_chunk)
             return
 
+        if self._rewind_to is not None:
+            target, self._rewind_to = self._rewind_to, None
+            if target != position:
+                # The bus continues delivering from the start position: back into
+                # the pre-roll, or forward past the keyword when this frame still
+                # holds its tail
+                self.subscription.position = target
+                return
+
+        current_time = self._frame_time(position, len(audio_chunk))
         if self.detect_voice_activity(audio_chunk):
-            self._handle_speech_detected(audio_chunk, current_time)
+            self._handle_speech_detected(audio_chunk, position, current_time)
         else:
             self._handle_silence(current_time)
 
-    def _extract_audio_chunk(self, indata):
-        """Extract mono audio from input and convert to float32."""
-        return indata[:, 0].astype(np.float32)
-
-    def _handle_speech_detected(self, audio_chunk, current_time):
+    def _handle_speech_detected(self, audio_chunk, position, current_time):
         """Handle logic when speech is detected in the audio chunk."""
         # Exit grace period when real speech is detected
         if self.in_initial_grace_period:
             self.in_initial_grace_period = False
         
-        with self.buffer_lock:
-            self.current_buffer.append(audio_chunk)
+        # The chunk already is in the ring; the utterance starts at the first speech
+        if self.last_speech_time is None:
+            self.decoder = self._new_decoder(position)
+            self.partials = []
+        self.decoder.extend_to(position + len(audio_chunk))
         self.last_speech_time = current_time
         self.last_chunk_time = current_time
 
+        # Keep decoding during continuous speech so stable text is emitted early
+        if self.decoder.unprocessed_seconds() >= self.decode_interval:
+            self.safe_process_current_buffer()
+
     def _handle_silence(self, current_time):
         # Ensure last_chunk_time is set
         if self.last_chunk_time is None:
@@ -278,6 +432,7 @@ class StreamingSTT:
                 print(f"[DEBUG] No speech detected in initial {self.initial_silence_window}s, returning to wake word")
                 self.is_recording = False
                 self.in_initial_grace_period = False
+                self._notify("no_speech", None)
                 return
 
         # Only proceed with silence checks if speech has been detected
@@ -287,7 +442,7 @@ class StreamingSTT:
         silence_time = current_time - self.last_speech_time
 
         # Short pause: process a partial (non-blocking)
-        if chunk_time > self.short_silence_duration and len(self.current_buffer) > 0:
+        if chunk_time > self.short_silence_duration and self.decoder.unprocessed_seconds() > 0:
             self.safe_process_current_buffer()
             self.last_chunk_time = current_time
 
@@ -295,47 +450,17 @@ class StreamingSTT:
         if silence_time > self.long_silence_duration:
             print(f"[DEBUG] Long pause detected! silence_time={silence_time:.2f}s")
             self.is_recording = False
-            final_audio = self._get_final_audio()
-            if final_audio is not None:
-                threading.Thread(
-                    target=self._process_final_message,
-                    args=(final_audio,),
-                    daemon=True,
-                ).start()
-            else:
-                threading.Thread(
-                    target=self._process_final_message,
-                    args=(np.array([]),),
-                    daemon=True,
-                ).start()
-
-    def _get_final_audio(self):
-        """Extracts the remaining audio after the last partial for final transcription."""
-        with self.buffer_lock:
-            if self.current_buffer:
-                remaining_chunks = list(self.current_buffer)[self.last_partial_index:]
-                if remaining_chunks:
-                    final_audio = np.concatenate(remaining_chunks)
-                else:
-                    final_audio = None
-                self.current_buffer.clear()
-                self.last_partial_index = 0
-            else:
-                final_audio = None
-        return final_audio
+            self.utterance_end_time = time.perf_counter()
+            threading.Thread(target=self._process_final_message, args=(self.decoder,), daemon=True).start()
 
-    def start_stream(self):
+    def start_stream(self, source=None, stop_event=None):
         """
-        Starts the audio input stream and continuously listens for speech.
+        Runs the audio bus from `source` and continuously listens for speech.
+
+        `source` defaults to the `AUDIO_INPUT` environment variable (microphone
+        if unset), see `audio_source.create_source`. Only needed when this
+        StreamingSTT owns its bus; a shared bus is run by its owner.
         """
-        # Open the audio input stream and continuously listen for speech
-        with sd.InputStream(
-            channels=1,
-            samplerate=self.SAMPLERATE,
-            blocksize=self.CHUNK_SIZE,
-            dtype="float32",
-            callback=self.audio_callback,
-            latency="high",
-        ):
-            while True:
-                time.sleep(0.1)
\ No newline at end of file
+        if source is None:
+            source = create_source(os.getenv("AUDIO_INPUT", "mic"), samplerate=self.SAMPLERATE)
+        self.bus.run(source, stop_event)
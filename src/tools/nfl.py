@@ -1,6 +1,8 @@
-import requests
 from datetime import datetime, date
 
+from .nfl_data import get_client
+from .nfl_games import Game, WeekTable
+
 SEASON_TYPES = {
     1: "Pre Season",
     2: "Regular Season",
@@ -8,8 +10,6 @@ SEASON_TYPES = {
     4: "Off Season",
 }
 
-ESPN_URL = "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
-
 def parse_date_only(dt_str: str) -> date:
     """Parse an ISO-8601 date/time string and return a date object.
 
@@ -31,14 +31,13 @@ def parse_date_only(dt_str: str) -> date:
     """
     return datetime.fromisoformat(dt_str.replace("Z", "+00:00")).date()
 
-# TODO cache the calendar 
 def get_nfl_season_and_week(input_date: str):
     """Return the NFL season type and week for a given date.
 
     This function accepts a date in several forms: an ISO-8601 string,
-    a `datetime.datetime`, or a `datetime.date`. It queries the ESPN
-    scoreboard API to fetch the league calendar and finds the season
-    entry and week that contains the provided date.
+    a `datetime.datetime`, or a `datetime.date`. It looks up the league
+    calendar (cached by `nfl_data`) and finds the season entry and week
+    that contains the provided date.
 
     Args:
         input_date: A date string (ISO-8601), `datetime.datetime`, or
@@ -59,30 +58,57 @@ def get_nfl_season_and_week(input_date: str):
     # Normalize input to a date object
     input_date = _normalize_input_date(input_date)
 
-    calendar = _fetch_calendar()
-
-    # Find the season that contains the date
-    season = _find_season_for_date(calendar, input_date)
+    season, week = _calendar_index().lookup(input_date)
     if season is None:
         return None
 
-    # Try to find a specific week within the season
-    week_entry = _find_week_in_season(season, input_date)
-    if week_entry is not None:
-        return {
-            "season_type": season.get("label"),
-            "season_type_id": int(season.get("value")) if season.get("value") is not None else None,
-            "week": int(week_entry.get("value")) if week_entry.get("value") is not None else None,
-        }
-
-    # Date is inside season but not inside a specific week
+    # week is None if the date is inside the season but not inside a specific week
     return {
-        "season_type": season.get("label"),
-        "season_type_id": int(season.get("value")) if season.get("value") is not None else None,
-        "week": None,
+        "season_type": season.season_type,
+        "season_type_id": season.season_type_id,
+        "week": week.week if week is not None else None,
     }
 
 
+def get_nfl_weeks_between(start_date, end_date):
+    """Return every NFL week that overlaps the date range [start_date, end_date].
+
+    Both bounds are inclusive and accept the same forms as
+    `get_nfl_season_and_week`. Weeks are returned in calendar order and
+    may span several season types (e.g. the last regular season weeks and
+    the first playoff round).
+
+    Args:
+        start_date: First date of the range.
+        end_date: Last date of the range.
+
+    Returns:
+        A list of dicts with keys:
+            - "season_type": human-readable season label
+            - "season_type_id": integer season type id
+            - "week": integer week number
+            - "label": week label from the calendar (e.g. "Week 14", "Wild Card")
+            - "start" / "end": ISO-8601 dates of the week
+        An empty list if no week overlaps the range.
+
+    Raises:
+        TypeError: If a bound is not a str, datetime, or date.
+    """
+    start_date = _normalize_input_date(start_date)
+    end_date = _normalize_input_date(end_date)
+    return [
+        {
+            "season_type": week.season_type,
+            "season_type_id": week.season_type_id,
+            "week": week.week,
+            "label": week.label,
+            "start": week.start.isoformat(),
+            "end": week.end.isoformat(),
+        }
+        for week in _calendar_index().weeks_between(start_date, end_date)
+    ]
+
+
 def _normalize_input_date(input_date):
     """Normalize input to a `datetime.date`.
 
@@ -98,85 +124,46 @@ def _normalize_input_date(input_date):
     raise TypeError("input_date must be a str, datetime or date")
 
 
-def _fetch_calendar():
-    """Fetch and return the league calendar from ESPN API.
-
-    Returns an empty list if the expected structure is missing.
-    """
-    data = requests.get(ESPN_URL).json()
-    leagues = data.get("leagues") or []
-    if not leagues:
-        return []
-    league = leagues[0]
-    return league.get("calendar", []) or []
-
-
-def _find_season_for_date(calendar, input_date):
-    """Return the season dict from calendar that contains input_date, or None."""
-    for season in calendar:
-        season_start = parse_date_only(season["startDate"])
-        season_end = parse_date_only(season["endDate"])
-        if season_start <= input_date <= season_end:
-            return season
-    return None
-
+def _calendar_index():
+    """Return the interval index of the league calendar (parsed once per calendar fetch)."""
+    return get_client().calendar_index()
 
-def _find_week_in_season(season, input_date):
-    """Return the week entry dict inside season that contains input_date, or None."""
-    for entry in season.get("entries", []):
-        week_start = parse_date_only(entry["startDate"])
-        week_end = parse_date_only(entry["endDate"])
-        if week_start <= input_date <= week_end:
-            return entry
+def _week_span(week: int, season_type: int):
+    """Calendar span of a week, or None if the calendar does not list it."""
+    for span in _calendar_index().weeks:
+        if span.season_type_id == season_type and span.week == week:
+            return span
     return None
 
-def get_games_and_scores_week(week: int, season_type: int):
+def get_games_and_scores_week(week: int, season_type: int) -> WeekTable:
     """Fetch games and basic scores for a specific NFL week and season type.
 
     This function queries the ESPN scoreboard API for the provided
-    `season_type` (numeric code) and `week`. It returns a list of game
-    summaries with the game's name, status, scheduled date/time (ISO
-    8601 string), and a list of competitors with team name and score.
+    `season_type` (numeric code) and `week` and returns the games in the
+    same column-wise record format as the async schedule tool.
 
     Args:
         week: The NFL week number to query (integer).
         season_type: Numeric season type (1=Preseason, 2=Regular, 3=Postseason, 4=Offseason).
 
     Returns:
-        A list of dicts, each with keys:
-            - "name": Event name (string)
-            - "status": Human-readable game status (string, may be None)
-            - "date": ISO-8601 date/time string for the event
-            - "competitors": List of competitor dicts with keys "team" and "score".
+        A `nfl_games.WeekTable` of the week's games; `games()` yields them
+        as `nfl_games.Game` records (teams, scores as ints or None before
+        kickoff, ESPN state and status, ISO-8601 kickoff).
 
     Notes:
-        - This performs a network request and will raise requests exceptions
-          if the network call fails. The function does not retry or cache.
+        - Responses are cached by `nfl_data` (finished weeks indefinitely,
+          live weeks briefly). A failed network call raises requests exceptions.
     """
-    params = {"seasontype": season_type, "week": week}
-    response = requests.get(ESPN_URL, params=params).json()
-    games = []
-
-    for event in response.get("events", []):
-        game_info = {
-            "name": event.get("name"),
-            "status": event.get("status", {}).get("type", {}).get("description"),
-            "date": event.get("date"),  # ISO 8601 date/time
-            "competitors": []
-        }
-
-        # Extract team names and scores
-        competitions = event.get("competitions", [])
-        if competitions:
-            for competitor in competitions[0].get("competitors", []):
-                team = competitor.get("team")
-                game_info["competitors"].append({
-                    "team": team.get("displayName"),
-                    "score": competitor.get("score")
-                })
+    events = get_client().week(week=week, season_type=season_type).get("events", [])
+    span = _week_span(week, season_type)
+    if span is not None:
+        return WeekTable.from_events(span, events)
 
-        games.append(game_info)
-    return games
+    table = WeekTable(SEASON_TYPES.get(season_type), week)
+    for event in events:
+        table.append(Game.from_event(event))
+    return table
 
 def get_games_and_scores_from_date(date: str):
     """Get games and scores for the NFL week that contains `date`.
@@ -191,21 +178,19 @@ def get_games_and_scores_from_date(date: str):
             `datetime.date` accepted by `get_nfl_season_and_week`.
 
     Returns:
-        A list of game summary dicts (same format as
+        The `nfl_games.WeekTable` of that week (see
         `get_games_and_scores_week`). If the date cannot be mapped to a
-        season/week or the season information is missing, an empty list
-        is returned.
+        season/week or the season information is missing, None is returned.
     """
 
     season_and_week = get_nfl_season_and_week(date)
+    if not season_and_week:
+        return None
 
     season = season_and_week.get("season_type_id")
     week = season_and_week.get("week")
 
-    if not season_and_week or (week is None or season is None):
-        return []
+    if week is None or season is None:
+        return None
 
     return get_games_and_scores_week(week=week, season_type=season)
-
-print(get_games_and_scores_from_date("2025-12-14"))
-print(get_games_and_scores_week(14, 2))
\ No newline at end of file
@@ -0,0 +1,170 @@
+"""
+nfl_async.py
+
+Asynchronous NFL schedule tool for the LLM tool layer.
+
+A schedule question ("what are the scores this weekend", "who plays over the
+holidays") can cover several weeks, possibly across season types. The weeks
+are fetched concurrently with an `httpx.AsyncClient`: at most
+`NFL_MAX_CONNECTIONS` requests are in flight, and all connections stay
+alive between calls. Responses go through the cache of
+`nfl_data.get_client()`, so the sync and async paths share TTLs, ETags and
+the calendar index.
+
+The coroutines run on one background event loop thread, so the synchronous
+pipeline (and its worker threads) can call `get_nfl_schedule()` directly.
+
+The output is compact and schema-stable (`SCHEDULE_SCHEMA`): every key is
+always present, missing values are None, and each week's games are stored
+column-wise (`nfl_games.WeekTable`). "summary" is the token-minimal text for
+`conversation()`'s `additional_data`; "speech" answers score questions
+without the LLM.
+"""
+
+import asyncio
+import os
+import threading
+from datetime import date
+
+from .nfl import _normalize_input_date
+from .nfl_data import calendar_of, get_client, season_year_of
+from .nfl_games import WeekTable, render_speech, render_summary
+
+NFL_MAX_CONNECTIONS = int(os.getenv("NFL_MAX_CONNECTIONS", "4"))
+NFL_TOOL_TIMEOUT = float(os.getenv("NFL_TOOL_TIMEOUT", "8"))
+
+SCHEDULE_SCHEMA = "nfl_schedule/2"
+
+
+class AsyncNflClient:
+    """Async transport for `NflDataClient`, sharing its cache.
+
+    Args:
+        data: Cache owner; defaults to `nfl_data.get_client()`.
+        max_connections: Requests in flight (and pooled connections) at most.
+    """
+
+    def __init__(self, data=None, max_connections: int = NFL_MAX_CONNECTIONS):
+        import httpx
+
+        self.data = data or get_client()
+        self._http = httpx.AsyncClient(
+            timeout=self.data.timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._semaphore = asyncio.Semaphore(max_connections)
+
+    async def _get(self, key, params, ttl_for):
+        data, entry = self.data._cached(key)
+        if data is not None:
+            return data
+        async with self._semaphore:
+            response = await self._http.get(
+                self.data.base_url, params=params, headers=self.data._conditional_headers(entry)
+            )
+        return self.data._store(key, entry, response, ttl_for)
+
+    async def scoreboard(self) -> dict:
+        return await self._get(*self.data._scoreboard_request())
+
+    async def calendar_index(self):
+        return self.data.index_for(calendar_of(await self.scoreboard()))
+
+    async def week(self, week: int, season_type: int, year: int = None) -> dict:
+        year = year or season_year_of(await self.scoreboard())
+        return await self._get(*self.data._week_request(week, season_type, year))
+
+    async def weeks(self, spans, year: int = None):
+        """Scoreboards of several `CalendarSpan` weeks, fetched concurrently.
+
+        Returns one entry per span, in order: the scoreboard dict, or the
+        exception raised while fetching it.
+        """
+        year = year or season_year_of(await self.scoreboard())
+        return await asyncio.gather(
+            *(self.week(span.week, span.season_type_id, year) for span in spans), return_exceptions=True
+        )
+
+    async def aclose(self):
+        await self._http.aclose()
+
+
+async def fetch_week_tables(start_date=None, end_date=None, client: AsyncNflClient = None):
+    """`WeekTable` of every week overlapping [start_date, end_date] (default: the current week).
+
+    A week that fails to load keeps its place as an empty table with its
+    `error` set, so one bad request does not lose the others.
+    """
+    start = _normalize_input_date(start_date) if start_date is not None else date.today()
+    end = _normalize_input_date(end_date) if end_date is not None else start
+    client = client or await _get_async_client()
+
+    spans = (await client.calendar_index()).weeks_between(start, end)
+    scoreboards = await client.weeks(spans)
+
+    tables = []
+    for span, scoreboard in zip(spans, scoreboards):
+        if isinstance(scoreboard, BaseException):
+            tables.append(WeekTable(span.season_type, span.week, span.label, f"{type(scoreboard).__name__}: {scoreboard}"))
+        else:
+            tables.append(WeekTable.from_events(span, scoreboard.get("events", [])))
+    return start, end, tables
+
+
+async def fetch_schedule(start_date=None, end_date=None, client: AsyncNflClient = None) -> dict:
+    """Schedule dict of `fetch_week_tables`, with the summary and speech text rendered once."""
+    start, end, tables = await fetch_week_tables(start_date, end_date, client)
+    return {
+        "schema": SCHEDULE_SCHEMA,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "weeks": [table.to_dict() for table in tables],
+        "summary": render_summary(tables),
+        "speech": render_speech(tables),
+    }
+
+
+_loop = None
+_async_client = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    """Background event loop shared by all tool calls (started on first use)."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="nfl-async", daemon=True).start()
+        return _loop
+
+
+async def _get_async_client():
+    # Only touched from the background loop, so no lock is needed
+    global _async_client
+    if _async_client is None or _async_client.data is not get_client():
+        _async_client = AsyncNflClient()
+    return _async_client
+
+
+def preload():
+    """Start the loop and create the async client (importing httpx) ahead of the first call."""
+    asyncio.run_coroutine_threadsafe(_get_async_client(), _get_loop()).result()
+
+
+def get_nfl_schedule(start_date=None, end_date=None, timeout: float = NFL_TOOL_TIMEOUT) -> dict:
+    """Synchronous entry point of `fetch_schedule` for the tool layer.
+
+    Args:
+        start_date: First date (ISO-8601 string, datetime or date); defaults to today.
+        end_date: Last date, inclusive; defaults to `start_date`.
+        timeout: Seconds to wait for all weeks.
+
+    Returns:
+        {"schema", "start", "end", "weeks": [{"season_type", "week", "label",
+        "error", "games": {"away": [...], "home": [...], "away_score": [...],
+        "home_score": [...], "state": [...], "status": [...], "kickoff": [...]}}],
+        "summary", "speech"}
+    """
+    future = asyncio.run_coroutine_threadsafe(fetch_schedule(start_date, end_date), _get_loop())
+    return future.result(timeout)
@@ -0,0 +1,305 @@
+"""
+nfl_data.py
+
+Cached access to the ESPN NFL scoreboard API for `tools/nfl.py`.
+
+The calendar changes a few times per season, finished weeks never change,
+and only weeks with games in progress change by the minute. `NflDataClient`
+caches accordingly:
+- calendar: `calendar_ttl` (default 12 h)
+- week with a game in progress: `live_ttl` (default 30 s)
+- week with games still to be played: `upcoming_ttl` (default 10 min)
+- week whose games are all final: indefinitely
+
+Expired entries are revalidated with If-None-Match / If-Modified-Since when
+the server sent an ETag / Last-Modified, so an unchanged scoreboard costs a
+304 without a body. All requests share one `requests.Session`; the async
+client in `tools/nfl_async.py` shares the cache through `_cached` / `_store`.
+
+The calendar is parsed once into a `CalendarIndex` (sorted intervals with
+precomputed dates, searched with bisect) for date and date-range lookups.
+
+`ESPN_SCOREBOARD_URL` overrides the endpoint (e.g. `bench/fake_espn_server.py`).
+"""
+
+import bisect
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+import requests
+
+ESPN_SCOREBOARD_URL = os.getenv(
+    "ESPN_SCOREBOARD_URL", "https://site.api.espn.com/apis/site/v2/sports/football/nfl/scoreboard"
+)
+
+FOREVER = float("inf")
+
+
+class _Entry:
+    """Cached response body plus its validators."""
+
+    __slots__ = ("data", "expires", "etag", "last_modified")
+
+    def __init__(self, data, expires, etag=None, last_modified=None):
+        self.data = data
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+def week_ttl(data: dict, live_ttl: float, upcoming_ttl: float) -> float:
+    """How long a week's scoreboard stays valid, from the state of its games."""
+    states = [
+        (event.get("status") or {}).get("type", {}).get("state")
+        for event in data.get("events", [])
+    ]
+    if not states:
+        return upcoming_ttl
+    if all(state == "post" for state in states):
+        return FOREVER
+    if any(state == "in" for state in states):
+        return live_ttl
+    return upcoming_ttl
+
+
+def calendar_of(scoreboard: dict):
+    """League calendar of a scoreboard response ([] if missing)."""
+    leagues = scoreboard.get("leagues") or []
+    if not leagues:
+        return []
+    return leagues[0].get("calendar", []) or []
+
+
+def season_year_of(scoreboard: dict):
+    leagues = scoreboard.get("leagues") or []
+    if leagues:
+        return (leagues[0].get("season") or {}).get("year")
+    return None
+
+
+def _date(value: str):
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).date()
+
+
+def _int_or_none(value):
+    return int(value) if value is not None else None
+
+
+# One calendar interval with parsed dates; `week` is None for a whole season
+CalendarSpan = namedtuple("CalendarSpan", "start end season_type_id season_type week label")
+
+
+class CalendarIndex:
+    """Interval index over the league calendar.
+
+    Start and end dates are parsed once; lookups bisect over the sorted
+    start dates. Intervals are compared by calendar date, so neighbours can
+    share their boundary day; like the linear scan it replaces, the earlier
+    interval wins then.
+    """
+
+    def __init__(self, calendar):
+        seasons, weeks = [], []
+        self._season_weeks = {}  # season_type_id -> (weeks, starts)
+        for season in calendar:
+            season_type_id = _int_or_none(season.get("value"))
+            label = season.get("label")
+            seasons.append(CalendarSpan(_date(season["startDate"]), _date(season["endDate"]), season_type_id, label, None, label))
+            entries = sorted(
+                (
+                    CalendarSpan(
+                        _date(entry["startDate"]), _date(entry["endDate"]), season_type_id, label,
+                        _int_or_none(entry.get("value")), entry.get("label"),
+                    )
+                    for entry in season.get("entries", [])
+                ),
+                key=lambda span: span.start,
+            )
+            self._season_weeks[season_type_id] = (entries, [span.start for span in entries])
+            weeks.extend(entries)
+        self.seasons = sorted(seasons, key=lambda span: span.start)
+        self.weeks = sorted(weeks, key=lambda span: span.start)
+        self._season_starts = [span.start for span in self.seasons]
+        self._week_starts = [span.start for span in self.weeks]
+        self._week_ends = [span.end for span in self.weeks]
+
+    @staticmethod
+    def _first_containing(spans, starts, day):
+        """First span (in calendar order) containing `day`, or None."""
+        i = bisect.bisect_right(starts, day) - 1
+        found = None
+        # Step back over neighbours sharing the boundary day (at most one or two)
+        while i >= 0 and spans[i].end >= day:
+            found = spans[i]
+            i -= 1
+        return found
+
+    def season_for(self, day):
+        """Season span containing `day`, or None."""
+        return self._first_containing(self.seasons, self._season_starts, day)
+
+    def lookup(self, day):
+        """(season, week) spans for `day`; week is None between weeks, both are None off the calendar."""
+        season = self.season_for(day)
+        if season is None:
+            return None, None
+        weeks, starts = self._season_weeks[season.season_type_id]
+        return season, self._first_containing(weeks, starts, day)
+
+    def weeks_between(self, start, end):
+        """All weeks overlapping the inclusive date range [start, end], in calendar order."""
+        lo = bisect.bisect_left(self._week_ends, start)
+        hi = bisect.bisect_right(self._week_starts, end)
+        return self.weeks[lo:hi]
+
+
+class NflDataClient:
+    """ESPN scoreboard client with per-resource caching and conditional requests.
+
+    Args:
+        base_url: Scoreboard endpoint; defaults to `ESPN_SCOREBOARD_URL`.
+        session: Shared `requests.Session`; one is created if omitted.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        base_url: str = None,
+        session=None,
+        timeout: float = 5.0,
+        calendar_ttl: float = 12 * 3600,
+        live_ttl: float = 30.0,
+        upcoming_ttl: float = 600.0,
+    ):
+        self.base_url = base_url or ESPN_SCOREBOARD_URL
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.calendar_ttl = calendar_ttl
+        self.live_ttl = live_ttl
+        self.upcoming_ttl = upcoming_ttl
+        self._cache = {}  # key -> _Entry
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_source = None
+
+        self.hits = 0
+        self.revalidated = 0
+        self.fetches = 0
+
+    def _cached(self, key):
+        """(fresh data or None, cached entry or None) for `key`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry.expires > now:
+                self.hits += 1
+                return entry.data, entry
+        return None, entry
+
+    @staticmethod
+    def _conditional_headers(entry) -> dict:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _store(self, key, entry, response, ttl_for):
+        """Cache a response (requests or httpx) to a request made with `_conditional_headers(entry)`."""
+        if response.status_code == 304 and entry is not None:
+            data = entry.data
+            with self._lock:
+                self.revalidated += 1
+        else:
+            response.raise_for_status()
+            data = response.json()
+            with self._lock:
+                self.fetches += 1
+
+        with self._lock:
+            self._cache[key] = _Entry(
+                data,
+                time.monotonic() + ttl_for(data),
+                response.headers.get("ETag") or (entry.etag if entry else None),
+                response.headers.get("Last-Modified") or (entry.last_modified if entry else None),
+            )
+        return data
+
+    def _get(self, key, params, ttl_for):
+        """Return the JSON for `params`, from cache, revalidated (304) or fetched.
+
+        `ttl_for(data)` decides how long a fresh response stays valid.
+        """
+        data, entry = self._cached(key)
+        if data is not None:
+            return data
+        response = self.session.get(
+            self.base_url, params=params, headers=self._conditional_headers(entry), timeout=self.timeout
+        )
+        return self._store(key, entry, response, ttl_for)
+
+    def _week_request(self, week: int, season_type: int, year):
+        """(cache key, query params, ttl_for) of one week's scoreboard."""
+        params = {"seasontype": season_type, "week": week}
+        if year:
+            params["dates"] = year
+        return (
+            ("week", year, season_type, week),
+            params,
+            lambda data: week_ttl(data, self.live_ttl, self.upcoming_ttl),
+        )
+
+    def _scoreboard_request(self):
+        return ("scoreboard",), None, lambda data: self.calendar_ttl
+
+    def scoreboard(self) -> dict:
+        """Default scoreboard (current week), which also carries the calendar."""
+        return self._get(*self._scoreboard_request())
+
+    def calendar(self):
+        """League calendar: list of seasons with their week entries."""
+        return calendar_of(self.scoreboard())
+
+    def calendar_index(self) -> CalendarIndex:
+        """`CalendarIndex` of the cached calendar, rebuilt only when the calendar changes."""
+        return self.index_for(self.calendar())
+
+    def index_for(self, calendar) -> CalendarIndex:
+        with self._lock:
+            if self._index is None or self._index_source is not calendar:
+                self._index = CalendarIndex(calendar)
+                self._index_source = calendar
+            return self._index
+
+    def current_season_year(self):
+        return season_year_of(self.scoreboard())
+
+    def week(self, week: int, season_type: int, year: int = None) -> dict:
+        """Scoreboard of one week; `year` defaults to the current season."""
+        year = year or self.current_season_year()
+        return self._get(*self._week_request(week, season_type, year))
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "revalidated": self.revalidated, "fetches": self.fetches, "entries": len(self._cache)}
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> NflDataClient:
+    """Process-wide client, so every tool call shares its cache and session."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = NflDataClient()
+        return _client
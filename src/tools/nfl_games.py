@@ -0,0 +1,196 @@
+"""
+nfl_games.py
+
+Compact game records and renderers for NFL scoreboard data.
+
+ESPN events are deeply nested (status/type, competitions/competitors/team);
+dumping them, or dicts built from them, into a prompt spends many tokens on
+keys. Here:
+- `Game`: one game as a `__slots__` record (`GAME_COLUMNS`)
+- `WeekTable`: the games of one week stored column-wise, so a week
+  serializes to one list per column instead of one dict per game
+- `render_summary`: token-minimal text for the prompt, one line per game
+  ("Cowboys 30 @ Lions 44 final")
+- `render_speech`: sentences that can go straight to TTS for direct score
+  questions ("The Lions beat the Cowboys 44 to 30."), skipping the LLM
+"""
+
+from datetime import datetime
+
+GAME_COLUMNS = ("away", "home", "away_score", "home_score", "state", "status", "kickoff")
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def nickname(team: str) -> str:
+    """Short team name for text ("Detroit Lions" -> "Lions")."""
+    if not team:
+        return "?"
+    return team.split()[-1]
+
+
+class Game:
+    """One game; scores are None before kickoff, `state` is ESPN's pre / in / post."""
+
+    __slots__ = GAME_COLUMNS
+
+    def __init__(self, away, home, away_score=None, home_score=None, state=None, status=None, kickoff=None):
+        self.away = away
+        self.home = home
+        self.away_score = away_score
+        self.home_score = home_score
+        self.state = state
+        self.status = status
+        self.kickoff = kickoff
+
+    @classmethod
+    def from_event(cls, event: dict):
+        status = (event.get("status") or {}).get("type", {})
+        state = status.get("state")
+        teams = {}
+        competitions = event.get("competitions") or []
+        if competitions:
+            for competitor in competitions[0].get("competitors", []):
+                teams[competitor.get("homeAway")] = competitor
+        home = teams.get("home") or {}
+        away = teams.get("away") or {}
+        started = state != "pre"
+        return cls(
+            (away.get("team") or {}).get("displayName"),
+            (home.get("team") or {}).get("displayName"),
+            _score(away.get("score")) if started else None,
+            _score(home.get("score")) if started else None,
+            state,
+            status.get("description"),
+            event.get("date"),
+        )
+
+    def kickoff_local(self):
+        """Kickoff as a local-time datetime, or None."""
+        if not self.kickoff:
+            return None
+        try:
+            return datetime.fromisoformat(self.kickoff.replace("Z", "+00:00")).astimezone()
+        except ValueError:
+            return None
+
+    def __repr__(self):
+        return f"Game({', '.join(f'{name}={getattr(self, name)!r}' for name in GAME_COLUMNS)})"
+
+    def __eq__(self, other):
+        return isinstance(other, Game) and all(getattr(self, n) == getattr(other, n) for n in GAME_COLUMNS)
+
+
+class WeekTable:
+    """The games of one week, stored column-wise (one list per `GAME_COLUMNS` entry)."""
+
+    __slots__ = ("season_type", "week", "label", "error", "columns")
+
+    def __init__(self, season_type=None, week=None, label=None, error=None):
+        self.season_type = season_type
+        self.week = week
+        self.label = label
+        self.error = error
+        self.columns = {name: [] for name in GAME_COLUMNS}
+
+    @classmethod
+    def from_events(cls, span, events):
+        """Table for a `CalendarSpan` week from the ESPN events of its scoreboard."""
+        table = cls(span.season_type, span.week, span.label)
+        for event in events:
+            table.append(Game.from_event(event))
+        return table
+
+    def append(self, game: Game):
+        for name in GAME_COLUMNS:
+            self.columns[name].append(getattr(game, name))
+
+    def __len__(self):
+        return len(self.columns["away"])
+
+    def games(self):
+        """Iterate the rows as `Game` records."""
+        for row in zip(*(self.columns[name] for name in GAME_COLUMNS)):
+            yield Game(*row)
+
+    def to_dict(self) -> dict:
+        return {
+            "season_type": self.season_type,
+            "week": self.week,
+            "label": self.label,
+            "error": self.error,
+            "games": self.columns,
+        }
+
+
+def _summary_line(game: Game) -> str:
+    away, home = nickname(game.away), nickname(game.home)
+    if game.state == "pre":
+        kickoff = game.kickoff_local()
+        when = kickoff.strftime("%a %m-%d %H:%M") if kickoff else "TBD"
+        return f"{away} @ {home} {when}"
+    status = "final" if game.state == "post" else "live"
+    if game.state == "post" and game.status and "OT" in game.status:
+        status = "final OT"
+    return f"{away} {game.away_score} @ {home} {game.home_score} {status}"
+
+
+def render_summary(tables) -> str:
+    """Token-minimal text of the weeks, for the prompt (kickoff times are local)."""
+    lines = []
+    for table in tables:
+        lines.append(f"{table.season_type} {table.label or table.week}")
+        if table.error:
+            lines.append("unavailable")
+        lines.extend(_summary_line(game) for game in table.games())
+    return "\n".join(lines)
+
+
+def _upper_first(text: str) -> str:
+    return text[:1].upper() + text[1:]
+
+
+def _speech_sentence(game: Game) -> str:
+    away, home = f"the {nickname(game.away)}", f"the {nickname(game.home)}"
+    if game.state == "pre":
+        kickoff = game.kickoff_local()
+        if kickoff is None:
+            return f"{_upper_first(away)} play {home}, kickoff to be announced."
+        time_text = kickoff.strftime("%I:%M %p").lstrip("0").replace(":00 ", " ")
+        return f"{_upper_first(away)} play {home} on {kickoff.strftime('%A')} at {time_text}."
+
+    if game.away_score is None or game.home_score is None:
+        return f"{_upper_first(away)} at {home}: {game.status or 'no score yet'}."
+    if game.away_score >= game.home_score:
+        leader, trailer, high, low = away, home, game.away_score, game.home_score
+    else:
+        leader, trailer, high, low = home, away, game.home_score, game.away_score
+
+    if game.state == "post":
+        overtime = " in overtime" if game.status and "OT" in game.status else ""
+        if high == low:
+            return f"{_upper_first(away)} and {home} tied {high} to {low}{overtime}."
+        return f"{_upper_first(leader)} beat {trailer} {high} to {low}{overtime}."
+    if high == low:
+        return f"{_upper_first(away)} and {home} are tied at {high}."
+    return f"{_upper_first(leader)} lead {trailer} {high} to {low}."
+
+
+def render_speech(tables) -> str:
+    """Sentences for TTS; weeks are named only when there are several."""
+    tables = [table for table in tables if len(table) or table.error]
+    if not tables:
+        return "There are no NFL games in that period."
+    parts = []
+    for table in tables:
+        if len(tables) > 1:
+            parts.append(f"{table.label or f'Week {table.week}'}:")
+        if table.error:
+            parts.append("Those games are unavailable right now.")
+        parts.extend(_speech_sentence(game) for game in table.games())
+    return " ".join(parts)
@@ -0,0 +1,166 @@
+"""
+registry.py
+
+Tools whose result is the complete answer.
+
+When the router picks `tool: "action"` with one of the actions registered
+here, the tool runs and its declared result template is rendered and spoken
+directly; the conversation call (one full LLM round trip) is skipped. A tool
+returns None when the utterance does not determine its result (e.g. "set a
+timer" without a duration) and raises on failures; in both cases `answer`
+returns None and the turn continues on the LLM path.
+
+Action names match `router_system_prompt` and the rules in
+`llm/local_router.py`.
+"""
+
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from . import timers
+from .waste import get_waste_collection_schedule
+
+
+class Tool:
+    """An action with a result template.
+
+    Args:
+        name: Action name as emitted by the router.
+        run: ``run(text)`` returning the result dict, or None if `text` does
+            not determine it.
+        template: `str.format` template filled from the result dict.
+    """
+
+    def __init__(self, name: str, run, template: str, description: str = ""):
+        self.name = name
+        self.run = run
+        self.template = template
+        self.description = description
+
+    def render(self, result: dict):
+        try:
+            return self.template.format(**result)
+        except (KeyError, IndexError):
+            return None
+
+
+class ToolAnswer:
+    """Result of a direct tool call: the rendered text plus the raw result."""
+
+    __slots__ = ("tool", "result", "text", "elapsed")
+
+    def __init__(self, tool: Tool, result: dict, text: str, elapsed: float):
+        self.tool = tool
+        self.result = result
+        self.text = text
+        self.elapsed = elapsed
+
+
+TOOLS = {}
+
+
+def register(name: str, template: str, description: str = ""):
+    """Decorator registering ``run(text)`` as the tool for action `name`."""
+    def decorator(run):
+        TOOLS[name] = Tool(name, run, template, description)
+        return run
+    return decorator
+
+
+def answer(action: str, text: str):
+    """Run the tool for `action` on `text`; returns a `ToolAnswer` or None (use the LLM)."""
+    tool = TOOLS.get(action or "")
+    if tool is None:
+        return None
+    started = time.perf_counter()
+    try:
+        result = tool.run(text)
+    except Exception as e:
+        print(f"[TOOL] {tool.name} failed:", str(e))
+        return None
+    if result is None:
+        return None
+    rendered = tool.render(result)
+    if not rendered:
+        return None
+    return ToolAnswer(tool, result, rendered, time.perf_counter() - started)
+
+
+def _spoken_time(now: datetime) -> str:
+    return now.strftime("%I:%M %p").lstrip("0")
+
+
+@register("get_time", "It's {time}.", "Current local time")
+def _get_time(text: str):
+    return {"time": _spoken_time(datetime.now())}
+
+
+@register("get_date", "Today is {weekday}, {month} {day}.", "Today's date")
+def _get_date(text: str):
+    today = date.today()
+    return {"weekday": today.strftime("%A"), "month": today.strftime("%B"), "day": today.day}
+
+
+@register("set_timer", "Okay, timer set for {duration}{purpose}.", "Start a timer")
+def _set_timer(text: str):
+    seconds = timers.parse_duration(text)
+    if not seconds:
+        return None
+    label = timers.parse_label(text)
+    timers.start_timer(seconds, label)
+    return {"duration": timers.describe(seconds), "purpose": f" for the {label}" if label else ""}
+
+
+@register("cancel_timer", "{speech}", "Cancel running timers")
+def _cancel_timer(text: str):
+    count = timers.cancel_timers()
+    if count == 0:
+        return {"speech": "There is no timer running."}
+    return {"speech": "Timer cancelled." if count == 1 else f"{count} timers cancelled."}
+
+
+@register("timer_status", "{speech}", "Time left on running timers")
+def _timer_status(text: str):
+    running = timers.running_timers()
+    if not running:
+        return {"speech": "There is no timer running."}
+    parts = [f"your {timer.name()} has {timers.describe(timer.remaining())} left" for timer in running]
+    speech = "; ".join(parts)
+    return {"speech": speech[:1].upper() + speech[1:] + "."}
+
+
+# NFL requests answered directly: this, last or next week's scores and nothing
+# more specific. A week number, date, season, holiday or team needs the search
+# path. The local router's rule uses the same pattern.
+NFL_SCORES_PATTERN = (
+    r"^(?:(?:what are|what were|what's|what is|show me|tell me|give me|read me|get) )?(?:the )?"
+    r"(?:latest |current )?(?:nfl (?:scores?|results?|games?|schedule)|(?:scores?|results?) (?:of|in|from) the nfl)"
+    r"(?: (?:for |from |of )?(?:the )?(?P<period>this|last|next|previous) week)?(?: please)?$"
+)
+_NFL_SCORES = re.compile(NFL_SCORES_PATTERN)
+_NFL_WEEK_OFFSET = {None: 0, "this": 0, "last": -7, "previous": -7, "next": 7}
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, punctuation to spaces (apostrophes kept), whitespace collapsed."""
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s']", " ", text.lower())).strip()
+
+
+@register("get_nfl_scores", "{speech}", "NFL scores and schedule of this, last or next week")
+def _get_nfl_scores(text: str):
+    from .nfl_async import get_nfl_schedule
+
+    match = _NFL_SCORES.match(normalize_utterance(text))
+    if match is None:
+        return None
+    day = date.today() + timedelta(days=_NFL_WEEK_OFFSET[match.group("period")])
+    schedule = get_nfl_schedule(day)
+    if any(week["error"] for week in schedule["weeks"]):
+        return None
+    return schedule
+
+
+@register("get_waste_collection", "{speech}", "Upcoming waste collection dates")
+def _get_waste_collection(text: str):
+    return get_waste_collection_schedule()
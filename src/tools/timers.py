@@ -0,0 +1,145 @@
+"""
+timers.py
+
+Kitchen timers for the `set_timer` / `cancel_timer` / `timer_status` actions.
+
+Durations are parsed from the utterance ("set a timer for fifteen minutes",
+"start a three minute timer for the eggs", "timer for 1 hour and 30
+minutes"). Each timer is a `threading.Timer`; when it goes off the handler
+set with `set_alarm_handler` is called with the timer (main speaks a
+notice, the default only prints).
+"""
+
+import re
+import threading
+import time
+
+_UNITS = {
+    "second": 1, "seconds": 1, "sec": 1, "secs": 1,
+    "minute": 60, "minutes": 60, "min": 60, "mins": 60,
+    "hour": 3600, "hours": 3600,
+}
+_SMALL = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14,
+    "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "ninety": 90}
+
+_ONES = "one|two|three|four|five|six|seven|eight|nine"
+_NUMBER = (
+    rf"\d+(?:\.\d+)?|(?:{'|'.join(_TENS)})(?:[ -](?:{_ONES}))?|"
+    + "|".join(sorted(_SMALL, key=len, reverse=True))
+)
+_AMOUNT = re.compile(
+    rf"\b(?P<number>{_NUMBER})[ -](?P<unit>{'|'.join(sorted(_UNITS, key=len, reverse=True))})\b(?P<half> and a half)?"
+)
+_HALF_UNIT = {"half an hour": "30 minutes", "half a minute": "30 seconds"}
+_FOR = re.compile(r"\b(?:for|called) (?:the |my )?")
+
+
+def _number(text: str) -> float:
+    if re.fullmatch(r"\d+(?:\.\d+)?", text):
+        return float(text)
+    total = 0
+    for word in re.split(r"[ -]", text):
+        total += _TENS.get(word, _SMALL.get(word, 0))
+    return float(total)
+
+
+def parse_duration(text: str):
+    """Seconds described in `text` (summing all amounts), or None if there is none."""
+    text = text.lower()
+    for phrase, amount in _HALF_UNIT.items():
+        text = text.replace(phrase, amount)
+    seconds = 0.0
+    for match in _AMOUNT.finditer(text):
+        amount = _number(match.group("number")) + (0.5 if match.group("half") else 0.0)
+        seconds += amount * _UNITS[match.group("unit")]
+    return seconds or None
+
+
+def parse_label(text: str):
+    """What the timer is for ("... timer for the eggs" -> "eggs"), or None."""
+    parts = _FOR.split(re.sub(r"[^\w\s]", "", text.lower()).strip())
+    label = parts[-1].strip() if len(parts) > 1 else ""
+    if not label or parse_duration(label) or not label.replace(" ", "").isalpha():
+        return None
+    return label
+
+
+def describe(seconds: float, adjective: bool = False) -> str:
+    """Spoken duration: 5400 -> "1 hour and 30 minutes" ("1 hour and 30 minute" as an adjective)."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    parts = []
+    for value, unit in ((hours, "hour"), (minutes, "minute"), (secs, "second")):
+        if value:
+            parts.append(f"{value} {unit}{'' if value == 1 or adjective else 's'}")
+    if not parts:
+        return "0 seconds"
+    return parts[0] if len(parts) == 1 else ", ".join(parts[:-1]) + " and " + parts[-1]
+
+
+class KitchenTimer:
+    """One running timer."""
+
+    def __init__(self, seconds: float, label: str = None):
+        self.seconds = seconds
+        self.label = label
+        self.ends = time.monotonic() + seconds
+        self._timer = threading.Timer(seconds, _fire, args=(self,))
+        self._timer.daemon = True
+
+    def remaining(self) -> float:
+        return max(0.0, self.ends - time.monotonic())
+
+    def name(self) -> str:
+        return f"{self.label} timer" if self.label else f"{describe(self.seconds, adjective=True)} timer"
+
+
+_timers = []
+_lock = threading.Lock()
+_alarm_handler = None
+
+
+def set_alarm_handler(handler):
+    """`handler(timer)` is called on the timer's thread when a timer goes off."""
+    global _alarm_handler
+    _alarm_handler = handler
+
+
+def _fire(timer: KitchenTimer):
+    with _lock:
+        if timer in _timers:
+            _timers.remove(timer)
+    print(f"[TIMER] {timer.name()} done")
+    if _alarm_handler is not None:
+        try:
+            _alarm_handler(timer)
+        except Exception as e:
+            print("[TIMER] Alarm handler failed:", str(e))
+
+
+def start_timer(seconds: float, label: str = None) -> KitchenTimer:
+    timer = KitchenTimer(seconds, label)
+    with _lock:
+        _timers.append(timer)
+    timer._timer.start()
+    return timer
+
+
+def cancel_timers() -> int:
+    """Cancel all running timers; returns how many there were."""
+    with _lock:
+        cancelled = list(_timers)
+        _timers.clear()
+    for timer in cancelled:
+        timer._timer.cancel()
+    return len(cancelled)
+
+
+def running_timers():
+    with _lock:
+        return sorted(_timers, key=lambda timer: timer.ends)
@@ -0,0 +1,97 @@
+"""
+waste.py
+
+Waste collection schedule from an iCalendar export (most municipal waste
+calendars offer one, e.g. "Abfallkalender als ICS").
+
+`WASTE_SCHEDULE_FILE` points at the .ics file. It is parsed once and again
+only when its modification time changes; only DTSTART dates and SUMMARY of
+the VEVENTs are used.
+"""
+
+import os
+import threading
+from datetime import date, timedelta
+
+WASTE_SCHEDULE_FILE = os.getenv("WASTE_SCHEDULE_FILE", "")
+
+_parsed = {}  # path -> (mtime, [(date, kind)])
+_lock = threading.Lock()
+
+
+def _unfold(text: str):
+    """iCalendar content lines (continuation lines start with a space or tab)."""
+    lines = []
+    for raw in text.splitlines():
+        if raw[:1] in (" ", "\t") and lines:
+            lines[-1] += raw[1:]
+        else:
+            lines.append(raw)
+    return lines
+
+
+def parse_ics(text: str):
+    """Sorted (date, kind) collections of an iCalendar text."""
+    collections = []
+    start = summary = None
+    for line in _unfold(text):
+        name, _, value = line.partition(":")
+        name = name.split(";", 1)[0].upper()
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            start = summary = None
+        elif name == "DTSTART":
+            digits = value.strip()[:8]
+            if digits.isdigit():
+                start = date(int(digits[:4]), int(digits[4:6]), int(digits[6:8]))
+        elif name == "SUMMARY":
+            summary = value.strip().replace("\\,", ",")
+        elif name == "END" and value.upper() == "VEVENT" and start and summary:
+            collections.append((start, summary))
+    return sorted(collections)
+
+
+def load_schedule(path: str = None):
+    """Collections from `path` (default `WASTE_SCHEDULE_FILE`); [] if none is configured."""
+    path = path or WASTE_SCHEDULE_FILE
+    if not path or not os.path.exists(path):
+        return []
+    mtime = os.path.getmtime(path)
+    with _lock:
+        cached = _parsed.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    with open(path, encoding="utf-8") as f:
+        collections = parse_ics(f.read())
+    with _lock:
+        _parsed[path] = (mtime, collections)
+    return collections
+
+
+def _spoken_day(day: date, today: date) -> str:
+    if day == today:
+        return "today"
+    if day == today + timedelta(days=1):
+        return "tomorrow"
+    if day - today < timedelta(days=7):
+        return f"on {day.strftime('%A')}"
+    return f"on {day.strftime('%A, %B')} {day.day}"
+
+
+def get_waste_collection_schedule(days: int = 14, today: date = None, path: str = None):
+    """Collections in the next `days` days, or None if no schedule is configured.
+
+    Returns a dict with "collections" ([{"date", "type"}]) and "speech".
+    """
+    schedule = load_schedule(path)
+    if not schedule:
+        return None
+    today = today or date.today()
+    upcoming = [(day, kind) for day, kind in schedule if today <= day <= today + timedelta(days=days)]
+    if upcoming:
+        speech = "Next up: " + "; ".join(f"{kind} {_spoken_day(day, today)}" for day, kind in upcoming) + "."
+    else:
+        speech = f"There is no waste collection in the next {days} days."
+    return {
+        "collections": [{"date": day.isoformat(), "type": kind} for day, kind in upcoming],
+        "speech": speech,
+    }
@@ -0,0 +1,130 @@
+"""
+transcription_pool.py
+
+Fixed-size worker pool for Whisper transcription jobs.
+
+- A bounded queue provides backpressure: when it is full, `submit` refuses
+  the job (or blocks, if asked to) instead of piling up more work.
+- Every job gets a sequence number and results are delivered strictly in
+  submission order, even when several workers run concurrently.
+- The pool size is matched with CTranslate2's `num_workers`, and
+  `cpu_threads` is derived from it so that workers x threads never exceeds
+  the available cores.
+"""
+
+import os
+import queue
+import threading
+
+
+def whisper_thread_config(num_workers: int = 1, cpu_count: int = None):
+    """Return (cpu_threads, num_workers) for a CPU WhisperModel.
+
+    CTranslate2 runs `num_workers` transcriptions in parallel with
+    `cpu_threads` threads each; splitting the cores between them keeps
+    throughput predictable on small machines.
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, cpu_count))
+    return max(1, cpu_count // num_workers), num_workers
+
+
+class TranscriptionExecutor:
+    """Ordered, bounded executor for transcription jobs.
+
+    Args:
+        num_workers: Number of worker threads; should equal the model's `num_workers`.
+        max_pending: Maximum number of queued (not yet running) jobs.
+    """
+
+    def __init__(self, num_workers: int = 1, max_pending: int = 1):
+        self.num_workers = num_workers
+        self._jobs = queue.Queue(maxsize=max_pending)
+
+        # Sequence bookkeeping for in-order delivery
+        self._lock = threading.Condition()
+        self._next_seq = 0  # Next sequence number handed out
+        self._deliver_seq = 0  # Next sequence number to deliver
+        self._done = {}  # seq -> (on_result, result, error)
+
+        # Counters for debugging / benchmarks
+        self.submitted = 0
+        self.rejected = 0
+
+        self._workers = [
+            threading.Thread(target=self._work, daemon=True, name=f"transcribe-{i}")
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, fn, *args, on_result=None, block: bool = False, timeout: float = None):
+        """Queue ``fn(*args)`` and return its sequence number.
+
+        `on_result(result)` is called in submission order once the job and all
+        jobs before it have finished. Returns None if the queue is full and
+        `block` is False (or `timeout` expired).
+        """
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+        try:
+            self._jobs.put((seq, fn, args, on_result), block=block, timeout=timeout)
+        except queue.Full:
+            # Give the sequence number back as a no-op so delivery does not stall
+            self._complete(seq, None, None, None)
+            self.rejected += 1
+            return None
+        self.submitted += 1
+        return seq
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            seq, fn, args, on_result = job
+            try:
+                result, error = fn(*args), None
+            except Exception as e:
+                result, error = None, e
+            self._complete(seq, on_result, result, error)
+
+    def _complete(self, seq, on_result, result, error):
+        """Store a finished job and deliver every result that is now in order."""
+        with self._lock:
+            self._done[seq] = (on_result, result, error)
+            while self._deliver_seq in self._done:
+                callback, value, err = self._done.pop(self._deliver_seq)
+                if err is not None:
+                    print(f"[TRANSCRIBE ERROR] job {self._deliver_seq}: {err}")
+                elif callback is not None:
+                    try:
+                        callback(value)
+                    except Exception as e:
+                        print(f"[TRANSCRIBE ERROR] result of job {self._deliver_seq}: {e}")
+                self._deliver_seq += 1
+            self._lock.notify_all()
+
+    def wait(self, seq: int, timeout: float = None) -> bool:
+        """Block until the job `seq` (and all before it) was delivered."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._deliver_seq > seq, timeout=timeout)
+
+    def drain(self, timeout: float = None) -> bool:
+        """Block until every job submitted so far was delivered."""
+        with self._lock:
+            target = self._next_seq
+            return self._lock.wait_for(lambda: self._deliver_seq >= target, timeout=timeout)
+
+    def shutdown(self, timeout: float = None):
+        """Finish the queued jobs, then stop the workers."""
+        for _ in self._workers:
+            self._jobs.put(None)
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def busy(self) -> bool:
+        """True while submitted jobs are still queued, running or undelivered."""
+        with self._lock:
+            return self._deliver_seq < self._next_seq
@@ -1,18 +1,25 @@
 import os
+import queue
 import wave
-from playsound3 import playsound
-from piper import PiperVoice
+import numpy as np
 import threading
+from collections import OrderedDict
+from sentence_chunker import split_sentences
+from tts_cache import TTSCache, file_hash
 
 # Project paths
 project_root = os.path.dirname(os.path.dirname(__file__))
 audio_dir = os.path.join(project_root, "audio")
 os.makedirs(audio_dir, exist_ok=True)
 
-# Cache for loaded voices
-_voice_cache = {}
+# Cache for loaded voices, least recently used first
+_voice_cache = OrderedDict()
 _voice_cache_lock = threading.Lock()
 
+# Memory budget for resident voices, approximated by their model file sizes;
+# 0 keeps every loaded voice resident
+VOICE_BUDGET_BYTES = int(float(os.getenv("TTS_VOICE_BUDGET_MB", "0")) * 1024 * 1024)
+
 # Map logical voice keys to relative voice file paths in the repo
 _VOICE_PATHS = {
     "en_US": os.path.join(project_root, "voices", "en-US", "en_US-amy-medium.onnx"),
@@ -20,48 +27,280 @@ _VOICE_PATHS = {
     "de": os.path.join(project_root, "voices", "de", "de_DE-thorsten-medium.onnx"),
 }
 
-def _load_voice(key: str) -> PiperVoice:
+# Phrase-level cache of synthesized audio; TTS_CACHE=0 disables it
+phrase_cache = None
+if os.getenv("TTS_CACHE", "1") != "0":
+    phrase_cache = TTSCache(
+        disk_dir=os.getenv("TTS_CACHE_DIR", os.path.join(audio_dir, "tts_cache")),
+        memory_bytes=int(float(os.getenv("TTS_CACHE_MEMORY_MB", "32")) * 1024 * 1024),
+        disk_bytes=int(float(os.getenv("TTS_CACHE_DISK_MB", "256")) * 1024 * 1024),
+    )
+
+# Hash of each voice's Piper config (.onnx.json), part of the cache key
+_config_hashes = {}
+
+def _load_voice(key: str):
     """Load and cache a PiperVoice for the given key."""
     key = key or "en_US"
     with _voice_cache_lock:
         if key in _voice_cache:
+            _voice_cache.move_to_end(key)
             return _voice_cache[key]
 
         path = _VOICE_PATHS.get(key)
         if not path or not os.path.exists(path):
             raise FileNotFoundError(f"Voice for key '{key}' not found at {path}")
 
+        # Imported on first use so importing tts stays cheap
+        from piper import PiperVoice
+
         voice = PiperVoice.load(path)
         _voice_cache[key] = voice
+        _evict_voices()
         return voice
 
+def _evict_voices():
+    """Unload least recently used voices until the rest fits VOICE_BUDGET_BYTES (lock held)."""
+    if not VOICE_BUDGET_BYTES:
+        return
+    sizes = {key: os.path.getsize(_VOICE_PATHS[key]) for key in _voice_cache}
+    # Never evict the most recently used voice
+    while len(_voice_cache) > 1 and sum(sizes.values()) > VOICE_BUDGET_BYTES:
+        key, _ = _voice_cache.popitem(last=False)
+        del sizes[key]
+        print(f"[TTS] Unloaded voice '{key}' (memory budget)")
+
+def available_voices():
+    """Keys of the configured voices whose model files exist."""
+    return [key for key, path in _VOICE_PATHS.items() if os.path.exists(path)]
+
+def warm_voice(key: str):
+    """Load a voice and run one dummy synthesis (bypassing the phrase cache)."""
+    voice = _load_voice(key)
+    for _ in voice.synthesize("Hello."):
+        pass
+    return voice
+
+def _config_hash(key: str) -> str:
+    if key not in _config_hashes:
+        path = _VOICE_PATHS.get(key)
+        _config_hashes[key] = file_hash(path + ".json") if path else ""
+    return _config_hashes[key]
+
 def synthesize_to_wav(text: str, voice_key: str, out_path: str):
     """Synthesize text to a WAV file at out_path using the selected voice."""
-    voice = _load_voice(voice_key)
     with wave.open(out_path, "wb") as wav_file:
-        voice.synthesize_wav(text, wav_file)
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(voice_sample_rate(voice_key))
+        for pcm in synthesize_pcm(text, voice_key):
+            wav_file.writeframes(pcm.tobytes())
+
+def synthesize_pcm(text: str, voice_key: str):
+    """Yield mono int16 PCM arrays for `text`, one per sentence.
 
-def play_wav(path: str, wait: bool = True):
+    Every sentence is looked up in `phrase_cache` first, so answers that
+    only partially repeat still reuse the sentences synthesized before.
+    """
+    voice_key = voice_key or "en_US"
+    for sentence in split_sentences(text):
+        key = None
+        if phrase_cache is not None:
+            key = phrase_cache.make_key(voice_key, _config_hash(voice_key), sentence)
+            cached = phrase_cache.get(key)
+            if cached is not None:
+                yield cached[1]
+                continue
+
+        voice = _load_voice(voice_key)
+        parts = [chunk.audio_int16_array.reshape(-1) for chunk in voice.synthesize(sentence)]
+        pcm = np.concatenate(parts) if parts else np.zeros(0, dtype=np.int16)
+        if key is not None:
+            phrase_cache.put(key, voice.config.sample_rate, pcm)
+        yield pcm
+
+def voice_sample_rate(voice_key: str) -> int:
+    return _load_voice(voice_key).config.sample_rate
+
+
+class StreamSink:
+    """Plays int16 PCM on the default output device while it is written."""
+
+    def __init__(self, samplerate: int, block_frames: int = 2048):
+        # Imported here so file output works without PortAudio (e.g. in Docker)
+        import sounddevice as sd
+
+        self.block_frames = block_frames
+        self.stream = sd.OutputStream(samplerate=samplerate, channels=1, dtype="int16")
+        self.stream.start()
+
+    def write(self, pcm, cancel=None) -> bool:
+        """Queue PCM for playback in small blocks; returns False once cancelled."""
+        for start in range(0, len(pcm), self.block_frames):
+            if cancel is not None and cancel.cancelled:
+                return False
+            self.stream.write(pcm[start:start + self.block_frames])
+        return True
+
+    def close(self, abort: bool = False):
+        """Finish playing what was written, or drop it immediately with `abort`."""
+        if abort:
+            self.stream.abort()
+        else:
+            self.stream.stop()
+        self.stream.close()
+
+
+class FileSink:
+    """Writes int16 PCM to a WAV file instead of playing it (for debugging)."""
+
+    def __init__(self, path: str, samplerate: int):
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(samplerate)
+
+    def write(self, pcm, cancel=None) -> bool:
+        if cancel is not None and cancel.cancelled:
+            return False
+        self._wav.writeframes(np.ascontiguousarray(pcm, dtype=np.int16).tobytes())
+        return True
+
+    def close(self, abort: bool = False):
+        self._wav.close()
+
+
+def create_sink(samplerate: int):
+    """Create the audio sink selected by the `TTS_OUTPUT` environment variable.
+
+    - ``stream`` (default): play on the default output device
+    - ``file`` or ``file:<path>``: write a WAV file (default audio/tts_recent.wav)
+    """
+    kind, _, arg = os.getenv("TTS_OUTPUT", "stream").partition(":")
+    if kind == "file":
+        return FileSink(arg or os.path.join(audio_dir, "tts_recent.wav"), samplerate)
+    return StreamSink(samplerate)
+
+def play_wav(path: str, wait: bool = True, cancel=None):
     """
     Play a WAV file on the default audio device using playsound3.
 
-    If wait is False, playback happens in the background.
+    If wait is False, playback happens in the background. With a `cancel`
+    token, playback blocks until it finishes or the token is cancelled.
     """
-    playsound(path, block=wait)
+    from playsound3 import playsound
 
-def speak(text: str, voice: str = "en_US", wait: bool = True) -> str:
+    if cancel is None:
+        playsound(path, block=wait)
+        return
+
+    sound = playsound(path, block=False)
+    while sound.is_alive():
+        if cancel.wait(0.05):
+            sound.stop()
+            return
+
+def speak(text: str, voice: str = "en_US", wait: bool = True, cancel=None):
     """
     Synthesize `text` using `voice` and play it on the default device.
+    Playback starts with the first synthesized sentence; cached sentences skip Piper.
     If wait is False, playback happens in the background.
+    If a `cancel` token is given, playback stops as soon as it is cancelled.
+    """
+    if not wait:
+        threading.Thread(target=speak, args=(text, voice, True, cancel), daemon=True).start()
+        return
+
+    sink = create_sink(voice_sample_rate(voice))
+    completed = False
+    try:
+        for pcm in synthesize_pcm(text, voice):
+            if not sink.write(pcm, cancel):
+                break
+        else:
+            completed = True
+    finally:
+        sink.close(abort=not completed)
+
+def _put(q: queue.Queue, item, cancel=None) -> bool:
+    """Put into a bounded queue without blocking forever once cancelled."""
+    while True:
+        if cancel is not None and cancel.cancelled:
+            return False
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
 
-    Returns the path to the generated WAV file.
+def speak_stream(chunks, voice: str = "en_US", cancel=None, on_first_audio=None) -> str:
     """
-    fname = "tts_recent.wav"
-    out_path = os.path.join(audio_dir, fname)
+    Synthesize and play text chunks (e.g. sentences of a streamed LLM reply)
+    as they arrive. Synthesis runs ahead of playback and all chunks go into
+    one output stream, so the first sentence is heard before the reply is
+    complete and there are no gaps between sentences.
+
+    `on_first_audio` is called right before the first audio is written. Blocks
+    until everything was played or `cancel` is cancelled. Returns the text of
+    the chunks whose audio was played completely, so a reply cut short by
+    `cancel` is not recorded as said in full.
+    """
+    # (chunk, None) follows the last PCM of `chunk`
+    pcm_queue = queue.Queue(maxsize=8)
+    spoken = []
+    errors = []
+
+    def synthesize():
+        try:
+            for chunk in chunks:
+                if cancel is not None and cancel.cancelled:
+                    break
+                for pcm in synthesize_pcm(chunk, voice):
+                    if not _put(pcm_queue, (None, pcm), cancel):
+                        return
+                if not _put(pcm_queue, (chunk, None), cancel):
+                    return
+        except Exception as e:
+            # A chunk source that stops because of `cancel` (e.g. a reply stream
+            # raising `Cancelled`) ends the playback; what was played is returned
+            if cancel is None or not cancel.cancelled:
+                errors.append(e)
+        finally:
+            _put(pcm_queue, None, cancel)
+
+    threading.Thread(target=synthesize, daemon=True).start()
 
-    synthesize_to_wav(text, voice, out_path)
-    play_wav(out_path, wait=wait)
+    sink = None
+    completed = False
+    try:
+        while True:
+            try:
+                item = pcm_queue.get(timeout=0.1)
+            except queue.Empty:
+                if cancel is not None and cancel.cancelled:
+                    break
+                continue
+            if item is None:
+                completed = True
+                break
+            chunk, pcm = item
+            if pcm is None:
+                # Every PCM of the chunk was written
+                spoken.append(chunk)
+                continue
+            if sink is None:
+                if on_first_audio is not None:
+                    on_first_audio()
+                sink = create_sink(voice_sample_rate(voice))
+            if not sink.write(pcm, cancel):
+                break
+    finally:
+        if sink is not None:
+            sink.close(abort=not completed)
 
-    return out_path
+    if errors:
+        raise errors[0]
+    return " ".join(spoken)
 
-__all__ = ["speak", "play_wav"]
\ No newline at end of file
+__all__ = ["speak", "speak_stream", "play_wav"]
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+tts_cache.py
+
+Content-addressed cache for synthesized speech.
+
+Many replies repeat (greetings, "I couldn't find that", score readouts), so
+synthesized PCM is cached per sentence. The key is a hash of the voice key,
+a hash of the voice's Piper config and the text (whitespace collapsed, case
+kept); changing the voice model or its config therefore never serves stale
+audio.
+
+Two tiers:
+- memory: LRU bounded by total PCM bytes
+- disk: one WAV file per entry, evicted oldest-used first once the
+  directory exceeds its byte budget
+
+Hit/miss counters show whether the cache pays off (`stats()` / `report()`).
+"""
+
+import hashlib
+import os
+import re
+import threading
+import wave
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-wrapped text shares one entry.
+
+    Case is kept: Piper reads "US"/"us", "WHO"/"who" or "May"/"may" differently.
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def file_hash(path: str) -> str:
+    """Hash of a file's content (e.g. a Piper .onnx.json config); '' if missing."""
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return ""
+
+
+class TTSCache:
+    """Two-tier (memory LRU + disk) cache of synthesized int16 PCM.
+
+    Args:
+        disk_dir: Directory for the disk tier; None disables it.
+        memory_bytes: Byte budget of the in-memory tier.
+        disk_bytes: Byte budget of the disk tier.
+    """
+
+    def __init__(self, disk_dir: str = None, memory_bytes: int = 32 * 1024 * 1024, disk_bytes: int = 256 * 1024 * 1024):
+        self.disk_dir = disk_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()  # key -> (samplerate, pcm)
+        self._memory_size = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._disk_size = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_size = sum(
+                entry.stat().st_size for entry in os.scandir(disk_dir) if entry.name.endswith(".wav")
+            )
+
+    @staticmethod
+    def make_key(voice_key: str, config_hash: str, text: str) -> str:
+        raw = f"{voice_key}\0{config_hash}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".wav")
+
+    def get(self, key: str):
+        """Return (samplerate, pcm) for `key`, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, entry)
+        return entry
+
+    def put(self, key: str, samplerate: int, pcm):
+        """Store PCM in both tiers."""
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+        with self._lock:
+            self._remember(key, (samplerate, pcm))
+        self._write_disk(key, samplerate, pcm)
+
+    def _remember(self, key, entry):
+        """Insert into the memory LRU and evict down to its budget (lock held)."""
+        if key in self._memory:
+            self._memory_size -= self._memory.pop(key)[1].nbytes
+        self._memory[key] = entry
+        self._memory_size += entry[1].nbytes
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, (_, old) = self._memory.popitem(last=False)
+            self._memory_size -= old.nbytes
+
+    def _read_disk(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with wave.open(path, "rb") as wav_file:
+                samplerate = wav_file.getframerate()
+                pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+            # Touch so eviction treats it as recently used
+            os.utime(path)
+            return samplerate, pcm
+        except (OSError, EOFError, wave.Error):
+            return None
+
+    def _write_disk(self, key, samplerate, pcm):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with wave.open(tmp_path, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(samplerate)
+                wav_file.writeframes(pcm.tobytes())
+            # Atomic rename, so readers never see half-written files
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[TTS CACHE] write failed: {e}")
+            return
+        with self._lock:
+            self._disk_size += os.path.getsize(path)
+            over_budget = self._disk_size > self.disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier fits its budget."""
+        entries = sorted(
+            (entry for entry in os.scandir(self.disk_dir) if entry.name.endswith(".wav")),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        size = sum(entry.stat().st_size for entry in entries)
+        target = self.disk_bytes * 0.9  # Leave headroom so we do not evict on every write
+        for entry in entries:
+            if size <= target:
+                break
+            try:
+                entry_size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+        with self._lock:
+            self._disk_size = size
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_size,
+            "disk_bytes": self._disk_size,
+            "disk_evictions": self.evictions,
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (
+            f"[TTS CACHE] hits {s['memory_hits']} memory / {s['disk_hits']} disk, misses {s['misses']} "
+            f"({s['hit_rate']:.0%} hit rate), memory {s['memory_bytes'] / 1e6:.1f} MB, "
+            f"disk {s['disk_bytes'] / 1e6:.1f} MB"
+        )
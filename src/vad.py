@@ -0,0 +1,289 @@
+"""
+vad.py
+
+Voice activity detection for StreamingSTT.
+
+Audio chunks are split into short frames (10-32 ms) and every frame gets a
+raw speech/non-speech decision from a backend:
+- "energy" (default, no extra dependencies): frame energy against an
+  adaptive noise floor, combined with spectral flatness and the share of
+  energy in the speech band. Keyboard clicks and fan noise are broadband
+  (flat spectrum) and rarely pass.
+- "silero": Silero VAD ONNX model via onnxruntime (a Piper dependency).
+  Needs the model file, see `SILERO_VAD_MODEL`.
+- "webrtc": Google's WebRTC VAD via the optional `webrtcvad` package.
+
+Raw decisions are smoothed the same way for every backend: speech only
+starts after a few consecutive speech frames (short clicks are rejected) and
+a hangover keeps it active briefly after the last speech frame, so word
+endings and short gaps are not cut off.
+
+Select the backend with the `VAD_BACKEND` environment variable.
+"""
+
+import abc
+import os
+
+import numpy as np
+
+
+class FrameVAD(abc.ABC):
+    """Shared framing, smoothing and statistics for all VAD backends.
+
+    Args:
+        samplerate: Sample rate of the audio chunks.
+        frame_ms: Frame length the backend decides on.
+        onset_ms: Consecutive speech needed before speech starts.
+        hangover_ms: How long speech stays active after the last speech frame.
+    """
+
+    def __init__(self, samplerate: int = 16000, frame_ms: float = 20, onset_ms: float = 60, hangover_ms: float = 240):
+        self.samplerate = samplerate
+        self.frame_size = int(samplerate * frame_ms / 1000)
+        self.onset_frames = max(1, int(round(onset_ms / frame_ms)))
+        self.hangover_frames = max(0, int(round(hangover_ms / frame_ms)))
+
+        # Smoothing state
+        self._in_speech = False
+        self._run = 0  # Consecutive raw speech frames while not in speech
+        self._hang = 0  # Remaining hangover frames while in speech
+        # Samples left over from the previous chunk (chunks need not be frame aligned)
+        self._carry = np.zeros(0, dtype=np.float32)
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.raw_speech_frames = 0
+        self.speech_frames = 0
+        self.speech_chunks = 0
+        self.silence_chunks = 0
+        self.onsets = 0
+        self.rejected_bursts = 0  # Speech bursts shorter than the onset time
+
+    def _frames(self, audio_chunk):
+        """Split a chunk into whole frames, carrying the remainder to the next call."""
+        audio = np.concatenate([self._carry, audio_chunk]) if len(self._carry) else audio_chunk
+        n = len(audio) // self.frame_size
+        self._carry = np.array(audio[n * self.frame_size:], dtype=np.float32)
+        return audio[:n * self.frame_size].reshape(n, self.frame_size)
+
+    @abc.abstractmethod
+    def _raw_decisions(self, frames):
+        """Return one bool per frame. Implemented by the backends."""
+
+    def calibrate(self, audio_chunk):
+        """Feed audio that is not being transcribed (e.g. while idle).
+
+        Only backends with an adaptive noise floor use this.
+        """
+
+    def is_speech(self, audio_chunk) -> bool:
+        """Return True if the chunk contains (smoothed) speech."""
+        frames = self._frames(audio_chunk)
+        has_speech = False
+        for raw in self._raw_decisions(frames):
+            self.frames += 1
+            if raw:
+                self.raw_speech_frames += 1
+
+            if self._in_speech:
+                if raw:
+                    self._hang = self.hangover_frames
+                elif self._hang > 0:
+                    self._hang -= 1
+                else:
+                    self._in_speech = False
+            elif raw:
+                self._run += 1
+                if self._run >= self.onset_frames:
+                    self._in_speech = True
+                    self._hang = self.hangover_frames
+                    self._run = 0
+                    self.onsets += 1
+            elif self._run:
+                self.rejected_bursts += 1
+                self._run = 0
+
+            if self._in_speech:
+                self.speech_frames += 1
+                has_speech = True
+
+        if has_speech:
+            self.speech_chunks += 1
+        else:
+            self.silence_chunks += 1
+        return has_speech
+
+    def stats(self) -> dict:
+        """Speech/non-speech counters for tuning."""
+        return {
+            "backend": self.name,
+            "frames": self.frames,
+            "raw_speech_frames": self.raw_speech_frames,
+            "speech_frames": self.speech_frames,
+            "speech_ratio": self.speech_frames / self.frames if self.frames else 0.0,
+            "speech_chunks": self.speech_chunks,
+            "silence_chunks": self.silence_chunks,
+            "onsets": self.onsets,
+            "rejected_bursts": self.rejected_bursts,
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (
+            f"[VAD] {s['backend']}: speech {s['speech_frames']}/{s['frames']} frames "
+            f"({s['speech_ratio']:.0%}), chunks {s['speech_chunks']} speech / {s['silence_chunks']} silence, "
+            f"onsets {s['onsets']}, rejected bursts {s['rejected_bursts']}"
+        )
+
+
+class EnergySpectralVAD(FrameVAD):
+    """Energy + spectral shape VAD with an adaptive noise floor.
+
+    A frame is raw speech if it is `snr_db` louder than the noise floor,
+    louder than `min_rms`, not spectrally flat and carries enough energy in
+    the 300-3400 Hz speech band.
+    """
+
+    name = "energy"
+
+    def __init__(
+        self,
+        samplerate: int = 16000,
+        frame_ms: float = 20,
+        snr_db: float = 10.0,
+        min_rms: float = 0.002,
+        max_flatness: float = 0.45,
+        min_band_ratio: float = 0.45,
+        calibration_ms: float = 500,
+        **kwargs,
+    ):
+        super().__init__(samplerate=samplerate, frame_ms=frame_ms, **kwargs)
+        self.snr_db = snr_db
+        self.min_rms = min_rms
+        self.max_flatness = max_flatness
+        self.min_band_ratio = min_band_ratio
+
+        self._window = np.hanning(self.frame_size).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_size, 1.0 / samplerate)
+        self._band = (freqs >= 300) & (freqs <= 3400)
+
+        # Noise floor in dBFS; None until calibrated
+        self.noise_floor_db = None
+        self._calibration_frames = max(1, int(calibration_ms / frame_ms))
+        self._calibration = []
+
+    def _features(self, frames):
+        rms = np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10
+        db = 20 * np.log10(rms)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        band_ratio = power[:, self._band].sum(axis=1) / power.sum(axis=1)
+        return rms, db, flatness, band_ratio
+
+    def _update_floor(self, frame_db):
+        """Track the noise floor: fast when the level drops, slow when it rises."""
+        if self.noise_floor_db is None:
+            self._calibration.append(frame_db)
+            if len(self._calibration) >= self._calibration_frames:
+                self.noise_floor_db = float(np.median(self._calibration))
+                self._calibration = []
+            return
+        alpha = 0.2 if frame_db < self.noise_floor_db else 0.02
+        self.noise_floor_db += alpha * (frame_db - self.noise_floor_db)
+
+    def calibrate(self, audio_chunk):
+        # Idle audio can still contain speech (other people, the wake word);
+        # like during recording, only frames judged as noise move the floor
+        self._raw_decisions(self._frames(audio_chunk))
+
+    def _raw_decisions(self, frames):
+        if len(frames) == 0:
+            return []
+        rms, db, flatness, band_ratio = self._features(frames)
+        decisions = []
+        for i in range(len(frames)):
+            floor = self.noise_floor_db
+            loud = rms[i] > self.min_rms and (floor is None or db[i] > floor + self.snr_db)
+            speech = bool(loud and flatness[i] < self.max_flatness and band_ratio[i] > self.min_band_ratio)
+            if not speech:
+                self._update_floor(float(db[i]))
+            decisions.append(speech)
+        return decisions
+
+    def stats(self) -> dict:
+        s = super().stats()
+        s["noise_floor_db"] = self.noise_floor_db
+        return s
+
+
+class SileroVAD(FrameVAD):
+    """Silero VAD (v5 ONNX) running on 32 ms frames via onnxruntime."""
+
+    name = "silero"
+
+    def __init__(self, model_path: str, samplerate: int = 16000, threshold: float = 0.5, **kwargs):
+        import onnxruntime
+
+        if samplerate != 16000:
+            raise ValueError("SileroVAD only supports 16 kHz audio here")
+        super().__init__(samplerate=samplerate, frame_ms=32, **kwargs)
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = 1
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.threshold = threshold
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._sr = np.array(samplerate, dtype=np.int64)
+        # v5 expects the last 64 samples of the previous frame as context
+        self._context = np.zeros(64, dtype=np.float32)
+        self.last_probability = 0.0
+
+    def _raw_decisions(self, frames):
+        decisions = []
+        for frame in frames:
+            x = np.concatenate([self._context, frame]).astype(np.float32)[np.newaxis, :]
+            prob, self._state = self.session.run(None, {"input": x, "state": self._state, "sr": self._sr})
+            self._context = frame[-64:].astype(np.float32)
+            self.last_probability = float(prob[0][0])
+            decisions.append(self.last_probability >= self.threshold)
+        return decisions
+
+
+class WebRtcVAD(FrameVAD):
+    """WebRTC VAD (GMM based) on 10/20/30 ms int16 frames."""
+
+    name = "webrtc"
+
+    def __init__(self, samplerate: int = 16000, frame_ms: float = 20, aggressiveness: int = 2, **kwargs):
+        import webrtcvad
+
+        if frame_ms not in (10, 20, 30):
+            raise ValueError("WebRTC VAD supports 10, 20 or 30 ms frames")
+        super().__init__(samplerate=samplerate, frame_ms=frame_ms, **kwargs)
+        self.vad = webrtcvad.Vad(aggressiveness)
+
+    def _raw_decisions(self, frames):
+        pcm = (np.clip(frames, -1.0, 1.0) * 32767).astype(np.int16)
+        return [self.vad.is_speech(frame.tobytes(), self.samplerate) for frame in pcm]
+
+
+def create_vad(samplerate: int = 16000, backend: str = None) -> FrameVAD:
+    """Create the configured VAD backend, falling back to the energy VAD.
+
+    `backend` defaults to the `VAD_BACKEND` environment variable ("energy",
+    "silero" or "webrtc"). Silero reads its model path from `SILERO_VAD_MODEL`.
+    """
+    backend = (backend or os.getenv("VAD_BACKEND", "energy")).lower()
+    try:
+        if backend == "silero":
+            model_path = os.getenv("SILERO_VAD_MODEL", "")
+            if not model_path or not os.path.exists(model_path):
+                raise FileNotFoundError(f"Silero VAD model not found at '{model_path}'")
+            return SileroVAD(model_path, samplerate=samplerate)
+        if backend == "webrtc":
+            return WebRtcVAD(samplerate=samplerate)
+    except (ImportError, FileNotFoundError) as e:
+        print(f"[VAD] {backend} backend unavailable ({e}), using energy VAD")
+    return EnergySpectralVAD(samplerate=samplerate)
@@ -22,97 +22,243 @@ Given those constraints, the helpers below provide small, developer-friendly
 peeks into search results rather than complete page text. The snippet might not have the full answer,
 but it always provides context and keywords closely related to your search.
 For expected workload with bigger context requirement, consider adding a tool call for this task.
+
+Performance:
+- The sources run concurrently, each with its own deadline
+  (`WIKI_TIMEOUT`, `SEARCH_TIMEOUT`); a late source contributes nothing
+  instead of holding up the answer.
+- Complete results are cached per normalized query for
+  `WEB_SEARCH_CACHE_TTL` seconds.
+- Wikipedia is queried through the MediaWiki API directly (one request for
+  search + extract instead of two) on a persistent `requests.Session`.
+  `WIKI_API_URL` points it elsewhere (e.g. a local fake server).
+- `SEARCH_API_URL` replaces DuckDuckGo with an HTTP JSON search endpoint
+  (``GET <url>?q=<query>&max_results=<n>&format=json`` returning
+  ``{"results": [{"title": ..., "body"/"content": ...}]}``, e.g. SearXNG).
 """
 
-from ddgs import DDGS
-import wikipedia
 
-def get_wikipedia_info(search_prompt):
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from llm.cache import normalize_prompt
+
+WIKI_API_URL = os.getenv("WIKI_API_URL", "https://en.wikipedia.org/w/api.php")
+SEARCH_API_URL = os.getenv("SEARCH_API_URL", "")
+WIKI_TIMEOUT = float(os.getenv("WIKI_TIMEOUT", "2.5"))
+SEARCH_TIMEOUT = float(os.getenv("SEARCH_TIMEOUT", "3.0"))
+# Cap of the fetched lead section; context_builder picks the paragraphs that are sent
+WIKI_EXCERPT_CHARS = int(os.getenv("WIKI_EXCERPT_CHARS", "10000"))
+
+
+class SearchCache:
+    """Small TTL cache of complete search outputs, keyed on (category, normalized query).
+
+    An entry also answers requests for fewer results than it holds.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # (category, normalized query) -> (expires_at, max_results, output)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, category: str, query: str, max_results: int = 15):
+        """Return a copy of the cached output or None."""
+        key = (category, normalize_prompt(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            if entry[1] < max_results:
+                return None
+            self._entries.move_to_end(key)
+            output = dict(entry[2])
+        output["results"] = output["results"][:max_results]
+        return output
+
+    def put(self, category: str, query: str, output: dict, max_results: int = 15):
+        key = (category, normalize_prompt(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, max_results, dict(output))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Complete results per (category, normalized query)
+search_cache = SearchCache(ttl=float(os.getenv("WEB_SEARCH_CACHE_TTL", "300")))
+
+# Sources of one query run side by side; late ones keep running in the pool
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="web-search")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Shared HTTP session, so repeated lookups reuse TCP/TLS connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+
+            _session = requests.Session()
+            _session.headers["User-Agent"] = "sebot/1.0 (voice assistant)"
+        return _session
+
+
+def preload():
+    """Import the search backends ahead of the first query (e.g. in the background)."""
+    get_session()
+    if not SEARCH_API_URL:
+        from ddgs import DDGS  # noqa: F401
+
+
+def _fetch_wikipedia(search_prompt, timeout: float = WIKI_TIMEOUT):
+    """Search + plain-text extract of the top result in one MediaWiki API request; raises on errors."""
+    params = {
+        "action": "query",
+        "format": "json",
+        "generator": "search",
+        "gsrsearch": search_prompt,
+        "gsrlimit": 1,
+        "prop": "extracts",
+        # Lead section only; exchars would be capped at 1200 characters by the API
+        "exintro": 1,
+        "explaintext": 1,
+        "redirects": 1,
+    }
+    response = get_session().get(WIKI_API_URL, params=params, timeout=timeout)
+    response.raise_for_status()
+    pages = response.json().get("query", {}).get("pages", {})
+    if not pages:
+        return ""
+    # We deliberately slice the content to limit token usage downstream.
+    page = next(iter(pages.values()))
+    return page.get("extract", "")[:WIKI_EXCERPT_CHARS]
+
+
+def get_wikipedia_info(search_prompt, timeout: float = WIKI_TIMEOUT):
     """Return a short excerpt from the top Wikipedia page for the prompt.
 
     Behaviour:
-    - Uses the `wikipedia` package to search for the query and fetch the top
-        result's page content.
-    - Returns only the first ~2000 characters to keep the excerpt small and
-        avoid sending large documents to downstream systems.
-    - Any exception (no results, disambiguation, network error) results in an
+    - Searches and fetches the plain-text extract of the top result in one
+        MediaWiki API request (generator=search + prop=extracts).
+    - Asks only for the lead section (`exintro`), not the whole article, and
+        returns at most `WIKI_EXCERPT_CHARS` characters of it; context_builder
+        then picks the paragraphs that are actually sent downstream.
+    - Any exception (no results, network error, timeout) results in an
         empty string so callers can handle absence of wiki text gracefully.
     """
-
-    # Get search results (may be empty)
-    results = wikipedia.search(search_prompt)
-
     try:
-        # Fetch the top result's page content and return a short excerpt.
-        # We deliberately slice the content to limit token usage downstream.
-        page = wikipedia.page(results[0])
-        return page.content[:2500]
-    except Exception:
-        # Return empty text upon any error (robust failure mode)
+        return _fetch_wikipedia(search_prompt, timeout)
+    except Exception as e:
+        print("[WIKI ERROR]", str(e))
         return ""
 
 
-def get_relevant_webtext(search_prompt, max_results=10):
+def _format_results(results):
+    """Keep only title and snippet of each result as a compact string."""
+    relevant_text = []
+    for r in results:
+        # Results are small dicts with keys like 'href'/'url', 'title', 'body'/'content'.
+        title = r.get("title", "")
+        snippet = r.get("body") or r.get("content", "")
+        relevant_text.append(f"Title: {title}\nSnippet: {snippet}")
+    return relevant_text
+
+
+def get_relevant_webtext(search_prompt, max_results=10, timeout: float = SEARCH_TIMEOUT):
     """Return a list of lightweight "peek" strings for search results.
 
     For each result we only keep:
     - Title
-    - Short snippet/body provided by the DDGS search response
+    - Short snippet/body provided by the search response
 
     This intentionally avoids fetching and returning full page HTML/text.
+    Uses the HTTP JSON endpoint at `SEARCH_API_URL` if configured, DuckDuckGo
+    (via DDGS) otherwise.
     """
+    if SEARCH_API_URL:
+        response = get_session().get(
+            SEARCH_API_URL,
+            params={"q": search_prompt, "max_results": max_results, "format": "json"},
+            timeout=timeout,
+        )
+        response.raise_for_status()
+        return _format_results(response.json().get("results", [])[:max_results])
+
+    from ddgs import DDGS
 
     # DDGS.text returns an iterator/generator; request a limited number of
     # results to keep response size predictable.
-    results = DDGS().text(search_prompt, max_results=max_results)
-
-    relevant_text = []
-
-    for r in results:
-        # DDGS result is a small dict with keys like 'href', 'title', 'body'.
-        # url = r.get('href')
-        title = r.get("title", "")
-        snippet = r.get("body", "")
-
-        text = f"Title: {title}\nSnippet: {snippet}"
-        relevant_text.append(text)
-
-    return relevant_text
+    results = DDGS(timeout=int(max(1, timeout))).text(search_prompt, max_results=max_results)
+    return _format_results(results)
 
 
 def run_web_search(prompt: str, category: str = "web_search", max_results: int = 15):
     """Run a lightweight web search and optionally a short Wikipedia lookup.
 
+    Both sources run concurrently. A source that misses its deadline (or
+    fails) contributes an empty value, the other one is still returned.
+
     Args:
         prompt (str): The search query string to run.
         category (str): Controls wiki lookup behavior. "web_search" (default)
-            runs only the DuckDuckGo peek. "web_search_with_wiki" also fetches
+            runs only the search peek. "web_search_with_wiki" also fetches
             a short Wikipedia excerpt.
-        max_results (int): Max number of DDGS results to collect.
+        max_results (int): Max number of search results to collect.
 
     Returns:
         dict: A dict with keys:
             - "prompt" (str): The final search prompt used.
             - "wiki" (str): Short Wikipedia excerpt or empty string.
-            - "results" (list[str]): Compact title/snippet strings from DDGS.
+            - "results" (list[str]): Compact title/snippet strings.
     """
+    cached = search_cache.get(category, prompt, max_results)
+    if cached is not None:
+        return cached
 
+    started = time.perf_counter()
+    futures = {"results": _executor.submit(get_relevant_webtext, prompt, max_results)}
+    deadlines = {"results": SEARCH_TIMEOUT}
     # Only run wiki search if specifically requested
-    wiki_text = ""
     if category == "web_search_with_wiki":
-        wiki_text = get_wikipedia_info(prompt)
+        futures["wiki"] = _executor.submit(_fetch_wikipedia, prompt)
+        deadlines["wiki"] = WIKI_TIMEOUT
 
-    results = get_relevant_webtext(prompt, max_results=max_results)
+    output = {"prompt": prompt, "wiki": "", "results": []}
+    complete = True
+    for name, future in futures.items():
+        remaining = deadlines[name] - (time.perf_counter() - started)
+        done, _ = wait([future], timeout=max(0.0, remaining))
+        if not done:
+            print(f"[WEB SEARCH] {name} missed its {deadlines[name]:.1f}s deadline, answering without it")
+            complete = False
+            continue
+        try:
+            output[name] = future.result()
+        except Exception as e:
+            print(f"[WEB SEARCH] {name} failed: {e}")
+            complete = False
 
-    return {
-        "prompt": prompt,
-        "wiki": wiki_text,
-        "results": results,
-    }
+    # Partial results are not cached, the next query should try again
+    if complete:
+        search_cache.put(category, prompt, output, max_results)
+    return dict(output)
 
 
 # Example usage (kept here for demo / development only)
 if __name__ == "__main__":
     res = run_web_search("NFL results last week")
     print(res.get("wiki"))
-    print(res.get("results"))
\ No newline at end of file
+    print(res.get("results"))
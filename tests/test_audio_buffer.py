@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from audio_buffer import AudioRingBuffer
+
+
+def _ramp(start, stop):
+    return np.arange(start, stop, dtype=np.float32)
+
+
+def test_read_without_wrap_is_a_view():
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 5))
+    view = ring.read(1, 4)
+    assert view.tolist() == [1, 2, 3]
+    assert view.base is not None
+
+
+def test_wraparound_keeps_absolute_indices():
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 6))
+    ring.write(_ramp(6, 11))
+    assert ring.total_written == 11 and ring.oldest == 3
+    assert ring.read(3).tolist() == list(range(3, 11))
+    assert ring.read(5, 10).tolist() == [5, 6, 7, 8, 9]
+
+
+def test_block_larger_than_capacity_keeps_the_newest_samples():
+    ring = AudioRingBuffer(4)
+    ring.write(_ramp(0, 3))
+    ring.write(_ramp(3, 13))
+    assert ring.total_written == 13 and ring.oldest == 9
+    assert ring.read(9).tolist() == [9, 10, 11, 12]
+
+
+def test_many_small_writes_across_several_wraps():
+    ring = AudioRingBuffer(7)
+    for start in range(0, 40, 3):
+        ring.write(_ramp(start, start + 3))
+    assert ring.read(ring.oldest).tolist() == list(range(35, 42))
+
+
+@pytest.mark.parametrize("start, end", [(0, 4), (10, 13), (6, 5)])
+def test_unavailable_ranges_raise(start, end):
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 12))
+    with pytest.raises(ValueError):
+        ring.read(start, end)
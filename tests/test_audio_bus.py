@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+
+from audio_bus import AudioBus
+
+
+class BlockSource:
+    """Drives the bus callback with `blocks` blocks of `size` samples from the calling thread."""
+
+    def __init__(self, blocks, size):
+        self.blocks = blocks
+        self.size = size
+        self.thread = None
+
+    def run(self, callback, stop_event=None):
+        self.thread = threading.get_ident()
+        for i in range(self.blocks):
+            block = np.full((self.size, 1), i, dtype=np.float32)
+            callback(block, self.size, None, None)
+
+
+def test_push_fans_out_frames_of_each_size():
+    bus = AudioBus(buffer_seconds=1)
+    small, large = [], []
+    bus.subscribe(lambda frame, position: small.append(position), 160)
+    bus.subscribe(lambda frame, position: large.append((position, frame.copy())), 400)
+    bus.push(np.arange(1000, dtype=np.float32))
+    assert small == list(range(0, 960, 160))
+    assert [position for position, _ in large] == [0, 400]
+    assert large[1][1][0] == 400
+
+
+def test_capture_callback_only_writes_to_the_ring():
+    bus = AudioBus(buffer_seconds=1)
+    frames = []
+    bus.subscribe(lambda frame, position: frames.append(position), 100)
+    bus.callback(np.zeros((300, 1), dtype=np.float32), 300, None, None)
+    assert bus.ring.total_written == 300 and frames == []
+    bus.deliver()
+    assert frames == [0, 100, 200]
+
+
+def test_run_delivers_everything_on_the_bus_thread():
+    bus = AudioBus(buffer_seconds=1)
+    threads, positions = set(), []
+
+    def on_frame(frame, position):
+        threads.add(threading.get_ident())
+        positions.append(position)
+
+    bus.subscribe(on_frame, 512)
+    source = BlockSource(blocks=20, size=800)
+    bus.run(source)
+    assert positions == list(range(0, 16000 - 511, 512))
+    assert threads and source.thread not in threads
+
+
+def test_subscriber_behind_by_more_than_the_ring_skips_ahead():
+    bus = AudioBus(samplerate=1000, buffer_seconds=1)
+    positions = []
+    bus.subscribe(lambda frame, position: positions.append(position), 250)
+    bus.write(np.zeros(2500, dtype=np.float32))
+    bus.deliver()
+    assert bus.overruns == 1
+    assert positions == [1500, 1750, 2000, 2250]
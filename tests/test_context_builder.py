@@ -0,0 +1,46 @@
+from context_builder import BASELINE_WIKI_CHARS, build_context, dedupe, estimate_tokens, split_paragraphs
+
+
+def _search_output(wiki_paragraphs, snippets):
+    return {"wiki": "\n\n".join(wiki_paragraphs), "results": snippets}
+
+
+def test_tokens_saved_is_measured_against_the_old_excerpt():
+    wiki = [f"Paragraph {i} about the Eiffel Tower and its iron lattice in Paris." * 3 for i in range(60)]
+    snippets = [f"Title: Result {i}\nSnippet: The Eiffel Tower is {300 + i} meters tall." for i in range(10)]
+    output = _search_output(wiki, snippets)
+    stats = build_context("how tall is the eiffel tower", output, token_budget=300)["stats"]
+
+    baseline = estimate_tokens(output["wiki"][:BASELINE_WIKI_CHARS]) + sum(estimate_tokens(s) for s in snippets)
+    assert stats["tokens_before"] == baseline
+    assert stats["tokens_fetched"] > stats["tokens_before"]
+    assert stats["tokens_after"] <= 300
+    assert stats["tokens_saved"] == stats["tokens_before"] - stats["tokens_after"]
+
+
+def test_relevant_passages_are_selected_and_wiki_keeps_article_order():
+    wiki = [
+        "The tower was designed by Gustave Eiffel's company.",
+        "Paris has many museums and parks.",
+        "The tower is 330 metres tall including antennas.",
+    ]
+    snippets = ["Title: Weather\nSnippet: Rain in Berlin.", "Title: Height\nSnippet: The tower is 330 metres tall."]
+    context = build_context("how tall is the tower", _search_output(wiki, snippets), token_budget=1000)
+    assert "museums" not in context["wiki"]
+    assert context["wiki"].index("designed") < context["wiki"].index("330 metres")
+    assert context["recent_searches"] == ["Title: Height\nSnippet: The tower is 330 metres tall."]
+
+
+def test_near_duplicates_are_dropped():
+    passages = [
+        {"text": "The Lions beat the Cowboys 44 to 30 on Thursday night."},
+        {"text": "The Lions beat the Cowboys 44 to 30 on Thursday night!"},
+        {"text": "Jared Goff threw four touchdowns."},
+    ]
+    assert len(dedupe(passages)) == 2
+
+
+def test_long_paragraphs_are_split():
+    text = " ".join(f"Sentence number {i} is here." for i in range(60))
+    parts = split_paragraphs(text, max_words=80)
+    assert len(parts) > 1 and all(len(part.split()) <= 90 for part in parts)
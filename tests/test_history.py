@@ -0,0 +1,73 @@
+from bench.history_tokens import local_summarize, simulate
+from context_builder import estimate_tokens
+from llm.history import ConversationHistory, Turn, digest_summary
+from llm.system_prompt import conversation_system_prompt
+
+
+def test_bounded_history_stays_flat_and_keeps_a_stable_prefix():
+    turns, keep = 12, 4
+    rows, history = simulate(turns, keep, fold_batch=2, summarize=local_summarize)
+    bounded_sizes = [row[1] for row in rows]
+    # Bounded: at most `keep` turns plus the capped summary beyond the system prompt
+    assert max(bounded_sizes[keep:]) - min(bounded_sizes[keep:]) < 200
+    assert rows[-1][3] > rows[-1][1], "naive history should outgrow the bounded one"
+    # Every request starts with the unchanged system prompt; between folds the
+    # summary and all earlier turns are reused as well
+    system_tokens = estimate_tokens(conversation_system_prompt)
+    assert all(row[2] >= system_tokens for row in rows[1:])
+    assert sum(1 for row in rows[1:] if row[2] > system_tokens) >= (turns - 1) // 2
+    assert history.folds >= 1 and history.summary
+
+
+def test_turns_out_of_the_window_are_folded_into_the_summary():
+    history = ConversationHistory(2, summarize=local_summarize, fold_batch=2)
+    for i in range(4):
+        history.add_turn(f"Question {i}?", f"Answer {i}. More detail.")
+    history.wait()
+    assert "Answer 0." in history.summary and "Answer 1." in history.summary
+    contents = [message["content"] for message in history.messages()]
+    assert "Question 3?" in contents and "Question 0?" not in contents
+
+
+def _failing_summarize(previous_summary, turns):
+    raise RuntimeError("summarizer down")
+
+
+def test_failed_folds_are_retried_with_the_next_fold():
+    calls = []
+
+    def flaky(previous_summary, turns):
+        calls.append(len(turns))
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return local_summarize(previous_summary, turns)
+
+    history = ConversationHistory(2, summarize=flaky, fold_batch=1, max_failed_folds=3)
+    for i in range(4):
+        history.add_turn(f"Question {i}?", f"Answer {i}.")
+        history.wait()
+    assert calls == [1, 2]
+    assert history.failed_folds == 0 and history.digested == 0
+    assert "Answer 0." in history.summary and "Answer 1." in history.summary
+
+
+def test_waiting_turns_stay_bounded_while_the_summarizer_fails():
+    history = ConversationHistory(2, summarize=_failing_summarize, fold_batch=1, max_failed_folds=3)
+    for i in range(20):
+        history.add_turn(f"Question {i}?", f"Answer {i}. " + "More detail. " * 30)
+        history.wait()
+        # At most the failed folds' turns wait on top of the verbatim window
+        assert len(history.token_counts()["turns"]) <= 2 + 3
+    assert history.digested == 18
+    assert "User: Question 17? / Assistant: Answer 17. More detail." in history.summary
+    assert "Question 0?" not in history.summary
+    assert len(history.summary) <= 1500
+
+
+def test_digest_summary_cuts_the_oldest_lines_first():
+    turns = [Turn(f"Question {i}?", f"Answer {i}. " + "more detail " * 30) for i in range(10)]
+    summary = digest_summary("Earlier summary.", turns, max_chars=800)
+    lines = summary.splitlines()
+    assert len(summary) <= 800
+    assert lines[-1].startswith("User: Question 9? / Assistant: Answer 9.") and lines[-1].endswith("...")
+    assert "Earlier summary." not in summary
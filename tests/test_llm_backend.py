@@ -0,0 +1,90 @@
+import json
+import time
+
+import pytest
+
+from bench import pipeline_load
+from bench.fake_llm_server import start_server
+from llm import api, backend
+from llm.history import ConversationHistory
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    server, url = start_server(latency=0.05, token_delay=0.01)
+    client = backend.Backend(url, max_connections=4, retries=2, retry_base_delay=0.05)
+    monkeypatch.setattr(backend, "_backend", client)
+    monkeypatch.setattr(api, "CACHE_ENABLED", False)
+    monkeypatch.setattr(api, "HEDGE_DELAY", 0)
+    monkeypatch.setattr(api, "history", ConversationHistory(4, summarize=api._summarize_history, fold_batch=2))
+    yield server, client
+    server.shutdown()
+
+
+def test_calls_share_one_kept_alive_connection(llm):
+    server, client = llm
+    client.preconnect()
+    routed = json.loads(api._classify("Tell me a joke"))
+    assert routed["tool"] == "llm" and routed["intent"]["category"] == "conversation"
+    assert json.loads(api._classify("set a timer for ten minutes"))["action"] == "set_timer"
+    assert api.conversation("How tall is the Eiffel Tower?").startswith("The Eiffel Tower is about 330 meters")
+    assert server.connections == 1
+
+
+def test_stream_delivers_deltas_before_completion(llm):
+    server, _ = llm
+    started = time.perf_counter()
+    first = None
+    deltas = []
+    for delta in api.conversation_stream("Who won the Lions game yesterday?"):
+        first = first if first is not None else time.perf_counter() - started
+        deltas.append(delta)
+    total = time.perf_counter() - started
+    assert "".join(deltas).startswith("The Lions beat the Cowboys 44 to 30.") and len(deltas) > 10
+    assert first < total / 2
+
+    # Usage reported by the stream reaches the history
+    api.history.add_turn("Who won the Lions game yesterday?", "".join(deltas))
+    assert api.history.token_counts()["turns"][-1]["usage"]["output_tokens"] > 0
+
+
+def test_transient_failures_are_retried(llm):
+    server, client = llm
+    server.fail_next = 2
+    assert json.loads(api._classify("Tell me a joke"))["tool"] == "llm"
+    assert client.retried == 2 and server.failed == 2
+    server.fail_next = 1
+    assert "".join(api.conversation_stream("Tell me a joke")).startswith("Why did the scarecrow")
+    assert client.retried == 3
+
+
+def test_slow_call_is_abandoned_at_its_deadline(llm):
+    server, client = llm
+    server.slow_next, server.slow_delay = 1, 1.0
+    started = time.perf_counter()
+    with pytest.raises(Exception) as raised:
+        client.complete("fake", [{"role": "user", "content": "Tell me a joke"}], deadline=0.3)
+    assert backend.is_retryable(raised.value) or isinstance(raised.value, backend.DeadlineExceeded)
+    assert time.perf_counter() - started < 0.6
+
+
+def test_hedged_router_call_beats_a_stall(llm, monkeypatch):
+    server, client = llm
+    monkeypatch.setattr(api, "HEDGE_DELAY", 0.15)
+    server.slow_next, server.slow_delay = 1, 1.0
+    started = time.perf_counter()
+    routed = json.loads(api._classify("Tell me a joke"))
+    assert routed["tool"] == "llm" and client.hedge_wins == 1
+    assert time.perf_counter() - started < 0.6
+
+
+def test_pipeline_load_reuses_connections(llm, monkeypatch):
+    server, client = llm
+    monkeypatch.setattr(api, "LOCAL_ROUTER_ENABLED", False)
+    monkeypatch.setattr(api, "history", None)
+    results, _ = pipeline_load.run(4, 3, pipeline_load.load_utterances())
+    assert not [row for row in results if "error" in row]
+    assert len(results) == 12
+    assert all(row["first_sentence"] < row["total"] for row in results if row["sentences"] > 1)
+    # Keep-alive: connections are bounded by the pool, not by the number of requests
+    assert server.connections <= client.max_connections + 1 < sum(server.requests.values())
@@ -0,0 +1,78 @@
+import threading
+import time
+
+from llm.cache import ResponseCache, SingleFlight, compatible_prompts, normalize_prompt
+
+SYSTEM = "system prompt"
+
+
+def test_exact_hit_ignores_case_and_punctuation():
+    cache = ResponseCache("test", ttl=60)
+    cache.put(SYSTEM, "What time is it?", "It's noon.")
+    assert cache.get(SYSTEM, "what time is it") == "It's noon."
+    assert cache.get("other system prompt", "what time is it") is None
+    assert cache.get(SYSTEM, "what time is it", extra="search results") is None
+
+
+def test_entries_expire():
+    cache = ResponseCache("test", ttl=0.05)
+    cache.put(SYSTEM, "hello", "Hi.")
+    time.sleep(0.1)
+    assert cache.get(SYSTEM, "hello") is None
+
+
+def test_semantic_tier_never_swaps_numbers_polarity_or_places():
+    cache = ResponseCache("test", ttl=60, semantic_threshold=0.75)
+    cache.put(SYSTEM, "turn on the kitchen lights", "on")
+    cache.put(SYSTEM, "set a ten minute timer", "ten")
+    cache.put(SYSTEM, "what time is it in tokyo", "tokyo")
+    assert cache.get(SYSTEM, "turn off the kitchen lights") is None
+    assert cache.get(SYSTEM, "set a two minute timer") is None
+    assert cache.get(SYSTEM, "what time is it in toronto") is None
+    assert cache.semantic_hits == 0
+
+
+def test_semantic_tier_matches_reordered_and_misheard_prompts():
+    cache = ResponseCache("test", ttl=60, semantic_threshold=0.75)
+    cache.put(SYSTEM, "what's the weather in berlin", "sunny")
+    assert cache.get(SYSTEM, "what's the whether in berlin") == "sunny"
+    assert cache.semantic_hits == 1
+
+
+def test_compatible_prompts():
+    assert compatible_prompts(normalize_prompt("The kitchen lights, turn on"), normalize_prompt("turn on the kitchen lights"))
+    assert not compatible_prompts("lights on", "lights off")
+    assert not compatible_prompts("timer for 10 minutes", "timer for 15 minutes")
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", slow))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert results == ["value"] * 4 and len(calls) == 1 and flight.coalesced == 3
+
+
+def test_router_cache_is_exact_only_and_history_bypasses_conversation_cache(monkeypatch):
+    from llm import api
+    from llm.history import ConversationHistory
+
+    assert api.router_cache.semantic_threshold is None
+    monkeypatch.setattr(api, "CACHE_ENABLED", True)
+    monkeypatch.setattr(api, "history", ConversationHistory(4))
+    assert not api._conversation_cached()
+    monkeypatch.setattr(api, "history", None)
+    assert api._conversation_cached()
@@ -0,0 +1,46 @@
+import pytest
+
+from bench.router_eval import NEGATIVE_CASES
+from llm import local_router
+from tools import registry
+
+
+def _action(text):
+    routed = local_router.route(text)
+    return routed.get("action") if routed else None
+
+
+@pytest.mark.parametrize("text, action", NEGATIVE_CASES)
+def test_look_alikes_do_not_trigger_the_action(text, action):
+    assert _action(text) != action
+
+
+@pytest.mark.parametrize("text, action", [
+    ("what are the nfl scores", "get_nfl_scores"),
+    ("NFL scores last week", "get_nfl_scores"),
+    ("what's the nfl schedule for next week?", "get_nfl_scores"),
+    ("scores of the nfl", "get_nfl_scores"),
+    ("kitchen lights on", "turn_on_light"),
+    ("turn off the bedroom lamp", "turn_off_light"),
+    ("remind me to call mom tomorrow", "set_reminder"),
+    ("cancel the timer", "cancel_timer"),
+    ("start a three minute timer for the eggs", "set_timer"),
+    ("what time is it", "get_time"),
+])
+def test_commands_route_locally(text, action):
+    assert _action(text) == action
+
+
+def test_self_corrections_go_to_the_remote_router():
+    assert local_router.route("turn off the lights, actually turn them on") is None
+    assert local_router.route("set a timer, never mind") is None
+
+
+@pytest.mark.parametrize("text", [
+    "what were the nfl scores in week 3",
+    "nfl schedule for christmas day",
+    "did the lions win their nfl game last season",
+])
+def test_nfl_tool_declines_requests_it_cannot_answer(text):
+    # Declined before any network access; the turn continues on the search path
+    assert registry.answer("get_nfl_scores", text) is None
@@ -0,0 +1,124 @@
+import copy
+import time
+from datetime import date
+
+import pytest
+
+from bench.fake_espn_server import load_fixture, start_server
+from tools import nfl, nfl_async, nfl_data, nfl_games
+from tools.nfl_data import CalendarIndex
+
+
+@pytest.fixture(scope="module")
+def index():
+    return CalendarIndex(load_fixture()["league"]["calendar"])
+
+
+@pytest.fixture
+def espn(monkeypatch):
+    server, url = start_server(fixture=copy.deepcopy(load_fixture()))
+    client = nfl_data.NflDataClient(url, live_ttl=0.2, upcoming_ttl=0.2)
+    monkeypatch.setattr(nfl_data, "_client", client)
+    yield server, client
+    server.shutdown()
+
+
+def _week(span):
+    return (span.season_type_id, span.week)
+
+
+def test_lookup_inside_a_week(index):
+    season, week = index.lookup(date(2025, 12, 7))
+    assert season.season_type == "Regular Season" and _week(week) == (2, 14)
+
+
+def test_shared_boundary_day_goes_to_the_earlier_interval(index):
+    # Week 1 ends and week 2 starts on Sep 10; the preseason ends on Sep 3
+    assert _week(index.lookup(date(2025, 9, 10))[1]) == (2, 1)
+    assert _week(index.lookup(date(2025, 9, 3))[1]) == (1, 4)
+    assert index.season_for(date(2025, 9, 3)).season_type_id == 1
+
+
+def test_lookup_off_the_calendar(index):
+    assert index.lookup(date(2025, 7, 1)) == (None, None)
+    assert index.lookup(date(2026, 8, 15)) == (None, None)
+
+
+def test_lookup_in_a_season_without_weeks(index):
+    season, week = index.lookup(date(2026, 4, 1))
+    assert season.season_type == "Off Season" and week is None
+
+
+def test_lookup_matches_a_linear_scan(index):
+    day = date(2025, 7, 25)
+    while day < date(2026, 3, 1):
+        containing = [span for span in index.weeks if span.start <= day <= span.end]
+        week = index.lookup(day)[1]
+        assert week == (containing[0] if containing else None), day
+        day = day.fromordinal(day.toordinal() + 1)
+
+
+def test_weeks_between(index):
+    weeks = index.weeks_between(date(2025, 12, 20), date(2026, 1, 12))
+    assert [_week(span) for span in weeks] == [(2, 16), (2, 17), (2, 18), (3, 1)]
+    assert index.weeks_between(date(2026, 3, 1), date(2026, 4, 1)) == []
+    assert [_week(span) for span in index.weeks_between(date(2025, 12, 7), date(2025, 12, 7))] == [(2, 14)]
+
+
+def test_calendar_is_fetched_once(espn):
+    server, client = espn
+    assert nfl.get_nfl_season_and_week("2025-12-07") == {"season_type": "Regular Season", "season_type_id": 2, "week": 14}
+    assert nfl.get_nfl_season_and_week("2025-08-05")["season_type_id"] == 1
+    assert nfl.get_nfl_season_and_week("2026-02-08")["week"] == 5
+    assert server.requests == 1
+    assert client.calendar_index() is client.calendar_index()
+
+
+def test_finished_week_is_cached_indefinitely(espn):
+    server, _ = espn
+    table = nfl.get_games_and_scores_week(13, 2)
+    assert (table.season_type, table.week) == ("Regular Season", 13)
+    assert len(table) == 3 and next(table.games()).status == "Final"
+    requests = server.requests
+    time.sleep(0.25)
+    nfl.get_games_and_scores_week(13, 2)
+    assert server.requests == requests
+
+
+def test_live_week_is_revalidated_after_its_ttl(espn):
+    server, client = espn
+    table = nfl.get_games_and_scores_from_date("2025-12-07")
+    assert any(game.state == "in" for game in table.games())
+    requests = server.requests
+    nfl.get_games_and_scores_week(14, 2)
+    assert server.requests == requests, "live week refetched within its TTL"
+    time.sleep(0.25)
+    nfl.get_games_and_scores_week(14, 2)
+    assert server.not_modified == 1 and client.revalidated == 1
+
+    # A score change invalidates the ETag and is picked up after the TTL
+    server.fixture["weeks"]["2:14"][1]["competitions"][0]["competitors"][0]["score"] = "28"
+    time.sleep(0.25)
+    assert nfl.get_games_and_scores_week(14, 2).columns["home_score"][1] == 28
+
+
+def test_async_schedule_fetches_weeks_concurrently(espn):
+    server, _ = espn
+    server.fixture["weeks"]["2:14"][1]["competitions"][0]["competitors"][0]["score"] = "28"
+    nfl_async.preload()
+    server.delay = 0.2
+    started = time.perf_counter()
+    schedule = nfl_async.get_nfl_schedule("2025-11-30", "2025-12-16")
+    elapsed = time.perf_counter() - started
+
+    assert [week["week"] for week in schedule["weeks"]] == [13, 14, 15]
+    assert all(week["error"] is None for week in schedule["weeks"])
+    games = schedule["weeks"][1]["games"]
+    assert list(games) == list(nfl_games.GAME_COLUMNS) and len(games["away"]) == 3
+    assert (games["away"][1], games["home_score"][1], games["state"][1]) == ("Cincinnati Bengals", 28, "in")
+    assert games["away_score"][2] is None, "scores of games not yet started"
+    assert "Bengals 17 @ Bills 28 live" in schedule["summary"].splitlines()
+    assert "The Bills lead the Bengals 28 to 17." in schedule["speech"]
+    assert "The Bengals beat the Ravens 20 to 17 in overtime." in schedule["speech"]
+    # One calendar request, then three weeks in parallel: ~0.4 s instead of ~0.8 s
+    assert elapsed < 0.6, f"weeks were not fetched concurrently ({elapsed:.2f}s)"
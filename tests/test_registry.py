@@ -0,0 +1,36 @@
+import pytest
+
+from bench import direct_tools
+from bench.fake_espn_server import start_server
+from tools import nfl_data, timers, waste
+
+
+@pytest.fixture
+def rows(monkeypatch):
+    server, url = start_server()
+    monkeypatch.setattr(nfl_data, "_client", nfl_data.NflDataClient(url))
+    monkeypatch.setattr(waste, "WASTE_SCHEDULE_FILE", direct_tools.WASTE_FIXTURE)
+    try:
+        yield direct_tools.run(direct_tools.UTTERANCES, conversation_ms=1500.0)
+    finally:
+        timers.cancel_timers()
+        server.shutdown()
+
+
+def test_direct_tool_paths(rows):
+    paths = {text: (tool_answer.tool.name if tool_answer else None) for text, _, tool_answer, _ in rows}
+    assert paths["what time is it"] == "get_time"
+    assert paths["start a three minute timer for the eggs"] == "set_timer"
+    assert paths["cancel all timers"] == "cancel_timer"
+    assert paths["what are the nfl scores"] == "get_nfl_scores"
+    assert paths["when is the trash collected"] == "get_waste_collection"
+    # Not determined by the utterance, or no tool: the LLM answers
+    assert paths["set a timer"] is None
+    assert paths["turn off the kitchen light"] is None and paths["who was albert einstein"] is None
+
+
+def test_direct_tool_answers(rows):
+    answers = {text: tool_answer.text for text, _, tool_answer, _ in rows if tool_answer}
+    assert answers["start a three minute timer for the eggs"] == "Okay, timer set for 3 minutes for the eggs."
+    assert answers["how much time is left on my timer"].startswith("Your eggs timer has 3 minutes left; your 15 minute timer")
+    assert answers["cancel all timers"] == "2 timers cancelled."
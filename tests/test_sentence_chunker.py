@@ -0,0 +1,74 @@
+from sentence_chunker import SentenceChunker, split_sentences
+
+
+def test_number_before_period_ends_sentence():
+    assert split_sentences("The Chiefs won 24 to 17. The next game is on Sunday.") == [
+        "The Chiefs won 24 to 17.",
+        "The next game is on Sunday.",
+    ]
+    assert split_sentences("I was born in 1990. Then I moved to Berlin.") == [
+        "I was born in 1990.",
+        "Then I moved to Berlin.",
+    ]
+    assert split_sentences("The score is 7. Detroit leads.") == ["The score is 7.", "Detroit leads."]
+
+
+def test_decimal_stays_together():
+    assert split_sentences("It is 3.5 degrees outside. Wear a coat.") == [
+        "It is 3.5 degrees outside.",
+        "Wear a coat.",
+    ]
+
+
+def test_no_is_a_sentence_end():
+    assert split_sentences("The answer is no. But you can try again.") == [
+        "The answer is no.",
+        "But you can try again.",
+    ]
+    assert split_sentences("No. That is not right.") == ["No.", "That is not right."]
+
+
+def test_no_before_number_is_abbreviation():
+    assert split_sentences("He wears No. 5 for the Lions. He plays quarterback.") == [
+        "He wears No. 5 for the Lions.",
+        "He plays quarterback.",
+    ]
+
+
+def test_abbreviations_do_not_end_sentence():
+    assert split_sentences("Dr. Smith arrived at 5 p.m. today. He was late.") == [
+        "Dr. Smith arrived at 5 p.m. today.",
+        "He was late.",
+    ]
+
+
+def test_streamed_number_sentence_is_emitted_before_the_rest():
+    chunker = SentenceChunker()
+    assert chunker.feed("The Chiefs won 24 to 17.") == []
+    assert chunker.feed(" The next") == ["The Chiefs won 24 to 17."]
+    assert chunker.flush() == ["The next"]
+
+
+def test_streamed_no_waits_for_the_next_word():
+    chunker = SentenceChunker()
+    assert chunker.feed("Jersey No. ") == []
+    assert chunker.feed("5 is retired. ") == ["Jersey No. 5 is retired."]
+
+
+def test_first_chunk_may_be_a_clause():
+    chunks = split_sentences("Sure, the Detroit Lions play on Sunday afternoon, at one, against the Bears.")
+    assert chunks[0] == "Sure, the Detroit Lions play on Sunday afternoon,"
+
+
+def test_long_sentence_is_cut_at_clause():
+    head = " ".join(["word"] * 30) + ","
+    tail = " ".join(["more"] * 10) + " end."
+    assert split_sentences(head + " " + tail, max_chars=80, first_min_chars=1000) == [head, tail]
+
+
+def test_long_streamed_text_without_punctuation_is_cut_at_a_word():
+    chunker = SentenceChunker(max_chars=80, first_min_chars=1000)
+    chunks = []
+    for word in ["word"] * 30:
+        chunks += chunker.feed(word + " ")
+    assert chunks and all(len(chunk) <= 80 for chunk in chunks)
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("playsound3")  # orchestrator imports the sound player
+
+from orchestrator import Cancelled, CancelToken
+from speculative import Branch, SpeculativeTurn, StreamBranch
+
+
+def _cancel_after(token, seconds):
+    timer = threading.Timer(seconds, token.cancel)
+    timer.start()
+    return timer
+
+
+def test_branch_wait_returns_the_result():
+    branch = Branch("router", time.perf_counter(), lambda: time.sleep(0.05) or "done")
+    assert branch.wait(CancelToken(), timeout=1) == "done"
+
+
+def test_branch_wait_wakes_up_on_cancel():
+    release = threading.Event()
+    branch = Branch("search", time.perf_counter(), release.wait)
+    cancel = CancelToken()
+    _cancel_after(cancel, 0.05)
+    started = time.perf_counter()
+    with pytest.raises(Cancelled):
+        branch.wait(cancel)
+    assert time.perf_counter() - started < 0.1
+    assert cancel._callbacks == [] and branch._waiters == []
+    release.set()
+
+
+def test_branch_wait_times_out():
+    release = threading.Event()
+    branch = Branch("search", time.perf_counter(), release.wait)
+    with pytest.raises(TimeoutError):
+        branch.wait(CancelToken(), timeout=0.05)
+    release.set()
+
+
+def test_iter_deltas_wakes_up_on_cancel():
+    def stalled():
+        yield "first "
+        time.sleep(1)
+        yield "second"
+
+    branch = StreamBranch("conversation", time.perf_counter(), stalled)
+    cancel = CancelToken()
+    deltas = branch.iter_deltas(cancel)
+    assert next(deltas) == "first "
+    _cancel_after(cancel, 0.05)
+    started = time.perf_counter()
+    with pytest.raises(Cancelled):
+        next(deltas)
+    assert time.perf_counter() - started < 0.1
+
+
+def test_iter_deltas_stops_a_stream_that_keeps_producing():
+    def endless():
+        while True:
+            time.sleep(0.001)
+            yield "word "
+
+    branch = StreamBranch("conversation", time.perf_counter(), endless)
+    cancel = CancelToken()
+    received = []
+    with pytest.raises(Cancelled):
+        for delta in branch.iter_deltas(cancel):
+            received.append(delta)
+            if len(received) == 5:
+                cancel.cancel()
+    assert len(received) == 5
+    assert branch.done.wait(1), "the discarded stream was not closed"
+
+
+class FakeStages:
+    """Router, search and conversation stand-ins that record their calls."""
+
+    def __init__(self, router_delay=0.1):
+        self.router_delay = router_delay
+        self.searches = []
+        self.conversations = []
+
+    def classify(self, text):
+        time.sleep(self.router_delay)
+        return "{}"
+
+    def search(self, prompt, category):
+        self.searches.append((prompt, category))
+        return {"prompt": prompt, "wiki": f"wiki about {prompt}", "results": [f"result for {prompt}"]}
+
+    def converse(self, prompt, additional_data):
+        self.conversations.append((prompt, additional_data))
+        yield f"reply to {prompt}"
+
+    def turn(self, message):
+        return SpeculativeTurn(message, self.classify, self.search, self.converse)
+
+
+@pytest.mark.parametrize("additional_data, reused", [(None, True), ({}, False), ("", False), ({"wiki": ""}, False)])
+def test_conversation_reuses_the_speculative_stream_only_without_context(additional_data, reused):
+    stages = FakeStages()
+    turn = stages.turn("tell me a joke")
+    turn.classification()
+    assert list(turn.conversation("tell me a joke", additional_data)) == ["reply to tell me a joke"]
+    expected = [("tell me a joke", None)] + ([] if reused else [("tell me a joke", additional_data)])
+    assert stages.conversations == expected
+    turn.close()
+
+
+@pytest.mark.parametrize("prompt, category, reused", [
+    ("Who is the Eiffel Tower's architect?", "web_search_with_wiki", True),
+    ("WHO is the Eiffel Tower's architect", "web_search", True),
+    ("Eiffel Tower architect", "web_search_with_wiki", False),
+])
+def test_search_reuses_the_speculative_search_only_for_the_same_text(prompt, category, reused):
+    stages = FakeStages()
+    turn = stages.turn("who is the eiffel tower's architect")
+    turn.classification()
+    result = turn.search(prompt, category)
+    expected = [("who is the eiffel tower's architect", "web_search_with_wiki")]
+    if not reused:
+        expected.append((prompt, category))
+    assert stages.searches == expected
+    assert result["results"] == [f"result for {expected[-1][0]}"]
+    assert bool(result["wiki"]) == (category == "web_search_with_wiki")
@@ -0,0 +1,142 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("playsound3")  # sound.py plays the wake and end sounds
+
+import streaming_stt
+from audio_bus import AudioBus
+from streaming_stt import StreamingSTT, WakeWordActivation
+
+
+class FakePorcupine:
+    """Detects the keyword in the n-th frame it is given."""
+
+    sample_rate = 16000
+    frame_length = 512
+
+    def __init__(self, detect_at):
+        self.detect_at = set(detect_at)
+        self.frames = 0
+
+    def process(self, pcm):
+        index = self.frames
+        self.frames += 1
+        return 0 if index in self.detect_at else -1
+
+    def delete(self):
+        pass
+
+
+class AlwaysSpeech:
+    def is_speech(self, audio_chunk):
+        return True
+
+    def calibrate(self, audio_chunk):
+        pass
+
+    def report(self):
+        return ""
+
+
+@pytest.fixture(autouse=True)
+def silent(monkeypatch):
+    monkeypatch.setattr(streaming_stt, "play_wake_detected", lambda: None)
+
+
+def test_detection_stays_set_until_consumed():
+    bus = AudioBus()
+    activator = WakeWordActivation(bus, porcupine=FakePorcupine(detect_at=[2]))
+    bus.push(np.zeros(2048, dtype=np.float32))
+    assert activator.last_keyword_end == 3 * 512
+    # Nobody was waiting when it fired; the detection is still there
+    assert activator.wait_for_wake(timeout=0)
+    assert not activator.wait_for_wake(timeout=0)
+
+    activator.porcupine.detect_at.add(5)
+    bus.push(np.zeros(1024, dtype=np.float32))
+    activator.reset()
+    assert not activator.wait_for_wake(timeout=0)
+
+
+@pytest.mark.parametrize("stt_first", [False, True])
+def test_recording_starts_at_the_keyword_end(stt_first):
+    bus = AudioBus()
+    stt = None
+    if stt_first:
+        # STT frames run ahead of the keyword end: the recording rewinds into the pre-roll
+        stt = StreamingSTT(None, vad=AlwaysSpeech(), bus=bus)
+    activator = WakeWordActivation(bus, porcupine=FakePorcupine(detect_at=[4]))
+    if not stt_first:
+        # The STT frame still holds the keyword's tail: the recording skips past it
+        stt = StreamingSTT(None, vad=AlwaysSpeech(), bus=bus)
+    activator.add_listener(stt.start_recording)
+
+    bus.push(np.zeros(4000, dtype=np.float32))
+    bus.push(np.zeros(4000, dtype=np.float32))
+    keyword_end = 5 * 512
+    assert activator.last_keyword_end == keyword_end
+    assert stt.is_recording and stt.decoder.utterance_start == keyword_end
+
+
+def test_wake_word_frames_are_clipped_before_int16_conversion():
+    bus = AudioBus()
+    porcupine = FakePorcupine(detect_at=[])
+    seen = []
+    porcupine.process = lambda pcm: seen.append(pcm.copy()) or -1
+    WakeWordActivation(bus, porcupine=porcupine)
+    bus.push(np.array([1.5, -1.5, 0.5] * 200, dtype=np.float32))
+    assert seen[0][:3].tolist() == [32767, -32767, 16383]
+
+
+def test_transcription_uses_the_configured_language():
+    class FakeModel:
+        def transcribe(self, audio, **options):
+            self.language = options["language"]
+            return [], None
+
+    model = FakeModel()
+    stt = StreamingSTT(model, vad=AlwaysSpeech(), bus=AudioBus(), language="de")
+    stt.transcribe_words(np.zeros(16000, dtype=np.float32))
+    assert model.language == "de"
+
+
+def test_finalizing_an_utterance_does_not_touch_the_next_one():
+    bus = AudioBus()
+    stt = StreamingSTT(None, vad=AlwaysSpeech(), bus=bus)
+    bus.push(np.zeros(40000, dtype=np.float32))
+
+    final_started, release = threading.Event(), threading.Event()
+
+    def transcribe_words(audio, prompt="", kind="partial"):
+        if kind == "final":
+            final_started.set()
+            release.wait(5)
+        return [(0.0, 0.4, "hello"), (0.4, 0.8, "world")]
+
+    stt.transcribe_words = transcribe_words
+    messages = []
+    stt.add_listener(lambda kind, text: messages.append((kind, text)))
+
+    # 1.5 s of speech: one partial pass, then enough new audio for a final pass
+    chunk = np.zeros(stt.CHUNK_SIZE, dtype=np.float32)
+    for i in range(15):
+        stt._handle_speech_detected(chunk, i * stt.CHUNK_SIZE, float(i))
+        if i == 9:
+            stt.executor.drain()
+    previous = stt.decoder
+    finalizer = threading.Thread(target=stt._process_final_message, args=(previous,))
+    finalizer.start()
+    assert final_started.wait(5)
+
+    # The next utterance starts on the bus thread while the final pass runs
+    stt.last_speech_time = None
+    stt._handle_speech_detected(chunk, 30000, 20.0)
+    release.set()
+    finalizer.join(5)
+
+    assert messages == [("final", "hello world")]
+    assert stt.decoder is not previous
+    assert stt.decoder.utterance_start == 30000
+    assert stt.decoder.committed == [] and stt.decoder.hypothesis == []
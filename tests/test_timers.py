@@ -0,0 +1,40 @@
+import pytest
+
+from tools import timers
+
+
+@pytest.mark.parametrize("text, seconds", [
+    ("set a timer for fifteen minutes", 900),
+    ("start a three minute timer for the eggs", 180),
+    ("timer for 1 hour and 30 minutes", 5400),
+    ("set a timer for twenty-five seconds", 25),
+    ("set a timer for forty five minutes", 2700),
+    ("timer for half an hour", 1800),
+    ("two minutes and a half", 150),
+    ("a timer for 2.5 hours", 9000),
+    ("an hour timer", 3600),
+])
+def test_parse_duration(text, seconds):
+    assert timers.parse_duration(text) == seconds
+
+
+@pytest.mark.parametrize("text", ["set a timer", "timer for the eggs", "remind me in a bit"])
+def test_parse_duration_without_an_amount(text):
+    assert timers.parse_duration(text) is None
+
+
+@pytest.mark.parametrize("text, label", [
+    ("start a three minute timer for the eggs", "eggs"),
+    ("set a timer called pizza for 10 minutes", None),
+    ("set a timer for ten minutes", None),
+    ("ten minute timer for my tea.", "tea"),
+])
+def test_parse_label(text, label):
+    assert timers.parse_label(text) == label
+
+
+def test_describe():
+    assert timers.describe(5400) == "1 hour and 30 minutes"
+    assert timers.describe(180, adjective=True) == "3 minute"
+    assert timers.describe(3723) == "1 hour, 2 minutes and 3 seconds"
+    assert timers.describe(0) == "0 seconds"
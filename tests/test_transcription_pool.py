@@ -0,0 +1,56 @@
+import threading
+import time
+
+from transcription_pool import TranscriptionExecutor, whisper_thread_config
+
+
+def test_results_are_delivered_in_submission_order():
+    executor = TranscriptionExecutor(num_workers=3, max_pending=6)
+    delivered = []
+    # Later jobs finish first
+    for i, delay in enumerate([0.15, 0.1, 0.05, 0.0]):
+        executor.submit(lambda i=i, delay=delay: time.sleep(delay) or i, on_result=delivered.append, block=True)
+    assert executor.drain(timeout=2)
+    assert delivered == [0, 1, 2, 3]
+    assert not executor.busy()
+
+
+def test_full_queue_rejects_without_stalling_delivery():
+    executor = TranscriptionExecutor(num_workers=1, max_pending=1)
+    release = threading.Event()
+    delivered = []
+    first = executor.submit(lambda: release.wait(2) and "first", on_result=delivered.append)
+    time.sleep(0.05)  # The worker picks up the first job, the queue is empty again
+    assert executor.submit(lambda: "second", on_result=delivered.append) is not None
+    assert executor.submit(lambda: "rejected", on_result=delivered.append) is None
+    assert executor.rejected == 1 and executor.busy()
+
+    release.set()
+    assert executor.wait(first, timeout=2)
+    assert executor.drain(timeout=2)
+    assert delivered == ["first", "second"]
+
+
+def test_failed_job_does_not_block_later_results():
+    executor = TranscriptionExecutor(num_workers=2, max_pending=4)
+    delivered = []
+    executor.submit(lambda: 1 / 0, on_result=delivered.append, block=True)
+    executor.submit(lambda: "after", on_result=delivered.append, block=True)
+    assert executor.drain(timeout=2)
+    assert delivered == ["after"]
+
+
+def test_whisper_thread_config_splits_the_cores():
+    assert whisper_thread_config(2, cpu_count=8) == (4, 2)
+    assert whisper_thread_config(16, cpu_count=4) == (1, 4)
+    assert whisper_thread_config(0, cpu_count=4) == (4, 1)
+
+
+def test_shutdown_finishes_queued_jobs_and_stops_the_workers():
+    executor = TranscriptionExecutor(num_workers=2, max_pending=4)
+    delivered = []
+    for i in range(3):
+        executor.submit(lambda i=i: time.sleep(0.02) or i, on_result=delivered.append, block=True)
+    executor.shutdown(timeout=2)
+    assert delivered == [0, 1, 2]
+    assert not any(worker.is_alive() for worker in executor._workers)
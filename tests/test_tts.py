@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import tts
+
+
+class CancelToken:
+    """The part of `orchestrator.CancelToken` that tts uses (orchestrator imports the sound player)."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+
+class RecordingSink:
+    """Collects written PCM; cancels `cancel` once `cancel_after` writes went through."""
+
+    def __init__(self, cancel=None, cancel_after=None):
+        self.writes = []
+        self.cancel = cancel
+        self.cancel_after = cancel_after
+        self.aborted = None
+
+    def write(self, pcm, cancel=None):
+        if cancel is not None and cancel.cancelled:
+            return False
+        self.writes.append(int(pcm[0]))
+        if self.cancel_after is not None and len(self.writes) >= self.cancel_after:
+            self.cancel.cancel()
+        return True
+
+    def close(self, abort=False):
+        self.aborted = abort
+
+
+def _patch(monkeypatch, sink):
+    # Two sentences per chunk, each "sentence" tagged with its chunk number
+    def synthesize_pcm(text, voice_key):
+        number = int(text.rstrip(".").split()[-1])
+        for _ in range(2):
+            yield np.full(4, number, dtype=np.int16)
+
+    monkeypatch.setattr(tts, "synthesize_pcm", synthesize_pcm)
+    monkeypatch.setattr(tts, "voice_sample_rate", lambda voice: 22050)
+    monkeypatch.setattr(tts, "create_sink", lambda samplerate: sink)
+
+
+def test_speak_stream_returns_every_played_chunk(monkeypatch):
+    sink = RecordingSink()
+    _patch(monkeypatch, sink)
+    assert tts.speak_stream(iter(["Chunk 1", "Chunk 2", "Chunk 3"])) == "Chunk 1 Chunk 2 Chunk 3"
+    assert sink.writes == [1, 1, 2, 2, 3, 3] and sink.aborted is False
+
+
+def test_speak_stream_after_cancel_returns_only_played_chunks(monkeypatch):
+    cancel = CancelToken()
+    # Cancelled after the first sentence of chunk 2 was written
+    sink = RecordingSink(cancel, cancel_after=3)
+    _patch(monkeypatch, sink)
+    answer = tts.speak_stream(iter(["Chunk 1", "Chunk 2", "Chunk 3"]), cancel=cancel)
+    assert answer == "Chunk 1"
+    assert sink.writes == [1, 1, 2] and sink.aborted is True
+
+
+def test_speak_stream_cancelled_before_audio_returns_nothing(monkeypatch):
+    cancel = CancelToken()
+    cancel.cancel()
+    _patch(monkeypatch, RecordingSink())
+    assert tts.speak_stream(iter(["Chunk 1"]), cancel=cancel) == ""
+
+
+def test_cancelled_reply_stream_returns_and_records_the_played_prefix(monkeypatch):
+    pytest.importorskip("playsound3")  # orchestrator imports the sound player
+    from llm.history import ConversationHistory
+    from orchestrator import CancelToken as TurnToken
+    from sentence_chunker import iter_chunks
+    from speculative import StreamBranch
+
+    def reply(prompt, additional_data):
+        yield "Sentence 1. "
+        yield "Sentence 2. "
+        # Cancelled by a new wake word while the model is still generating
+        time.sleep(0.5)
+        yield "Sentence 3. "
+
+    cancel = TurnToken()
+    sink = RecordingSink(cancel, cancel_after=4)
+    _patch(monkeypatch, sink)
+    branch = StreamBranch("conversation", time.perf_counter(), reply, "prompt", None)
+
+    answer = tts.speak_stream(iter_chunks(branch.iter_deltas(cancel)), cancel=cancel)
+    assert answer == "Sentence 1. Sentence 2."
+    assert sink.writes == [1, 1, 2, 2] and sink.aborted is True
+
+    history = ConversationHistory(4)
+    history.add_turn("prompt", answer)
+    assert history.messages()[-1] == {"role": "assistant", "content": "Sentence 1. Sentence 2."}
@@ -0,0 +1,40 @@
+import numpy as np
+
+from tts_cache import TTSCache, normalize_text
+
+
+def test_key_ignores_whitespace_but_not_case():
+    key = TTSCache.make_key("en_US", "cfg", "Kickoff at 7 PM.")
+    assert TTSCache.make_key("en_US", "cfg", "  Kickoff  at\n7 PM. ") == key
+    assert TTSCache.make_key("en_US", "cfg", "Kickoff at 7 pm.") != key
+    assert normalize_text("the US") != normalize_text("the us")
+    assert normalize_text("WHO said") != normalize_text("who said")
+
+
+def test_key_depends_on_voice_and_config():
+    key = TTSCache.make_key("en_US", "cfg", "Hello.")
+    assert TTSCache.make_key("de_DE", "cfg", "Hello.") != key
+    assert TTSCache.make_key("en_US", "other", "Hello.") != key
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = TTSCache(disk_dir=str(tmp_path))
+    key = TTSCache.make_key("en_US", "cfg", "Hello.")
+    assert cache.get(key) is None
+    cache.put(key, 22050, np.arange(100, dtype=np.int16))
+    samplerate, pcm = cache.get(key)
+    assert samplerate == 22050 and pcm[-1] == 99
+
+    # A fresh cache on the same directory serves the entry from disk
+    reloaded = TTSCache(disk_dir=str(tmp_path))
+    samplerate, pcm = reloaded.get(key)
+    assert samplerate == 22050 and len(pcm) == 100
+    assert reloaded.stats()["disk_hits"] == 1
+
+
+def test_memory_tier_is_bounded():
+    cache = TTSCache(memory_bytes=1000)
+    for i in range(5):
+        cache.put(f"k{i}", 16000, np.zeros(200, dtype=np.int16))  # 400 bytes each
+    assert cache.stats()["memory_bytes"] <= 1000
+    assert cache.get("k0") is None and cache.get("k4") is not None
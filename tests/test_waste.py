@@ -0,0 +1,41 @@
+import os
+from datetime import date
+
+from tools import waste
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "bench", "data", "waste_schedule.ics")
+
+
+def test_parse_ics_reads_dates_and_unfolded_summaries():
+    text = "\r\n".join([
+        "BEGIN:VCALENDAR",
+        "BEGIN:VEVENT",
+        "DTSTART;VALUE=DATE:20260105",
+        "SUMMARY:Bio",
+        " tonne",
+        "END:VEVENT",
+        "BEGIN:VEVENT",
+        "DTSTART;TZID=Europe/Berlin:20251208T060000",
+        "SUMMARY:Papier\\, Pappe",
+        "END:VEVENT",
+        "END:VCALENDAR",
+    ])
+    assert waste.parse_ics(text) == [(date(2025, 12, 8), "Papier, Pappe"), (date(2026, 1, 5), "Biotonne")]
+
+
+def test_parse_ics_skips_incomplete_events():
+    text = "\n".join([
+        "BEGIN:VEVENT", "SUMMARY:No date", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20251210", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:garbage", "SUMMARY:Bad date", "END:VEVENT",
+        "BEGIN:VEVENT", "DTSTART:20251210", "SUMMARY:Restmüll", "END:VEVENT",
+    ])
+    assert waste.parse_ics(text) == [(date(2025, 12, 10), "Restmüll")]
+
+
+def test_load_schedule_parses_the_file_once(monkeypatch):
+    first = waste.load_schedule(FIXTURE)
+    assert first[0] == (date(2025, 12, 8), "Restmüll")
+    monkeypatch.setattr(waste, "parse_ics", lambda text: [])
+    assert waste.load_schedule(FIXTURE) is first
+    assert waste.load_schedule(os.path.join(os.path.dirname(FIXTURE), "missing.ics")) == []
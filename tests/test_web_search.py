@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+import web_search
+from bench.fake_search_server import start_server
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server, base = start_server()
+    monkeypatch.setattr(web_search, "WIKI_API_URL", base + "/w/api.php")
+    monkeypatch.setattr(web_search, "SEARCH_API_URL", base + "/search")
+    monkeypatch.setattr(web_search, "WIKI_TIMEOUT", 1.0)
+    monkeypatch.setattr(web_search, "SEARCH_TIMEOUT", 1.0)
+    web_search.search_cache.clear()
+    yield server
+    server.shutdown()
+    web_search.search_cache.clear()
+
+
+def test_sources_run_concurrently(server):
+    server.wiki_delay = server.search_delay = 0.2
+    started = time.perf_counter()
+    result = web_search.run_web_search("eiffel tower", "web_search_with_wiki")
+    elapsed = time.perf_counter() - started
+    assert result["wiki"].startswith("Eiffel Tower")
+    assert len(result["results"]) == 5 and "Snippet 0" in result["results"][0]
+    # In sequence the two 0.2 s sources would take 0.4 s
+    assert elapsed < 0.38
+
+
+def test_only_the_wiki_lead_is_requested(server):
+    result = web_search.run_web_search("eiffel tower", "web_search_with_wiki")
+    assert "== History ==" not in result["wiki"]
+    assert len(result["wiki"]) <= web_search.WIKI_EXCERPT_CHARS
+    assert [query.get("exintro") for query in server.wiki_queries] == ["1"]
+
+
+def test_plain_web_search_skips_wikipedia(server):
+    result = web_search.run_web_search("nfl scores week 3", "web_search")
+    assert result["wiki"] == "" and len(result["results"]) == 5
+    assert "/w/api.php" not in server.requests
+
+
+def test_cache_hit_for_normalized_query(server):
+    result = web_search.run_web_search("eiffel tower", "web_search_with_wiki")
+    before = dict(server.requests)
+    assert web_search.run_web_search("Eiffel Tower?", "web_search_with_wiki") == result
+    assert server.requests == before
+
+
+def test_cache_is_kept_per_category(server):
+    web_search.run_web_search("eiffel tower", "web_search")
+    assert web_search.search_cache.get("web_search", "Eiffel Tower") is not None
+    assert web_search.search_cache.get("web_search_with_wiki", "eiffel tower") is None
+    assert web_search.run_web_search("eiffel tower", "web_search_with_wiki")["wiki"].startswith("Eiffel Tower")
+
+
+def test_cache_answers_smaller_requests_only(server):
+    web_search.run_web_search("eiffel tower", "web_search", max_results=5)
+    assert len(web_search.search_cache.get("web_search", "eiffel tower", 3)["results"]) == 3
+    assert web_search.search_cache.get("web_search", "eiffel tower", 15) is None
+
+
+def test_late_source_is_dropped_at_its_deadline_and_not_cached(server):
+    server.wiki_delay = 1.5
+    started = time.perf_counter()
+    partial = web_search.run_web_search("big ben", "web_search_with_wiki")
+    elapsed = time.perf_counter() - started
+    assert partial["wiki"] == "" and len(partial["results"]) == 5
+    assert elapsed < 1.3
+    assert web_search.search_cache.get("web_search_with_wiki", "big ben") is None
+
+
+@pytest.mark.parametrize("failing, empty, kept", [("/w/api.php", "wiki", "results"), ("/search", "results", "wiki")])
+def test_failed_source_falls_back_to_the_other(server, failing, empty, kept):
+    server.failing.add(failing)
+    result = web_search.run_web_search("big ben", "web_search_with_wiki")
+    assert not result[empty] and result[kept]
+    assert web_search.search_cache.get("web_search_with_wiki", "big ben") is None
+
+    # Once the source recovers the next query fetches it again
+    server.failing.clear()
+    assert web_search.run_web_search("big ben", "web_search_with_wiki")[empty]